@@ -0,0 +1,246 @@
+"""
+Process-wide registry of agent_squad orchestrators.
+Each agent (with its AgentSquad and classifier) is built once and shares a single
+OpenAI client, instead of constructing a new orchestrator, classifier and HTTP
+client on every request. Requests still get isolated sessions: every call uses
+a fresh session id whose chat history is dropped when the call completes.
+Call latency is recorded per dispatch mode (direct agent call vs routed through
+the classifier), and the classifier hop itself is timed when routing, so the
+saving from skipping the classifier is visible.
+"""
+
+import time
+import uuid
+import threading
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from openai import OpenAI
+from agent_squad.orchestrator import AgentSquad
+from agent_squad.agents import Agent
+from agent_squad.classifiers.openai_classifier import OpenAIClassifier, OpenAIClassifierOptions
+from agent_squad.storage import ChatStorage, InMemoryChatStorage
+from agent_squad.types import ConversationMessage, TimestampedMessage
+
+
+class SessionChatStorage(ChatStorage):
+    """
+    In-memory chat storage partitioned by session id.
+
+    agent_squad's InMemoryChatStorage keeps every conversation in one dict and
+    scans all of it on each classification; with a long-lived orchestrator that
+    dict would grow with every request. Here each session has its own store, so
+    lookups only see that session and ``end_session`` frees it in one step.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._sessions: Dict[str, InMemoryChatStorage] = {}
+
+    def _session(self, session_id: str) -> InMemoryChatStorage:
+        store = self._sessions.get(session_id)
+        if store is None:
+            store = self._sessions[session_id] = InMemoryChatStorage()
+        return store
+
+    async def save_chat_message(
+        self,
+        user_id: str,
+        session_id: str,
+        agent_id: str,
+        new_message: Union[ConversationMessage, TimestampedMessage],
+        max_history_size: Optional[int] = None
+    ) -> List[ConversationMessage]:
+        return await self._session(session_id).save_chat_message(user_id, session_id, agent_id, new_message, max_history_size)
+
+    async def save_chat_messages(
+        self,
+        user_id: str,
+        session_id: str,
+        agent_id: str,
+        new_messages: Union[List[ConversationMessage], List[TimestampedMessage]],
+        max_history_size: Optional[int] = None
+    ) -> List[ConversationMessage]:
+        return await self._session(session_id).save_chat_messages(user_id, session_id, agent_id, new_messages, max_history_size)
+
+    async def fetch_chat(
+        self,
+        user_id: str,
+        session_id: str,
+        agent_id: str,
+        max_history_size: Optional[int] = None
+    ) -> List[ConversationMessage]:
+        store = self._sessions.get(session_id)
+        if store is None:
+            return []
+        return await store.fetch_chat(user_id, session_id, agent_id, max_history_size)
+
+    async def fetch_all_chats(self, user_id: str, session_id: str) -> List[ConversationMessage]:
+        store = self._sessions.get(session_id)
+        if store is None:
+            return []
+        return await store.fetch_all_chats(user_id, session_id)
+
+    def end_session(self, session_id: str) -> None:
+        """Drop everything stored for session_id."""
+        self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+def run_sync(awaitable: Awaitable):
+    """
+    Run an agent_squad coroutine to completion on the calling thread, without an
+    event loop.
+
+    agent_squad's OpenAI agents and classifier are coroutines only in signature:
+    they call the synchronous OpenAI client and never suspend. Callers run them
+    in a worker thread (``asyncio.to_thread(run_sync, ...)``) so the blocking
+    HTTP call stays off the shared loop. Raises RuntimeError if the coroutine
+    does try to wait on a loop.
+    """
+    steps = awaitable.__await__()
+    try:
+        steps.send(None)
+    except StopIteration as finished:
+        return finished.value
+    steps.close()
+    raise RuntimeError("agent coroutine awaited the event loop; it cannot be run with run_sync")
+
+
+def iterate_sync(stream: AsyncIterator) -> Iterator:
+    """Iterate an agent_squad response stream with run_sync (see above), closing it when done."""
+    try:
+        while True:
+            try:
+                yield run_sync(stream.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        run_sync(stream.aclose())
+
+
+class AgentRegistry:
+    """
+    Builds each registered agent's orchestrator on first use and reuses it.
+
+    ``register(name, build)`` records a builder that receives the shared OpenAI
+    client and returns the agent; nothing is constructed until ``get(name)``,
+    so importing the module does not require an API key.
+
+    ``classifier_baseline_ms`` is the classifier hop's assumed cost, used to
+    estimate the saving of direct calls until a routed call has measured it.
+    """
+
+    def __init__(self, api_key: Optional[str], classifier_baseline_ms: Optional[float] = None):
+        self.api_key = api_key
+        self.classifier_baseline_ms = classifier_baseline_ms
+        self._client: Optional[OpenAI] = None
+        self._builders: Dict[str, Callable[[OpenAI], Agent]] = {}
+        self._orchestrators: Dict[str, AgentSquad] = {}
+        self._storage: Dict[str, SessionChatStorage] = {}
+        self.builds = 0
+        self.sessions_started = 0
+        # (agent name, dispatch mode or "classifier") -> [calls, total seconds];
+        # routed calls record from worker threads
+        self._timings: Dict[Tuple[str, str], List[float]] = {}
+        self._timings_lock = threading.Lock()
+
+    @property
+    def client(self) -> OpenAI:
+        """The OpenAI client shared by every agent and classifier (one connection pool)."""
+        if self._client is None:
+            self._client = OpenAI(api_key=self.api_key)
+        return self._client
+
+    def register(self, name: str, build: Callable[[OpenAI], Agent]) -> None:
+        self._builders[name] = build
+        self._orchestrators.pop(name, None)
+
+    def get(self, name: str) -> AgentSquad:
+        """Return the orchestrator for agent ``name``, building it on first use."""
+        orchestrator = self._orchestrators.get(name)
+        if orchestrator is None:
+            agent = self._builders[name](self.client)
+            classifier = OpenAIClassifier(options=OpenAIClassifierOptions(api_key=self.api_key))
+            classifier.client = self.client  # reuse the shared connection pool
+            classifier.classify = self._timed_classify(name, classifier.classify)
+            storage = SessionChatStorage()
+            orchestrator = AgentSquad(classifier=classifier, storage=storage)
+            orchestrator.add_agent(agent)
+            self._orchestrators[name] = orchestrator
+            self._storage[name] = storage
+            self.builds += 1
+        return orchestrator
+
+    def get_agent(self, name: str) -> Agent:
+        """Return the single agent registered under ``name``."""
+        return next(iter(self.get(name).agents.values()))
+
+    def new_session_id(self, prefix: str) -> str:
+        """A fresh session id, so no request sees another request's history."""
+        self.sessions_started += 1
+        return f"{prefix}_{uuid.uuid4().hex}"
+
+    def end_session(self, name: str, session_id: str) -> None:
+        storage = self._storage.get(name)
+        if storage is not None:
+            storage.end_session(session_id)
+
+    def _timed_classify(self, name: str, classify):
+        """Wrap a classifier's classify so each routing decision's latency is recorded."""
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await classify(*args, **kwargs)
+            finally:
+                self.record_timing(name, "classifier", time.perf_counter() - started)
+        return timed
+
+    def record_timing(self, name: str, mode: str, seconds: float) -> None:
+        """Record the latency of one agent call made in the given dispatch mode."""
+        with self._timings_lock:
+            entry = self._timings.setdefault((name, mode), [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def timing_stats(self) -> Dict[str, Dict]:
+        """
+        Average latency per agent and dispatch mode, plus the classifier hop when
+        routed. For agents called without the classifier (direct or stream),
+        ``saved_ms_per_request`` is the hop's measured cost and ``saved_ms_total``
+        multiplies it by those calls; both are None until a routed call has run in
+        this process. Until then, with classifier_baseline_ms set, the same figures
+        from that assumed cost are reported as ``estimated_saved_ms_per_request``
+        and ``estimated_saved_ms_total``.
+        """
+        with self._timings_lock:
+            timings = {key: tuple(entry) for key, entry in self._timings.items()}
+        report: Dict[str, Dict] = {}
+        for (name, mode), (calls, total) in timings.items():
+            report.setdefault(name, {})[mode] = {"calls": calls, "avg_ms": round(total / calls * 1000, 1)}
+        for modes in report.values():
+            unrouted = sum(modes[mode]["calls"] for mode in ("direct", "stream") if mode in modes)
+            if not unrouted:
+                continue
+            if "classifier" in modes:
+                saved = modes["classifier"]["avg_ms"]
+                modes["saved_ms_per_request"] = saved
+                modes["saved_ms_total"] = round(saved * unrouted, 1)
+                continue
+            modes["saved_ms_per_request"] = None
+            modes["saved_ms_total"] = None
+            if self.classifier_baseline_ms is not None:
+                estimate = float(self.classifier_baseline_ms)
+                modes["estimated_saved_ms_per_request"] = estimate
+                modes["estimated_saved_ms_total"] = round(estimate * unrouted, 1)
+        return report
+
+    def stats(self) -> Dict:
+        """Return build and session counters and per-mode call latency."""
+        return {
+            "agents": len(self._orchestrators),
+            "builds": self.builds,
+            "sessions_started": self.sessions_started,
+            "open_sessions": sum(len(storage) for storage in self._storage.values()),
+            "latency": self.timing_stats(),
+        }
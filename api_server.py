@@ -3,10 +3,17 @@ Flask API server for the calendar agent frontend.
 Provides HTTP endpoints for the web interface.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-import asyncio
-from scheduling import check_busy, create_calendar_event
+import atexit
+import json
+from scheduling import (
+    check_busy, check_busy_stream, more_suggestions, suggest_batch, create_calendar_event, allowed_calendar_ids, suggestion_cursors,
+    event_cache, event_fetches, prefetcher, PREFETCH_ENABLED, sync_store, calendar_registry, agent_registry, time_parse_stats, time_parse_cache
+)
+from preferences import classification_cache
+from mcp_client import get_mcp_client, get_mcp_batcher, close_mcp_client
+from background_loop import BackgroundLoop
 import os
 from dotenv import load_dotenv
 
@@ -16,6 +23,28 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend
 
+# One long-lived event loop shared by all requests. Flask's worker threads submit
+# coroutines to it, so async resources (the pooled MCP session, caches) outlive
+# individual requests and many requests can wait on MCP/OpenAI concurrently.
+runtime = BackgroundLoop(name="api-async-loop")
+if PREFETCH_ENABLED:
+    # Keep each calendar's scheduling horizon in memory while the server runs
+    runtime.add_startup_hook(prefetcher.start)
+    runtime.add_shutdown_hook(prefetcher.stop)
+runtime.add_shutdown_hook(close_mcp_client)
+atexit.register(runtime.stop)
+
+def run_async(coro):
+    """Run a coroutine on the shared background loop and wait for its result."""
+    return runtime.run(coro)
+
+def request_calendar_ids(data):
+    """
+    The 'calendar_ids' of a request body, checked against the configured calendars.
+    Raises ValueError (a 400) for anything but a list of configured calendar ids.
+    """
+    return run_async(allowed_calendar_ids(data.get('calendar_ids')))
+
 @app.route('/api/check-availability', methods=['POST'])
 def check_availability():
     """
@@ -35,25 +64,25 @@ def check_availability():
 
         if not query:
             return jsonify({'error': 'Query is required'}), 400
+        try:
+            calendar_ids = request_calendar_ids(data)  # Calendars to check together (optional)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'error'}), 400
         
         # Run the async check_busy function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            response = loop.run_until_complete(
-                check_busy(
-                    query, 
-                    conversation_history,
-                    meeting_type=meeting_type,
-                    meeting_description=meeting_description,
-                    duration_minutes=duration_minutes,
-                    rejected_times=rejected_times,
-                    skip_llm_formatting=skip_llm_formatting,
-                    timezone=timezone
-                )
+        response = run_async(
+            check_busy(
+                query, 
+                conversation_history,
+                meeting_type=meeting_type,
+                meeting_description=meeting_description,
+                duration_minutes=duration_minutes,
+                rejected_times=rejected_times,
+                skip_llm_formatting=skip_llm_formatting,
+                timezone=timezone,
+                calendar_ids=calendar_ids
             )
-        finally:
-            loop.close()
+        )
         
         # Handle both string (old format) and dict (new format) responses
         if isinstance(response, dict):
@@ -62,6 +91,7 @@ def check_availability():
                 'suggested_time': response.get('suggested_time'),
                 'suggested_times': response.get('suggested_times', []),  # Return all suggestions
                 'suggested_location': response.get('suggested_location'),
+                'suggestion_cursor': response.get('suggestion_cursor'),
                 'status': 'success'
             })
         else:
@@ -82,6 +112,147 @@ def check_availability():
             'details': error_trace if os.getenv('FLASK_DEBUG') == 'True' else None
         }), 500
 
+def sse_event(event: str, data) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/check-availability/stream', methods=['POST'])
+def check_availability_stream():
+    """
+    Streaming variant of /api/check-availability (Server-Sent Events).
+    Accepts the same body and emits events as each stage finishes:
+    time_window, availability, suggestions, then the reply as token events,
+    and finally done (the same payload /api/check-availability returns).
+    Failures are reported as an error event.
+    """
+    data = request.json or {}
+    query = data.get('query', '')
+    if not query:
+        return jsonify({'error': 'Query is required'}), 400
+    try:
+        calendar_ids = request_calendar_ids(data)
+    except ValueError as e:
+        return jsonify({'error': str(e), 'status': 'error'}), 400
+
+    stream = check_busy_stream(
+        query,
+        data.get('conversation_history', []),
+        meeting_type=data.get('meeting_type'),
+        meeting_description=data.get('meeting_description'),
+        duration_minutes=data.get('duration_minutes'),
+        rejected_times=data.get('rejected_times', []),
+        skip_llm_formatting=data.get('skip_llm_formatting', False),
+        timezone=data.get('timezone'),
+        calendar_ids=calendar_ids
+    )
+
+    def generate():
+        try:
+            for event, payload in runtime.iterate(stream):
+                if event == "done":
+                    payload = {
+                        'response': payload.get('response', ''),
+                        'suggested_time': payload.get('suggested_time'),
+                        'suggested_times': payload.get('suggested_times', []),
+                        'suggested_location': payload.get('suggested_location'),
+                        'suggestion_cursor': payload.get('suggestion_cursor'),
+                        'status': 'success'
+                    }
+                yield sse_event(event, payload)
+        except Exception as e:
+            import traceback
+            error_trace = traceback.format_exc()
+            print(f"Error in check_availability_stream: {e}")
+            print(f"Traceback:\n{error_trace}")
+            yield sse_event('error', {
+                'error': str(e),
+                'status': 'error',
+                'details': error_trace if os.getenv('FLASK_DEBUG') == 'True' else None
+            })
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}  # no proxy buffering
+    )
+
+@app.route('/api/more-suggestions', methods=['POST'])
+def more_suggestions_endpoint():
+    """
+    Endpoint to page through further suggestions for an earlier availability check.
+    Accepts the 'suggestion_cursor' returned by /api/check-availability and an
+    optional integer 'count' (default 3, at most MORE_SUGGESTIONS_MAX_COUNT;
+    400 otherwise). Makes no LLM call, and each page is re-checked against the
+    current (normally in-memory) calendar events so booked slots are skipped;
+    returns 404 if the cursor has expired, in which case the client should
+    check availability again.
+    """
+    try:
+        data = request.json or {}
+        cursor_id = data.get('suggestion_cursor')
+        count = data.get('count', 3)
+
+        if not cursor_id:
+            return jsonify({'error': 'suggestion_cursor is required'}), 400
+        if not isinstance(count, int) or isinstance(count, bool):
+            return jsonify({'error': 'count must be an integer', 'status': 'error'}), 400
+
+        try:
+            response = run_async(more_suggestions(cursor_id, count))
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'error'}), 400
+        if response is None:
+            return jsonify({'error': 'Suggestion cursor not found or expired', 'status': 'error'}), 404
+
+        return jsonify({**response, 'status': 'success'})
+
+    except Exception as e:
+        import traceback
+        error_trace = traceback.format_exc()
+        print(f"Error in more_suggestions: {e}")
+        print(f"Traceback:\n{error_trace}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error',
+            'details': error_trace if os.getenv('FLASK_DEBUG') == 'True' else None
+        }), 500
+
+@app.route('/api/suggest-batch', methods=['POST'])
+def suggest_batch_endpoint():
+    """
+    Endpoint to get suggestions for several meeting variants in one call.
+    Accepts 'specs' ([{meeting_type, duration_minutes, description}, ...]) and
+    optional 'rejected_times', 'timezone' and 'calendar_ids'. The calendar is fetched once and
+    no LLM is called; results come back grouped per spec, in order.
+    """
+    try:
+        data = request.json or {}
+        specs = data.get('specs')
+        rejected_times = data.get('rejected_times', [])
+        timezone = data.get('timezone')  # Viewer's IANA timezone (e.g. "Europe/London")
+
+        if not isinstance(specs, list):
+            return jsonify({'error': 'specs must be a list of meeting specs'}), 400
+
+        try:
+            calendar_ids = request_calendar_ids(data)  # Calendars to check together (optional)
+            response = run_async(suggest_batch(specs, rejected_times=rejected_times, timezone=timezone, calendar_ids=calendar_ids))
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'error'}), 400
+
+        return jsonify({**response, 'status': 'success'})
+
+    except Exception as e:
+        import traceback
+        error_trace = traceback.format_exc()
+        print(f"Error in suggest_batch: {e}")
+        print(f"Traceback:\n{error_trace}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error',
+            'details': error_trace if os.getenv('FLASK_DEBUG') == 'True' else None
+        }), 500
+
 @app.route('/api/create-event', methods=['POST'])
 def create_event():
     """
@@ -103,23 +274,18 @@ def create_event():
             return jsonify({'error': 'start_iso and end_iso are required'}), 400
         
         # Run the async create_event function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            response = loop.run_until_complete(
-                create_calendar_event(
-                    start_iso=start_iso,
-                    end_iso=end_iso,
-                    meeting_type=meeting_type,
-                    location=location,
-                    attendee_email=attendee_email,
-                    attendee_name=attendee_name,
-                    meeting_description=meeting_description,
-                    timezone=timezone
-                )
+        response = run_async(
+            create_calendar_event(
+                start_iso=start_iso,
+                end_iso=end_iso,
+                meeting_type=meeting_type,
+                location=location,
+                attendee_email=attendee_email,
+                attendee_name=attendee_name,
+                meeting_description=meeting_description,
+                timezone=timezone
             )
-        finally:
-            loop.close()
+        )
         
         return jsonify({
             'status': 'success',
@@ -145,6 +311,24 @@ def health():
     """Health check endpoint."""
     return jsonify({'status': 'ok'})
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Runtime metrics (MCP connection pool usage, cache hit rates) for capacity sizing."""
+    return jsonify({
+        'mcp_pool': get_mcp_client().pool_stats(),
+        'mcp_batching': get_mcp_batcher().stats(),
+        'event_cache': event_cache.stats(),
+        'event_fetch_coalescing': event_fetches.stats(),
+        'prefetch': prefetcher.stats(),
+        'calendar_sync': sync_store.stats(),
+        'calendar_registry': calendar_registry.stats(),
+        'meeting_classification': classification_cache.stats(),
+        'agents': agent_registry.stats(),
+        'time_parser': time_parse_stats.stats(),
+        'time_parse_cache': time_parse_cache.stats(),
+        'suggestion_cursors': suggestion_cursors.stats()
+    })
+
 # Serve frontend static files (for deployment)
 @app.route('/')
 def index():
@@ -171,5 +355,6 @@ if __name__ == '__main__':
     print(f"Frontend should be served from the 'frontend' directory")
     # Disable debug mode in production (Railway sets RAILWAY_ENVIRONMENT)
     debug_mode = os.getenv('RAILWAY_ENVIRONMENT') != 'production'
-    app.run(host='0.0.0.0', port=port, debug=debug_mode)
+    runtime.start()
+    app.run(host='0.0.0.0', port=port, debug=debug_mode, threaded=True)
 
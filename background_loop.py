@@ -0,0 +1,119 @@
+"""
+Long-lived asyncio event loop running on a background thread.
+Flask handlers submit coroutines to it so that concurrent requests share one loop
+and its resources (pooled MCP session, caches, in-flight futures).
+"""
+
+import asyncio
+import threading
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Optional
+
+
+class BackgroundLoop:
+    """
+    An event loop that runs forever on a daemon thread.
+
+    Synchronous callers (Flask worker threads) use ``run()`` to execute a
+    coroutine on the loop and block until it finishes; many such calls can be
+    in flight at once while they wait on MCP and OpenAI.
+    """
+
+    def __init__(self, name: str = "async-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._startup_hooks: List[Callable[[], Awaitable[None]]] = []
+        self._shutdown_hooks: List[Callable[[], Awaitable[None]]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop, starting it on first access."""
+        self.start()
+        return self._loop
+
+    def start(self) -> None:
+        """Start the loop thread if it is not already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run_forever, name=self.name, daemon=True)
+            self._thread.start()
+            for hook in self._startup_hooks:
+                asyncio.run_coroutine_threadsafe(self._run_hook(hook, "startup"), self._loop)
+
+    @staticmethod
+    async def _run_hook(hook: Callable[[], Awaitable[None]], stage: str) -> None:
+        try:
+            await hook()
+        except Exception as e:
+            print(f"Error in {stage} hook: {e}")
+
+    def _run_forever(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def add_startup_hook(self, hook: Callable[[], Awaitable[None]]) -> None:
+        """Register an async callable to run on the loop each time it is started."""
+        self._startup_hooks.append(hook)
+
+    def add_shutdown_hook(self, hook: Callable[[], Awaitable[None]]) -> None:
+        """Register an async callable to run on the loop when it is stopped."""
+        self._shutdown_hooks.append(hook)
+
+    def submit(self, coro: Awaitable):
+        """Schedule a coroutine on the loop and return a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None):
+        """Run a coroutine on the loop and block the calling thread until it completes."""
+        return self.submit(coro).result(timeout)
+
+    def iterate(self, agen: AsyncIterator) -> Iterator:
+        """
+        Drive an async generator on the loop from a synchronous caller, yielding
+        each item as soon as it is produced (e.g. to stream a Flask response).
+        If the caller stops early, the async generator is closed on the loop.
+        """
+        async def next_item():
+            try:
+                return False, await agen.__anext__()
+            except StopAsyncIteration:
+                return True, None
+
+        finished = False
+        try:
+            while True:
+                finished, item = self.run(next_item())
+                if finished:
+                    return
+                yield item
+        finally:
+            if not finished:
+                self.submit(agen.aclose())
+
+    def stop(self, timeout: float = 10) -> None:
+        """Run shutdown hooks, cancel outstanding tasks and stop the loop thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or thread is None or not thread.is_alive():
+                return
+
+            async def shutdown():
+                for hook in self._shutdown_hooks:
+                    await self._run_hook(hook, "shutdown")
+                tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+            try:
+                asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout)
+            except Exception as e:
+                print(f"Error while stopping event loop: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            loop.close()
+            self._loop = None
+            self._thread = None
@@ -0,0 +1,357 @@
+"""
+In-process caches for the calendar agent.
+Keeps recently fetched calendar event windows and resolved calendar ids so repeated
+availability checks (e.g. "more suggestions") don't repeat the same MCP round trips,
+and lets concurrent identical fetches share one call (single-flight).
+"""
+
+import time
+import asyncio
+import datetime
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from dateutil import parser as dateparser
+
+
+def _event_bounds(event: Dict) -> Tuple[Optional[datetime.datetime], Optional[datetime.datetime]]:
+    """Return an event's (start, end) as aware datetimes, or (None, None) if unparseable."""
+    try:
+        start_str = event.get("start", {}).get("dateTime") or event.get("start", {}).get("date")
+        end_str = event.get("end", {}).get("dateTime") or event.get("end", {}).get("date")
+        if not start_str or not end_str:
+            return None, None
+        start = dateparser.isoparse(start_str)
+        end = dateparser.isoparse(end_str)
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=datetime.timezone.utc)
+        if end.tzinfo is None:
+            end = end.replace(tzinfo=datetime.timezone.utc)
+        return start, end
+    except Exception:
+        return None, None
+
+
+def filter_events_to_window(events: List[Dict], start: datetime.datetime, end: datetime.datetime) -> List[Dict]:
+    """
+    Return the events overlapping [start, end) (the same set list-events returns
+    for that window). Events whose times can't be parsed are kept; downstream
+    code skips them the same way.
+    """
+    filtered = []
+    for event in events:
+        event_start, event_end = _event_bounds(event)
+        if event_start is None or (event_start < end and start < event_end):
+            filtered.append(event)
+    return filtered
+
+
+class LRUCache:
+    """
+    Small bounded mapping that evicts the least recently used entry, with
+    hit/miss counters. With ``ttl_seconds`` set, entries also expire that long
+    after they were stored.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict" = OrderedDict()  # key -> (stored_at, value)
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key, self._MISSING)
+        if entry is self._MISSING:
+            self.misses += 1
+            return default
+        stored_at, value = entry
+        if self.ttl_seconds is not None and time.monotonic() - stored_at >= self.ttl_seconds:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value) -> None:
+        if self.max_entries <= 0 or self.ttl_seconds == 0:
+            return
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+class EventWindowCache:
+    """
+    TTL + LRU cache of list-events results, keyed by (calendar, window start, window end).
+
+    A lookup is served from any fresh cached window for the same calendar that
+    fully contains the requested window; the cached events are filtered down to
+    those overlapping the requested sub-window (the same set list-events returns).
+
+    With ``index_func`` (e.g. EventWindow.from_events), ``get_indexed`` returns
+    index_func(events) for the covering entry instead; it is built once per entry
+    and rebuilt only after the entry's events change.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 64, index_func: Optional[Callable[[List[Dict]], Any]] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.index_func = index_func
+        self._entries: "OrderedDict[Tuple[str, datetime.datetime, datetime.datetime], Tuple[float, List[Dict]]]" = OrderedDict()
+        self._indexes: Dict[Tuple[str, datetime.datetime, datetime.datetime], Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def _is_fresh(self, fetched_at: float) -> bool:
+        return time.monotonic() - fetched_at < self.ttl_seconds
+
+    def _lookup(self, calendar: str, start: datetime.datetime, end: datetime.datetime):
+        """Key of a fresh entry covering [start, end), or None on a miss."""
+        if not self.enabled:
+            return None
+        for key in list(self._entries.keys()):
+            fetched_at, events = self._entries[key]
+            if not self._is_fresh(fetched_at):
+                del self._entries[key]
+                self._indexes.pop(key, None)
+                continue
+            cal, window_start, window_end = key
+            if cal == calendar and window_start <= start and window_end >= end:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return key
+        self.misses += 1
+        return None
+
+    def get(self, calendar: str, start: datetime.datetime, end: datetime.datetime) -> Optional[List[Dict]]:
+        """Return cached events overlapping [start, end), or None on a miss."""
+        key = self._lookup(calendar, start, end)
+        if key is None:
+            return None
+        return filter_events_to_window(self._entries[key][1], start, end)
+
+    def get_indexed(self, calendar: str, start: datetime.datetime, end: datetime.datetime) -> Any:
+        """
+        Return index_func(events) for the whole cached window covering [start, end),
+        or None on a miss; the caller narrows it to the requested window.
+        """
+        key = self._lookup(calendar, start, end)
+        if key is None:
+            return None
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = self.index_func(self._entries[key][1])
+        return index
+
+    def put(self, calendar: str, start: datetime.datetime, end: datetime.datetime, events: List[Dict], index: Any = None) -> None:
+        """Store the events fetched for [start, end), and their index if already built."""
+        if not self.enabled:
+            return
+        key = (calendar, start, end)
+        self._entries[key] = (time.monotonic(), list(events))
+        self._entries.move_to_end(key)
+        if index is not None:
+            self._indexes[key] = index
+        else:
+            self._indexes.pop(key, None)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._indexes.pop(evicted, None)
+
+    def add_event(self, calendar: str, event: Dict) -> bool:
+        """
+        Patch a newly created event into every cached window it falls in, so it is
+        never suggested again. Returns False if the event could not be placed (the
+        caller should invalidate instead).
+        """
+        event_start, event_end = _event_bounds(event)
+        if event_start is None:
+            return False
+        event_id = event.get("id")
+        for key, (fetched_at, events) in self._entries.items():
+            cal, window_start, window_end = key
+            if cal != calendar or not (event_start < window_end and window_start < event_end):
+                continue
+            if event_id:
+                events[:] = [e for e in events if e.get("id") != event_id]
+            events.append(event)
+            self._indexes.pop(key, None)
+        return True
+
+    def invalidate(self, calendar: Optional[str] = None) -> None:
+        """Drop cached windows for one calendar, or everything if calendar is None."""
+        if calendar is None:
+            self._entries.clear()
+            self._indexes.clear()
+        else:
+            for key in [k for k in self._entries if k[0] == calendar]:
+                del self._entries[key]
+                self._indexes.pop(key, None)
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers share it.
+
+    ``do(key, func)`` starts ``func()`` unless a call for ``key`` is already in
+    flight, in which case it waits for that call's result (or error) instead.
+    With ``covers``, any in-flight key for which ``covers(key)`` is true is
+    joined too (e.g. a fetch of a wider window). Waiters are shielded, so a
+    cancelled caller does not cancel the call others are waiting on.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def _running(self, key: Hashable) -> Optional[asyncio.Future]:
+        task = self._in_flight.get(key)
+        # A call started on another (possibly closed) loop can't be awaited here
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+
+    def in_flight(self, key: Hashable) -> bool:
+        return self._running(key) is not None
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[Any]],
+        covers: Optional[Callable[[Hashable], bool]] = None
+    ) -> Any:
+        task = self._running(key)
+        if task is None and covers is not None:
+            for other in list(self._in_flight):
+                if covers(other):
+                    task = self._running(other)
+                    if task is not None:
+                        break
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._in_flight.pop(key, None) if self._in_flight.get(key) is t else None)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many calls were made and how many callers joined one already running."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
+
+
+class CalendarRegistry:
+    """
+    Per-user cache of the resolved calendar list (primary calendar id and all ids).
+
+    The first lookup for a user blocks on ``lookup_func``; after that the cached
+    entry is returned immediately. Once an entry is older than ``ttl_seconds`` it
+    is still served, while a background task refreshes it (stale-while-revalidate),
+    so the list-calendars round trip stays off the request path.
+    """
+
+    def __init__(self, lookup_func: Callable[[Optional[str]], Awaitable[Dict]], ttl_seconds: float = 3600):
+        self.lookup_func = lookup_func
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Optional[str], Tuple[float, Dict]] = {}
+        self._lookups = SingleFlight()
+        self.hits = 0
+        self.lookups = 0
+        self.background_refreshes = 0
+
+    async def _refresh(self, user_id: Optional[str]) -> Dict:
+        # Concurrent first lookups for a user share one list-calendars call
+        return await self._lookups.do(user_id, lambda: self._lookup(user_id))
+
+    async def _lookup(self, user_id: Optional[str]) -> Dict:
+        self.lookups += 1
+        entry = await self.lookup_func(user_id)
+        self._entries[user_id] = (time.monotonic(), entry)
+        return entry
+
+    def _refresh_in_background(self, user_id: Optional[str]) -> None:
+        if self._lookups.in_flight(user_id):
+            return
+        self.background_refreshes += 1
+        task = asyncio.ensure_future(self._refresh(user_id))
+
+        def log_failure(t: asyncio.Task) -> None:
+            # Keep serving the stale entry if the refresh fails
+            if not t.cancelled() and t.exception() is not None:
+                print(f"Background calendar list refresh failed: {t.exception()}")
+
+        task.add_done_callback(log_failure)
+
+    async def get(self, user_id: Optional[str]) -> Dict:
+        """Return the cached calendar entry for user_id, resolving it on first use."""
+        cached = self._entries.get(user_id)
+        if cached is None:
+            return await self._refresh(user_id)
+        resolved_at, entry = cached
+        self.hits += 1
+        if time.monotonic() - resolved_at >= self.ttl_seconds:
+            self._refresh_in_background(user_id)
+        return entry
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Forget one user's calendar list, or everyone's if user_id is None."""
+        if user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(user_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Return lookup counters."""
+        return {
+            "users": len(self._entries),
+            "hits": self.hits,
+            "lookups": self.lookups,
+            "background_refreshes": self.background_refreshes,
+            "coalesced": self._lookups.coalesced,
+        }
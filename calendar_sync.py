@@ -0,0 +1,183 @@
+"""
+Incremental calendar sync using Google sync tokens.
+Keeps a local event store per calendar and refreshes it by applying only the
+events that changed (or were deleted) since the last sync, instead of pulling
+every event in the scheduling horizon again.
+"""
+
+import time
+import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from cache import filter_events_to_window
+
+
+def _format_iso_utc(dt: datetime.datetime) -> str:
+    """Format as YYYY-MM-DDTHH:MM:SSZ, the format the MCP server accepts."""
+    return dt.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
+
+
+class SyncedCalendar:
+    """Local event store for one calendar, plus the sync token and time range it covers."""
+
+    def __init__(self, calendar_id: str):
+        self.calendar_id = calendar_id
+        self.events: Dict[str, Dict] = {}
+        self.sync_token: Optional[str] = None
+        self.coverage_start: Optional[datetime.datetime] = None
+        self.coverage_end: Optional[datetime.datetime] = None
+        self.last_synced: Optional[float] = None
+        # Set when the MCP server answers without a sync token (older server);
+        # the calendar is then fetched the plain way.
+        self.unsupported = False
+
+    def covers(self, start: datetime.datetime, end: datetime.datetime) -> bool:
+        return (
+            self.sync_token is not None
+            and self.coverage_start is not None
+            and self.coverage_start <= start
+            and self.coverage_end >= end
+        )
+
+    def apply_delta(self, changed: List[Dict]) -> None:
+        """Apply changed events; cancelled ones are removed from the store."""
+        for event in changed:
+            event_id = event.get("id")
+            if not event_id:
+                continue
+            if event.get("status") == "cancelled":
+                self.events.pop(event_id, None)
+            else:
+                self.events[event_id] = event
+
+    def events_in_window(self, start: datetime.datetime, end: datetime.datetime) -> List[Dict]:
+        return filter_events_to_window(list(self.events.values()), start, end)
+
+
+class CalendarSyncStore:
+    """
+    Per-calendar synced event stores backed by the MCP list-events sync mode.
+
+    A full sync covers the requested window plus ``horizon_pad`` so that later
+    (rolling) windows stay inside the synced range and can be refreshed with
+    incremental deltas. When the window moves past the synced range, or Google
+    expires the sync token, a new full sync is done.
+
+    With ``stream_func(payload, on_event)`` the list-events responses are
+    decoded incrementally and events arrive one at a time; it returns the
+    remaining sync fields (nextSyncToken, syncTokenExpired).
+    """
+
+    def __init__(
+        self,
+        mcp_post_func: Callable[[dict], Awaitable[dict]],
+        user_id: Optional[str] = None,
+        horizon_pad: datetime.timedelta = datetime.timedelta(days=7),
+        stream_func: Optional[Callable[[dict, Callable[[Dict], None]], Awaitable[dict]]] = None
+    ):
+        self.mcp_post_func = mcp_post_func
+        self.stream_func = stream_func
+        self.user_id = user_id
+        self.horizon_pad = horizon_pad
+        self._calendars: Dict[str, SyncedCalendar] = {}
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+        self.events_received = 0
+
+    def get_calendar(self, calendar_id: str) -> SyncedCalendar:
+        if calendar_id not in self._calendars:
+            self._calendars[calendar_id] = SyncedCalendar(calendar_id)
+        return self._calendars[calendar_id]
+
+    def is_supported(self, calendar_id: str) -> bool:
+        return not self.get_calendar(calendar_id).unsupported
+
+    async def _list_events(self, params: dict) -> Tuple[dict, List[Dict]]:
+        """Run list-events; returns (response fields, events)."""
+        payload = {
+            "user_id": self.user_id,
+            "action": "list-events",
+            "params": params
+        }
+        if self.stream_func is not None:
+            events: List[Dict] = []
+            result = await self.stream_func(payload, events.append)
+            return result if isinstance(result, dict) else {}, events
+        result = await self.mcp_post_func(payload)
+        result = result if isinstance(result, dict) else {}
+        return result, self._events_from(result)
+
+    @staticmethod
+    def _events_from(result: dict) -> List[Dict]:
+        events = result.get("events")
+        if isinstance(events, list):
+            return events
+        raw = result.get("raw")
+        return raw if isinstance(raw, list) else []
+
+    async def _full_sync(self, calendar: SyncedCalendar, start: datetime.datetime, end: datetime.datetime) -> None:
+        coverage_end = end + self.horizon_pad
+        result, events = await self._list_events({
+            "calendarId": calendar.calendar_id,
+            "timeMin": _format_iso_utc(start),
+            "timeMax": _format_iso_utc(coverage_end),
+            "sync": True
+        })
+        self.full_syncs += 1
+        self.events_received += len(events)
+
+        calendar.events = {}
+        calendar.apply_delta(events)
+        calendar.coverage_start = start
+        calendar.coverage_end = coverage_end
+        calendar.sync_token = result.get("nextSyncToken")
+        calendar.last_synced = time.monotonic()
+        if not calendar.sync_token:
+            calendar.unsupported = True
+            # Keep the events from this fetch; they still answer the current request.
+            calendar.events = {str(i): e for i, e in enumerate(events)}
+
+    async def _incremental_sync(self, calendar: SyncedCalendar) -> bool:
+        """Apply changes since the last sync. Returns False if a full sync is needed."""
+        result, changed = await self._list_events({
+            "calendarId": calendar.calendar_id,
+            "syncToken": calendar.sync_token
+        })
+        if result.get("syncTokenExpired") or not result.get("nextSyncToken"):
+            calendar.sync_token = None
+            return False
+        self.incremental_syncs += 1
+        self.events_received += len(changed)
+        calendar.apply_delta(changed)
+        calendar.sync_token = result["nextSyncToken"]
+        calendar.last_synced = time.monotonic()
+        return True
+
+    async def sync_window(self, calendar_id: str, start: datetime.datetime, end: datetime.datetime) -> List[Dict]:
+        """Bring the calendar's store up to date and return the events overlapping [start, end)."""
+        calendar = self.get_calendar(calendar_id)
+        if not (calendar.covers(start, end) and await self._incremental_sync(calendar)):
+            await self._full_sync(calendar, start, end)
+        return calendar.events_in_window(start, end)
+
+    def record_write(self, calendar_id: str, event: Optional[Dict] = None) -> None:
+        """
+        Apply a booking made through this process to a synced calendar: patch the
+        created event into its store, or (with no event to patch in) drop the sync
+        token so the next read does a full sync.
+        """
+        calendar = self._calendars.get(calendar_id)
+        if calendar is None or calendar.unsupported or calendar.sync_token is None:
+            return
+        if isinstance(event, dict) and event.get("id"):
+            calendar.apply_delta([event])
+        else:
+            calendar.sync_token = None
+
+    def stats(self) -> Dict[str, int]:
+        """Return sync counters (full vs incremental syncs, events transferred)."""
+        return {
+            "calendars": len(self._calendars),
+            "full_syncs": self.full_syncs,
+            "incremental_syncs": self.incremental_syncs,
+            "events_received": self.events_received,
+        }
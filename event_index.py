@@ -0,0 +1,251 @@
+"""
+Sorted interval index for calendar availability queries.
+Answers "is [start, end) free?" in O(log n) and "which intervals conflict with
+[start, end)?" in O(log n + k), so slot checks stay flat on busy calendars.
+ColumnarIntervals answers the free question for a whole grid of candidate slots
+in one vectorized pass (NumPy when installed, plain Python otherwise), and
+OccupancyBitmap answers it in O(1) over a fixed horizon.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional; ColumnarIntervals falls back to pure Python
+    np = None
+
+
+class IntervalIndex:
+    """
+    Static index over half-open intervals [start, end) with attached payloads.
+
+    Intervals are sorted by start. Two max-end augmentations are kept:
+
+    - a prefix maximum of end times, so "does anything overlap?" is one bisect
+      plus one lookup: among intervals starting before ``end``, the latest end
+      must reach past ``start``;
+    - an implicit balanced search tree (node = midpoint of a sorted range) with
+      the max end of each subtree, so conflict listing prunes every subtree that
+      ends before ``start`` and every right subtree that starts after ``end``.
+    """
+
+    __slots__ = ("starts", "ends", "items", "_prefix_max_end", "_subtree_max_end")
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, Any]]):
+        ordered = sorted(intervals, key=lambda interval: interval[0])
+        self.starts: List[int] = [interval[0] for interval in ordered]
+        self.ends: List[int] = [interval[1] for interval in ordered]
+        self.items: List[Any] = [interval[2] for interval in ordered]
+
+        self._prefix_max_end: List[int] = []
+        running = None
+        for end in self.ends:
+            running = end if running is None or end > running else running
+            self._prefix_max_end.append(running)
+
+        self._subtree_max_end: List[int] = list(self.ends)
+        self._build(0, len(self.ends))
+
+    def _build(self, lo: int, hi: int):
+        """Fill subtree max ends for the sorted range [lo, hi); returns the range's max end."""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        best = self.ends[mid]
+        for child in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child is not None and child > best:
+                best = child
+        self._subtree_max_end[mid] = best
+        return best
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlaps_any(self, start: int, end: int) -> bool:
+        """True if any interval overlaps [start, end). O(log n)."""
+        count = bisect_left(self.starts, end)  # intervals starting before `end`
+        return count > 0 and self._prefix_max_end[count - 1] > start
+
+    def conflicts(self, start: int, end: int) -> List[Any]:
+        """Payloads of all intervals overlapping [start, end), in start order. O(log n + k)."""
+        found: List[int] = []
+        stack = [(0, len(self.starts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self._subtree_max_end[mid] <= start:
+                continue  # nothing in this subtree ends after `start`
+            stack.append((lo, mid))
+            if self.starts[mid] < end:
+                if self.ends[mid] > start:
+                    found.append(mid)
+                # right subtree starts at or after starts[mid], so only worth visiting here
+                stack.append((mid + 1, hi))
+        found.sort()
+        return [self.items[i] for i in found]
+
+
+def int64_column(values: Iterable[int]):
+    """Return values as an int64 array, or as a list of ints when NumPy is not installed."""
+    if np is not None:
+        return np.fromiter((int(v) for v in values), dtype=np.int64)
+    return [int(v) for v in values]
+
+
+class ColumnarIntervals:
+    """
+    Columnar (structure-of-arrays) view of half-open intervals for batch queries.
+
+    Starts are sorted and paired with a running maximum of ends, so a candidate
+    [start, end) is free exactly when the latest end among intervals starting
+    before ``end`` is <= ``start``. ``free_mask`` applies that test to arrays of
+    candidates at once: one ``searchsorted`` plus one gather with NumPy, or a
+    bisect per candidate without it.
+    """
+
+    __slots__ = ("starts", "_prefix_max_end")
+
+    def __init__(self, starts: Sequence[int], ends: Sequence[int]):
+        if np is not None:
+            starts = np.asarray(starts, dtype=np.int64)
+            ends = np.asarray(ends, dtype=np.int64)
+            order = np.argsort(starts, kind="stable")
+            self.starts = starts[order]
+            self._prefix_max_end = np.maximum.accumulate(ends[order]) if len(order) else ends[order]
+        else:
+            ordered = sorted(zip(starts, ends))
+            self.starts = [start for start, _ in ordered]
+            self._prefix_max_end = []
+            running = None
+            for _, end in ordered:
+                running = end if running is None or end > running else running
+                self._prefix_max_end.append(running)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def free_mask(self, starts: Sequence[int], ends: Sequence[int]):
+        """
+        Evaluate candidates [starts[i], ends[i]) in one pass.
+
+        Returns a boolean mask (a NumPy array, or a list without NumPy) that is
+        True where the candidate overlaps no interval.
+        """
+        if np is not None:
+            starts = np.asarray(starts, dtype=np.int64)
+            ends = np.asarray(ends, dtype=np.int64)
+            if not len(self.starts):
+                return np.ones(len(starts), dtype=bool)
+            counts = np.searchsorted(self.starts, ends, side="left")  # intervals starting before each end
+            latest_end = self._prefix_max_end[np.maximum(counts - 1, 0)]
+            return (counts == 0) | (latest_end <= starts)
+        mask = []
+        for start, end in zip(starts, ends):
+            count = bisect_left(self.starts, end)
+            mask.append(count == 0 or self._prefix_max_end[count - 1] <= start)
+        return mask
+
+
+class OccupancyBitmap:
+    """
+    Fixed-resolution occupancy bitmap over a horizon, with prefix sums.
+
+    The horizon [origin, end) is cut into cells of ``resolution`` seconds; a cell
+    is occupied if any interval touches it. ``prefix[i]`` counts occupied cells
+    before cell i, so "is [start, end) clear?" is two lookups. A cell holding an
+    interval boundary that is not on a cell boundary is only partly occupied, so
+    it is marked inexact (``inexact[i]`` counts those before cell i); ``is_free``
+    returns None for queries touching an inexact cell, or leaving the horizon,
+    and the caller should fall back to the interval index.
+    Zero-length intervals occupy no cell; like IntervalIndex, they block any
+    query strictly containing them, checked against a sorted list of points.
+    """
+
+    __slots__ = ("origin", "resolution", "cells", "prefix", "inexact", "points")
+
+    def __init__(self, intervals: Iterable[Tuple[int, int]], origin: int, end: int, resolution: int = 60):
+        self.resolution = resolution
+        self.origin = origin - origin % resolution  # align cells to the resolution
+        self.cells = max(0, -(-(end - self.origin) // resolution))
+
+        firsts: List[int] = []
+        lasts: List[int] = []
+        partial: List[int] = []  # cells holding an unaligned boundary
+        points: List[int] = []
+        horizon_end = self.origin + self.cells * resolution
+        for start, stop in intervals:
+            if stop == start and self.origin <= start < horizon_end:
+                points.append(start)
+                continue
+            if stop <= self.origin or start >= horizon_end or stop <= start:
+                continue
+            for boundary in (start, stop):
+                if boundary % resolution and self.origin <= boundary < horizon_end:
+                    partial.append((boundary - self.origin) // resolution)
+            firsts.append(max(0, (start - self.origin) // resolution))
+            lasts.append(min(self.cells, -(-(stop - self.origin) // resolution)))
+        self.points = sorted(points)
+
+        # Difference array -> coverage count per cell -> prefix sum of occupied cells
+        if np is not None:
+            diff = np.zeros(self.cells + 1, dtype=np.int64)
+            np.add.at(diff, np.asarray(firsts, dtype=np.int64), 1)
+            np.add.at(diff, np.asarray(lasts, dtype=np.int64), -1)
+            occupied = np.cumsum(diff[:-1]) > 0
+            self.prefix = np.concatenate(([0], np.cumsum(occupied, dtype=np.int64)))
+            marked = np.zeros(self.cells, dtype=bool)
+            marked[np.asarray(partial, dtype=np.int64)] = True
+            self.inexact = np.concatenate(([0], np.cumsum(marked, dtype=np.int64)))
+        else:
+            diff = [0] * (self.cells + 1)
+            for first in firsts:
+                diff[first] += 1
+            for last in lasts:
+                diff[last] -= 1
+            self.prefix = [0] * (self.cells + 1)
+            coverage = 0
+            for i in range(self.cells):
+                coverage += diff[i]
+                self.prefix[i + 1] = self.prefix[i] + (1 if coverage > 0 else 0)
+            marked_cells = set(partial)
+            self.inexact = [0] * (self.cells + 1)
+            for i in range(self.cells):
+                self.inexact[i + 1] = self.inexact[i] + (1 if i in marked_cells else 0)
+
+    @property
+    def exact(self) -> bool:
+        """True if every interval boundary falls on a cell boundary."""
+        return int(self.inexact[self.cells]) == 0
+
+    def covers(self, start: int, end: int) -> bool:
+        """True if [start, end) lies inside the horizon."""
+        return self.origin <= start and end <= self.origin + self.cells * self.resolution
+
+    def is_free(self, start: int, end: int) -> Optional[bool]:
+        """True/False if [start, end) is clear/occupied; None if the bitmap can't answer exactly. O(1)."""
+        if end < start or not self.covers(start, end):
+            return None
+        offset = int(start - self.origin)
+        if end == start:
+            # A zero-length query is busy only strictly inside an interval: on a
+            # cell boundary the cells on either side can't tell that apart from
+            # two intervals meeting there
+            if offset % self.resolution == 0:
+                return None
+            return self._cells_free(offset // self.resolution, offset // self.resolution + 1)
+        first = offset // self.resolution
+        last = -(-int(end - self.origin) // self.resolution)
+        if self.points:
+            i = bisect_right(self.points, start)
+            if i < len(self.points) and self.points[i] < end:
+                return False
+        return self._cells_free(first, last)
+
+    def _cells_free(self, first: int, last: int) -> Optional[bool]:
+        """Whether cells [first, last) are all clear; None if any of them is inexact."""
+        if int(self.inexact[last]) != int(self.inexact[first]):
+            return None
+        return int(self.prefix[last]) == int(self.prefix[first])
@@ -13,7 +13,8 @@ let conversationState = {
     suggestedTimes: [], // All suggested times from the backend
     currentSuggestionIndex: 0, // Current suggestion being shown
     rejectedTimes: [], // Track rejected times to avoid suggesting them again
-    fetchRetryCount: 0 // Track retry attempts to prevent infinite loops
+    fetchRetryCount: 0, // Track retry attempts to prevent infinite loops
+    suggestionCursor: null // Server-side cursor for paging through more suggestions
 };
 
 // Initialize the app
@@ -70,6 +71,66 @@ function getApiHeaders() {
     return headers;
 }
 
+// POST to the streaming availability endpoint and dispatch its Server-Sent Events
+// (time_window, availability, suggestions, token, done) to handlers[event](data)
+// as they arrive. Resolves with the final "done" payload; rejects on an error event.
+// Returns null after handling a 401. (EventSource can't POST, so the body is read directly.)
+async function streamCheckAvailability(body, handlers = {}) {
+    const response = await fetch(`${getApiBaseUrl()}/api/check-availability/stream`, {
+        method: 'POST',
+        headers: getApiHeaders(),
+        body: JSON.stringify(body)
+    });
+
+    if (!response.ok) {
+        if (response.status === 401) {
+            await handle401Error();
+            return null;
+        }
+        let errorMessage = 'Failed to check availability';
+        try {
+            const errorData = await response.json();
+            errorMessage = errorData.error || errorMessage;
+            console.error('API Error:', errorData);
+        } catch (e) {
+            console.error('API Error (no JSON):', response.status, response.statusText);
+        }
+        throw new Error(errorMessage);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let result = null;
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const message = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            let event = 'message';
+            let data = '';
+            for (const line of message.split('\n')) {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            }
+            const payload = data ? JSON.parse(data) : null;
+            if (event === 'error') {
+                console.error('API Error:', payload);
+                throw new Error((payload && payload.error) || 'Failed to check availability');
+            }
+            if (event === 'done') result = payload;
+            if (handlers[event]) await handlers[event](payload);
+        }
+    }
+    if (!result) {
+        throw new Error('Availability stream ended unexpectedly');
+    }
+    return result;
+}
+
 // Recover from an unexpected auth error by resetting the conversation and
 // restarting the greeting. (The app no longer has a login gate.)
 async function handle401Error() {
@@ -84,7 +145,8 @@ async function handle401Error() {
         suggestedTimes: [],
         currentSuggestionIndex: 0,
         rejectedTimes: [],
-        fetchRetryCount: 0
+        fetchRetryCount: 0,
+        suggestionCursor: null
     };
 
     // Clear chat messages
@@ -286,61 +348,45 @@ async function processBooking() {
     });
     
     try {
-        // Call the backend API
-        const response = await fetch(`${getApiBaseUrl()}/api/check-availability`, {
-            method: 'POST',
-            headers: getApiHeaders(),
-            body: JSON.stringify({
-                query: query,
-                conversation_history: conversationState.conversationHistory.slice(0, -1), // Exclude current query
-                meeting_type: conversationState.isOnline ? 'online' : 'in-person',
-                meeting_description: conversationState.purpose,
-                duration_minutes: conversationState.duration,
-                skip_llm_formatting: true, // Skip LLM - frontend generates its own message from suggestions
-                timezone: getBrowserTimeZone()
-            })
-        });
-        
-        if (!response.ok) {
-            // Handle 401 Unauthorized - token expired or invalid
-            if (response.status === 401) {
-                await handle401Error();
-                return;
-            }
-            
-            // Try to get error details from response
-            let errorMessage = 'Failed to check availability';
-            try {
-                const errorData = await response.json();
-                errorMessage = errorData.error || errorMessage;
-                console.error('API Error:', errorData);
-            } catch (e) {
-                console.error('API Error (no JSON):', response.status, response.statusText);
+        // Call the streaming API so the slots render as soon as the preference
+        // engine is done, without waiting for the rest of the response
+        let slotsShown = false;
+        const data = await streamCheckAvailability({
+            query: query,
+            conversation_history: conversationState.conversationHistory.slice(0, -1), // Exclude current query
+            meeting_type: conversationState.isOnline ? 'online' : 'in-person',
+            meeting_description: conversationState.purpose,
+            duration_minutes: conversationState.duration,
+            skip_llm_formatting: true, // Skip LLM - frontend generates its own message from suggestions
+            timezone: getBrowserTimeZone()
+        }, {
+            suggestions: async (suggestions) => {
+                conversationState.suggestionCursor = suggestions.suggestion_cursor || null;
+                const suggestedTimes = suggestions.suggested_times || [];
+                if (suggestedTimes.length === 0) return;
+                
+                // Store all suggested times and reset index (keep rejected times)
+                conversationState.suggestedTimes = suggestedTimes;
+                conversationState.currentSuggestionIndex = 0;
+                
+                // Show 3 slots at once as clickable buttons
+                const agentResponse = `Here are some times when Greta is available:`;
+                
+                // Update conversation history
+                conversationState.conversationHistory[conversationState.conversationHistory.length - 1].assistant = agentResponse;
+                
+                // Replace the loading message with the actual response
+                await updateLoadingMessage(agentResponse);
+                showThreeSuggestions(suggestions.suggested_location);
+                slotsShown = true;
             }
-            throw new Error(errorMessage);
-        }
-        
-        const data = await response.json();
-        const suggestedTime = data.suggested_time;
-        const suggestedTimes = data.suggested_times || [];
-        const suggestedLocation = data.suggested_location;
-        
-        // Store all suggested times and reset index (keep rejected times)
-        conversationState.suggestedTimes = suggestedTimes;
-        conversationState.currentSuggestionIndex = 0;
+        });
+        if (!data) return; // 401 already handled
         
-        // Show 3 slots at once as clickable buttons
-        if (suggestedTimes.length > 0) {
-            const agentResponse = `Here are some times when Greta is available:`;
-            
-            // Update conversation history
-            conversationState.conversationHistory[conversationState.conversationHistory.length - 1].assistant = agentResponse;
-            
-            // Replace the loading message with the actual response
-            await updateLoadingMessage(agentResponse);
-            showThreeSuggestions(suggestedLocation);
-        } else {
+        if (!slotsShown) {
             // No suggestions - use LLM response as fallback
+            conversationState.suggestedTimes = [];
+            conversationState.currentSuggestionIndex = 0;
             const agentResponse = data.response || 'I was unable to check her availability. Please try again.';
             conversationState.conversationHistory[conversationState.conversationHistory.length - 1].assistant = agentResponse;
             // Replace the loading message with the actual response
@@ -590,6 +636,41 @@ async function rejectCurrentBatch() {
     }
 }
 
+// Fetch the next batch from the server-side suggestion cursor. Returns null if
+// there is no cursor or it has expired, undefined after handling a 401.
+async function fetchFromSuggestionCursor(count = 3) {
+    if (!conversationState.suggestionCursor) return null;
+
+    const response = await fetch(`${getApiBaseUrl()}/api/more-suggestions`, {
+        method: 'POST',
+        headers: getApiHeaders(),
+        body: JSON.stringify({
+            suggestion_cursor: conversationState.suggestionCursor,
+            count: count
+        })
+    });
+
+    if (response.status === 404) {
+        conversationState.suggestionCursor = null;
+        return null;
+    }
+    if (!response.ok) {
+        if (response.status === 401) {
+            await handle401Error();
+            return undefined;
+        }
+        let errorMessage = 'Failed to get more suggestions';
+        try {
+            const errorData = await response.json();
+            errorMessage = errorData.error || errorMessage;
+        } catch (e) {
+            console.error('API Error (no JSON):', response.status, response.statusText);
+        }
+        throw new Error(errorMessage);
+    }
+    return await response.json();
+}
+
 // Fetch more suggestions from backend, excluding rejected times
 async function fetchMoreSuggestions() {
     const inputSection = document.getElementById('input-section');
@@ -598,40 +679,48 @@ async function fetchMoreSuggestions() {
     await typewriterMessage('agent', 'Let me find more available times for you...');
     
     try {
-        const response = await fetch(`${getApiBaseUrl()}/api/check-availability`, {
-            method: 'POST',
-            headers: getApiHeaders(),
-            body: JSON.stringify({
-                // Use a neutral query that doesn't imply rejections
-                        query: `Find available times for a ${conversationState.duration === 30 ? '30 minute' : '1 hour'} ${conversationState.isOnline ? 'online' : 'in-person'} meeting about: ${conversationState.purpose}`,
-                conversation_history: [], // Don't pass conversation history to avoid LLM seeing rejections
-                meeting_type: conversationState.isOnline ? 'online' : 'in-person',
-                meeting_description: conversationState.purpose,
-                duration_minutes: conversationState.duration,
-                rejected_times: conversationState.suggestedTimes.map(t => ({ start_iso: t.start_iso, end_iso: t.end_iso })), // Exclude ALL previously seen times
-                skip_llm_formatting: true, // Skip LLM to avoid "I understand" messages
-                timezone: getBrowserTimeZone()
-            })
-        });
+        // Page through the server-side cursor when there is one (no re-parse or
+        // calendar fetch); run a full availability check only if it has expired
+        let data = await fetchFromSuggestionCursor();
+        if (data === undefined) return; // 401 already handled
+        if (!data) {
+            const response = await fetch(`${getApiBaseUrl()}/api/check-availability`, {
+                method: 'POST',
+                headers: getApiHeaders(),
+                body: JSON.stringify({
+                    // Use a neutral query that doesn't imply rejections
+                            query: `Find available times for a ${conversationState.duration === 30 ? '30 minute' : '1 hour'} ${conversationState.isOnline ? 'online' : 'in-person'} meeting about: ${conversationState.purpose}`,
+                    conversation_history: [], // Don't pass conversation history to avoid LLM seeing rejections
+                    meeting_type: conversationState.isOnline ? 'online' : 'in-person',
+                    meeting_description: conversationState.purpose,
+                    duration_minutes: conversationState.duration,
+                    rejected_times: conversationState.suggestedTimes.map(t => ({ start_iso: t.start_iso, end_iso: t.end_iso })), // Exclude ALL previously seen times
+                    skip_llm_formatting: true, // Skip LLM to avoid "I understand" messages
+                    timezone: getBrowserTimeZone()
+                })
+            });
         
-        if (!response.ok) {
-            // Handle 401 Unauthorized - token expired or invalid
-            if (response.status === 401) {
-                await handle401Error();
-                return;
-            }
+            if (!response.ok) {
+                // Handle 401 Unauthorized - token expired or invalid
+                if (response.status === 401) {
+                    await handle401Error();
+                    return;
+                }
             
-            let errorMessage = 'Failed to get more suggestions';
-            try {
-                const errorData = await response.json();
-                errorMessage = errorData.error || errorMessage;
-            } catch (e) {
-                console.error('API Error (no JSON):', response.status, response.statusText);
+                let errorMessage = 'Failed to get more suggestions';
+                try {
+                    const errorData = await response.json();
+                    errorMessage = errorData.error || errorMessage;
+                } catch (e) {
+                    console.error('API Error (no JSON):', response.status, response.statusText);
+                }
+                throw new Error(errorMessage);
             }
-            throw new Error(errorMessage);
+            
+            data = await response.json();
+            conversationState.suggestionCursor = data.suggestion_cursor || null;
         }
         
-        const data = await response.json();
         // IGNORE the LLM response - we'll generate our own message
         const suggestedTime = data.suggested_time;
         const suggestedTimes = data.suggested_times || [];
@@ -788,7 +877,8 @@ function startOver() {
         suggestedTimes: [],
         currentSuggestionIndex: 0,
         rejectedTimes: [],
-        fetchRetryCount: 0
+        fetchRetryCount: 0,
+        suggestionCursor: null
     };
     
     const chatMessages = document.getElementById('chat-messages');
@@ -0,0 +1,256 @@
+"""
+Incremental JSON decoding for large MCP responses.
+Picks selected arrays and fields out of a JSON document fed in chunks, decoding
+each array element on its own and skipping everything else without building it,
+so memory stays bounded by the largest single element rather than the document.
+"""
+
+import re
+import json
+from typing import Any, Callable, Sequence, Tuple
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING_BODY = re.compile(r'(?:[^"\\]+|\\.)*', re.S)  # string content up to the closing quote
+_CONTAINER_SPECIAL = re.compile(r'["\[\]{}]')
+_SCALAR_END = re.compile(r"[,\]}\s]")
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+Path = Tuple[Any, ...]
+
+
+def path_matches(pattern: Path, path: Path) -> bool:
+    """True if ``path`` (keys and list indices) matches ``pattern``; "*" matches any index."""
+    return len(pattern) == len(path) and all(
+        (p == "*" and isinstance(c, int)) or p == c for p, c in zip(pattern, path)
+    )
+
+
+class _Frame:
+    __slots__ = ("kind", "path", "key", "index", "stream")
+
+    def __init__(self, kind: str, path: Path, stream: Path = None):
+        self.kind = kind  # "{" or "["
+        self.path = path
+        self.key = None
+        self.index = 0
+        self.stream = stream  # pattern of a selected array, whose elements are decoded one by one
+
+
+class JSONStreamDecoder:
+    """
+    Push parser that extracts parts of one JSON document.
+
+    ``arrays`` and ``fields`` are path patterns such as ("events",) or
+    ("responses", "*", "status"). Each element of an array matching ``arrays``
+    is decoded as it completes and passed to ``on_item(pattern, path, value)``;
+    a value matching ``fields`` is passed to ``on_field(pattern, path, value)``.
+    Objects and arrays on the way to a pattern are walked; anything else is
+    scanned past without being decoded. Call ``feed`` with each chunk of text,
+    then ``close``.
+    """
+
+    def __init__(
+        self,
+        arrays: Sequence[Path],
+        fields: Sequence[Path],
+        on_item: Callable[[Path, Path, Any], None],
+        on_field: Callable[[Path, Path, Any], None]
+    ):
+        self.arrays = tuple(arrays)
+        self.fields = tuple(fields)
+        self.on_item = on_item
+        self.on_field = on_field
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._frames = []
+        self._state = "value"
+        self._path: Path = ()
+        self._skip_started = False
+        self._skip_depth = 0
+        self._skip_in_string = False
+        self.done = False
+
+    def feed(self, text: str) -> None:
+        # Keep only the unconsumed tail (at most one element being completed)
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        self._run(final=False)
+
+    def close(self) -> None:
+        self._run(final=True)
+        if not self.done:
+            raise ValueError("JSON stream ended before the document was complete")
+
+    # ---- helpers ----
+    def _match(self, patterns: Sequence[Path], path: Path) -> Path:
+        for pattern in patterns:
+            if path_matches(pattern, path):
+                return pattern
+        return None
+
+    def _leads_somewhere(self, path: Path) -> bool:
+        """True if some pattern lies strictly below ``path``."""
+        depth = len(path)
+        return any(
+            len(pattern) > depth and path_matches(pattern[:depth], path)
+            for pattern in self.arrays + self.fields
+        )
+
+    def _skip_whitespace(self) -> bool:
+        self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+        return self._pos < len(self._buf)
+
+    def _decode_value(self, final: bool):
+        """Decode the complete value at the cursor; returns (True, value) or (False, None) if more text is needed."""
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return False, None
+        if not final and not isinstance(value, (dict, list, str)) and (end == len(self._buf) or self._buf[end] in _NUMBER_CHARS):
+            return False, None  # a number may continue in the next chunk ("12" then ".5")
+        self._pos = end
+        return True, value
+
+    def _value_done(self) -> None:
+        self._state = "after_value"
+
+    # ---- state machine ----
+    def _run(self, final: bool) -> None:
+        buf = self._buf
+        while not self.done:
+            state = self._state
+            if state == "skip":
+                if not self._skip(final):
+                    return
+                continue
+            if not self._skip_whitespace():
+                if final and state == "after_value" and not self._frames:
+                    self.done = True
+                return
+            char = buf[self._pos]
+            frames = self._frames
+            top = frames[-1] if frames else None
+
+            if state == "value":
+                if char == "]" and top is not None and top.kind == "[":
+                    frames.pop()  # empty array
+                    self._pos += 1
+                    self._value_done()
+                    continue
+                path = self._path
+                pattern = top.stream if top is not None and top.kind == "[" else None
+                if pattern is None:
+                    pattern = self._match(self.fields, path)
+                    handler = self.on_field
+                else:
+                    handler = self.on_item
+                if pattern is not None:
+                    complete, value = self._decode_value(final)
+                    if not complete:
+                        return
+                    handler(pattern, path, value)
+                    self._value_done()
+                elif char in "{[" and (self._leads_somewhere(path) or (char == "[" and self._match(self.arrays, path))):
+                    frame = _Frame(char, path, self._match(self.arrays, path) if char == "[" else None)
+                    frames.append(frame)
+                    self._pos += 1
+                    if char == "{":
+                        self._state = "key"
+                    else:
+                        self._path = path + (0,)
+                else:
+                    self._state = "skip"
+                    self._skip_started = False
+                    self._skip_depth = 0
+
+            elif state == "key":
+                if char == "}":
+                    frames.pop()
+                    self._pos += 1
+                    self._value_done()
+                    continue
+                complete, key = self._decode_value(final)
+                if not complete:
+                    return
+                top.key = key
+                self._path = top.path + (key,)
+                self._state = "colon"
+
+            elif state == "colon":
+                if char != ":":
+                    raise ValueError(f"Expected ':' in JSON stream, got {char!r}")
+                self._pos += 1
+                self._state = "value"
+
+            else:  # after_value
+                if top is None:
+                    self.done = True  # trailing text after the document is ignored
+                    return
+                self._pos += 1
+                if char == ",":
+                    if top.kind == "{":
+                        self._state = "key"
+                    else:
+                        top.index += 1
+                        self._path = top.path + (top.index,)
+                        self._state = "value"
+                elif char in "}]":
+                    frames.pop()
+                else:
+                    raise ValueError(f"Unexpected {char!r} in JSON stream")
+
+    def _skip(self, final: bool) -> bool:
+        """Advance past the value at the cursor without decoding it. Returns False if more text is needed."""
+        buf = self._buf
+        while True:
+            if self._skip_in_string:
+                self._pos = _STRING_BODY.match(buf, self._pos).end()
+                if self._pos >= len(buf) or buf[self._pos] != '"':
+                    return False  # string (or an escape) continues in the next chunk
+                self._pos += 1
+                self._skip_in_string = False
+                if self._skip_depth == 0:
+                    self._value_done()
+                    return True
+            elif not self._skip_started:
+                if not self._skip_whitespace():
+                    return False
+                self._skip_started = True
+                char = buf[self._pos]
+                if char == '"':
+                    self._skip_in_string = True
+                    self._pos += 1
+                elif char in "{[":
+                    self._skip_depth = 1
+                    self._pos += 1
+            elif self._skip_depth == 0:
+                # number or literal: runs until the next delimiter
+                match = _SCALAR_END.search(buf, self._pos)
+                if match is None:
+                    self._pos = len(buf)
+                    if final:
+                        self._value_done()
+                        return True
+                    return False
+                self._pos = match.start()
+                self._value_done()
+                return True
+            else:
+                match = _CONTAINER_SPECIAL.search(buf, self._pos)
+                if match is None:
+                    self._pos = len(buf)
+                    return False
+                self._pos = match.end()
+                char = match.group()
+                if char == '"':
+                    self._skip_in_string = True
+                elif char in "{[":
+                    self._skip_depth += 1
+                else:
+                    self._skip_depth -= 1
+                    if self._skip_depth == 0:
+                        self._value_done()
+                        return True
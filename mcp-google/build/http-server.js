@@ -754,6 +754,42 @@ var ListEventsHandler = class extends BaseToolHandler {
     }
     return this.fetchMultipleCalendarEvents(client, calendarIds, options);
   }
+  /**
+   * Incremental sync for a single calendar using Google sync tokens.
+   *
+   * Without a syncToken this performs a full sync of [timeMin, timeMax) and
+   * returns the nextSyncToken. With a syncToken only events changed since that
+   * token are returned (deleted events have status "cancelled"); time bounds
+   * and ordering are not allowed in that mode, per the Calendar API.
+   */
+  async syncEvents(client, calendarId, options) {
+    const calendar = this.getCalendar(client);
+    const events = [];
+    let pageToken = void 0;
+    let nextSyncToken = null;
+    try {
+      do {
+        const response = await calendar.events.list({
+          calendarId,
+          singleEvents: true,
+          maxResults: 2500,
+          pageToken,
+          ...options.syncToken ? { syncToken: options.syncToken } : { timeMin: options.timeMin, timeMax: options.timeMax }
+        });
+        for (const event of response.data.items || []) {
+          events.push({ ...event, calendarId });
+        }
+        pageToken = response.data.nextPageToken || void 0;
+        nextSyncToken = response.data.nextSyncToken || nextSyncToken;
+      } while (pageToken);
+    } catch (error) {
+      if (options.syncToken && (error?.code === 410 || error?.response?.status === 410)) {
+        return { events: [], nextSyncToken: null, syncTokenExpired: true };
+      }
+      throw this.handleGoogleApiError(error);
+    }
+    return { events, nextSyncToken, syncTokenExpired: false };
+  }
   async fetchSingleCalendarEvents(client, calendarId, options) {
     try {
       const calendar = this.getCalendar(client);
@@ -1382,25 +1418,66 @@ var toolNameMap = {
   "delete-event": "delete-event",
   "list-calendars": "list-calendars"
 };
-app.post("/mcp/calendar", async (req, res) => {
+async function checkAuth() {
   try {
     const tokensValid = await tokenManager.validateTokens();
     if (!tokensValid) {
-      return res.status(401).json({
-        error: "Authentication token is invalid or expired and could not be refreshed. Please re-run the authentication flow.",
-        content: []
-      });
+      return {
+        status: 401,
+        body: {
+          error: "Authentication token is invalid or expired and could not be refreshed. Please re-run the authentication flow.",
+          content: []
+        }
+      };
     }
   } catch (authError) {
     console.error("Token validation failed:", authError);
-    return res.status(401).json({
-      error: "Failed to validate authentication tokens.",
-      content: []
-    });
+    return {
+      status: 401,
+      body: {
+        error: "Failed to validate authentication tokens.",
+        content: []
+      }
+    };
   }
+  return null;
+}
+async function runAction(action, params) {
   try {
-    const { action, params } = req.body;
     const toolName = toolNameMap[action] || action;
+    if (toolName === "list-events" && params && (params.sync || params.syncToken)) {
+      const calendarId = params.calendarId;
+      if (typeof calendarId !== "string" || !calendarId) {
+        return {
+          status: 400,
+          body: {
+            error: "A single calendarId is required for list-events sync",
+            content: []
+          }
+        };
+      }
+      const handler = new ListEventsHandler();
+      const synced = await handler.syncEvents(oauth2Client, calendarId, {
+        syncToken: params.syncToken,
+        timeMin: params.timeMin,
+        timeMax: params.timeMax
+      });
+      return {
+        status: 200,
+        body: {
+          content: [
+            {
+              type: "text",
+              text: synced.syncTokenExpired ? "Sync token expired; a full sync is required." : `Synced ${synced.events.length} event(s) from ${calendarId}.`
+            }
+          ],
+          raw: synced.events,
+          events: synced.events,
+          nextSyncToken: synced.nextSyncToken,
+          syncTokenExpired: synced.syncTokenExpired
+        }
+      };
+    }
     const mcpRequest = {
       method: "tools/call",
       params: {
@@ -1490,14 +1567,47 @@ app.post("/mcp/calendar", async (req, res) => {
         console.error("Error getting raw event data:", e);
       }
     }
-    res.json(result);
+    return { status: 200, body: result };
   } catch (error) {
     console.error("Error handling request:", error);
-    res.status(500).json({
-      error: error.message || "Internal server error",
+    return {
+      status: 500,
+      body: {
+        error: error.message || "Internal server error",
+        content: []
+      }
+    };
+  }
+}
+app.post("/mcp/calendar", async (req, res) => {
+  const authFailure = await checkAuth();
+  if (authFailure) {
+    return res.status(authFailure.status).json(authFailure.body);
+  }
+  const { action, params } = req.body;
+  const { status, body } = await runAction(action, params);
+  res.status(status).json(body);
+});
+var MAX_BATCH_REQUESTS = parseInt(process.env.MAX_BATCH_REQUESTS || "50", 10);
+app.post("/mcp/calendar/batch", async (req, res) => {
+  const requests = req.body && req.body.requests;
+  if (!Array.isArray(requests)) {
+    return res.status(400).json({ error: "requests must be an array", content: [] });
+  }
+  if (requests.length > MAX_BATCH_REQUESTS) {
+    return res.status(400).json({
+      error: `At most ${MAX_BATCH_REQUESTS} requests per batch`,
       content: []
     });
   }
+  const authFailure = await checkAuth();
+  if (authFailure) {
+    return res.status(authFailure.status).json(authFailure.body);
+  }
+  const responses = await Promise.all(
+    requests.map((item) => runAction(item && item.action, item && item.params))
+  );
+  res.json({ responses });
 });
 var PORT = process.env.PORT || 3e3;
 async function startServer() {
@@ -1505,6 +1615,7 @@ async function startServer() {
   app.listen(PORT, () => {
     console.log(`MCP HTTP Server running on http://localhost:${PORT}`);
     console.log(`Endpoint: http://localhost:${PORT}/mcp/calendar`);
+    console.log(`Batch endpoint: http://localhost:${PORT}/mcp/calendar/batch`);
   });
 }
 startServer().catch(console.error);
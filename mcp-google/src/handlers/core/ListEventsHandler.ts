@@ -14,6 +14,13 @@ interface ExtendedEvent extends calendar_v3.Schema$Event {
 
 type ListEventsArgs = z.infer<typeof ListEventsArgumentsSchema>;
 
+export interface SyncEventsResult {
+    events: ExtendedEvent[];
+    nextSyncToken: string | null;
+    // True when Google rejected the sync token (HTTP 410) and a full sync is required.
+    syncTokenExpired: boolean;
+}
+
 export class ListEventsHandler extends BaseToolHandler {
     async runTool(args: any, oauth2Client: OAuth2Client): Promise<CallToolResult> {
         const validArgs = ListEventsArgumentsSchema.parse(args);
@@ -48,6 +55,51 @@ export class ListEventsHandler extends BaseToolHandler {
         return this.fetchMultipleCalendarEvents(client, calendarIds, options);
     }
 
+    /**
+     * Incremental sync for a single calendar using Google sync tokens.
+     *
+     * Without a syncToken this performs a full sync of [timeMin, timeMax) and
+     * returns the nextSyncToken. With a syncToken only events changed since that
+     * token are returned (deleted events have status "cancelled"); time bounds
+     * and ordering are not allowed in that mode, per the Calendar API.
+     */
+    public async syncEvents(
+        client: OAuth2Client,
+        calendarId: string,
+        options: { syncToken?: string; timeMin?: string; timeMax?: string }
+    ): Promise<SyncEventsResult> {
+        const calendar = this.getCalendar(client);
+        const events: ExtendedEvent[] = [];
+        let pageToken: string | undefined = undefined;
+        let nextSyncToken: string | null = null;
+
+        try {
+            do {
+                const response: any = await calendar.events.list({
+                    calendarId,
+                    singleEvents: true,
+                    maxResults: 2500,
+                    pageToken,
+                    ...(options.syncToken
+                        ? { syncToken: options.syncToken }
+                        : { timeMin: options.timeMin, timeMax: options.timeMax })
+                });
+                for (const event of response.data.items || []) {
+                    events.push({ ...event, calendarId });
+                }
+                pageToken = response.data.nextPageToken || undefined;
+                nextSyncToken = response.data.nextSyncToken || nextSyncToken;
+            } while (pageToken);
+        } catch (error: any) {
+            if (options.syncToken && (error?.code === 410 || error?.response?.status === 410)) {
+                return { events: [], nextSyncToken: null, syncTokenExpired: true };
+            }
+            throw this.handleGoogleApiError(error);
+        }
+
+        return { events, nextSyncToken, syncTokenExpired: false };
+    }
+
     private async fetchSingleCalendarEvents(
         client: OAuth2Client,
         calendarId: string,
@@ -41,31 +41,82 @@ const toolNameMap: Record<string, string> = {
   "list-calendars": "list-calendars",
 };
 
-app.post("/mcp/calendar", async (req, res) => {
-  // Ensure the Google access token is fresh on every request. The access token
-  // lives ~1 hour; validateTokens() refreshes it via the long-lived refresh
-  // token when it is expired or nearing expiry.
+interface ActionResult {
+  status: number;
+  body: any;
+}
+
+// Ensure the Google access token is fresh before serving a request. The access
+// token lives ~1 hour; validateTokens() refreshes it via the long-lived refresh
+// token when it is expired or nearing expiry. Returns an error result, or null.
+async function checkAuth(): Promise<ActionResult | null> {
   try {
     const tokensValid = await tokenManager.validateTokens();
     if (!tokensValid) {
-      return res.status(401).json({
-        error:
-          "Authentication token is invalid or expired and could not be refreshed. Please re-run the authentication flow.",
-        content: [],
-      });
+      return {
+        status: 401,
+        body: {
+          error:
+            "Authentication token is invalid or expired and could not be refreshed. Please re-run the authentication flow.",
+          content: [],
+        },
+      };
     }
   } catch (authError) {
     console.error("Token validation failed:", authError);
-    return res.status(401).json({
-      error: "Failed to validate authentication tokens.",
-      content: [],
-    });
+    return {
+      status: 401,
+      body: {
+        error: "Failed to validate authentication tokens.",
+        content: [],
+      },
+    };
   }
+  return null;
+}
 
+async function runAction(action: string, params: any): Promise<ActionResult> {
   try {
-    const { action, params } = req.body;
     const toolName = toolNameMap[action] || action;
 
+    // Incremental sync for list-events: the client passes `sync: true` for a full
+    // sync or the previous `syncToken` to receive only changed/deleted events.
+    if (toolName === "list-events" && params && (params.sync || params.syncToken)) {
+      const calendarId = params.calendarId;
+      if (typeof calendarId !== "string" || !calendarId) {
+        return {
+          status: 400,
+          body: {
+            error: "A single calendarId is required for list-events sync",
+            content: [],
+          },
+        };
+      }
+      const handler = new ListEventsHandler();
+      const synced = await handler.syncEvents(oauth2Client, calendarId, {
+        syncToken: params.syncToken,
+        timeMin: params.timeMin,
+        timeMax: params.timeMax,
+      });
+      return {
+        status: 200,
+        body: {
+          content: [
+            {
+              type: "text",
+              text: synced.syncTokenExpired
+                ? "Sync token expired; a full sync is required."
+                : `Synced ${synced.events.length} event(s) from ${calendarId}.`,
+            },
+          ],
+          raw: synced.events,
+          events: synced.events,
+          nextSyncToken: synced.nextSyncToken,
+          syncTokenExpired: synced.syncTokenExpired,
+        },
+      };
+    }
+
     const mcpRequest = {
       method: "tools/call",
       params: {
@@ -163,14 +214,54 @@ app.post("/mcp/calendar", async (req, res) => {
       }
     }
 
-    res.json(result);
+    return { status: 200, body: result };
   } catch (error: any) {
     console.error("Error handling request:", error);
-    res.status(500).json({
-      error: error.message || "Internal server error",
+    return {
+      status: 500,
+      body: {
+        error: error.message || "Internal server error",
+        content: [],
+      },
+    };
+  }
+}
+
+app.post("/mcp/calendar", async (req, res) => {
+  const authFailure = await checkAuth();
+  if (authFailure) {
+    return res.status(authFailure.status).json(authFailure.body);
+  }
+  const { action, params } = req.body;
+  const { status, body } = await runAction(action, params);
+  res.status(status).json(body);
+});
+
+const MAX_BATCH_REQUESTS = parseInt(process.env.MAX_BATCH_REQUESTS || "50", 10);
+
+// Several actions in one HTTP round trip. The body is
+// {"requests": [{"action": ..., "params": ...}, ...]}; the actions run
+// concurrently and {"responses": [{"status": ..., "body": ...}, ...]} comes back
+// in request order, each with the status and body /mcp/calendar would return.
+app.post("/mcp/calendar/batch", async (req, res) => {
+  const requests = req.body && req.body.requests;
+  if (!Array.isArray(requests)) {
+    return res.status(400).json({ error: "requests must be an array", content: [] });
+  }
+  if (requests.length > MAX_BATCH_REQUESTS) {
+    return res.status(400).json({
+      error: `At most ${MAX_BATCH_REQUESTS} requests per batch`,
       content: [],
     });
   }
+  const authFailure = await checkAuth();
+  if (authFailure) {
+    return res.status(authFailure.status).json(authFailure.body);
+  }
+  const responses = await Promise.all(
+    requests.map((item: any) => runAction(item && item.action, item && item.params))
+  );
+  res.json({ responses });
 });
 
 const PORT = process.env.PORT || 3000;
@@ -181,6 +272,7 @@ async function startServer(): Promise<void> {
   app.listen(PORT, () => {
     console.log(`MCP HTTP Server running on http://localhost:${PORT}`);
     console.log(`Endpoint: http://localhost:${PORT}/mcp/calendar`);
+    console.log(`Batch endpoint: http://localhost:${PORT}/mcp/calendar/batch`);
   });
 }
 
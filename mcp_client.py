@@ -0,0 +1,447 @@
+"""
+Process-wide MCP HTTP client.
+Keeps a single pooled aiohttp session so MCP calls reuse keep-alive connections
+instead of paying a new TCP (and TLS) handshake per request. Read actions issued
+close together are coalesced into one request to the server's batch endpoint, and
+list-events responses can be decoded incrementally, one event at a time.
+"""
+
+import os
+import json
+import codecs
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+from dotenv import load_dotenv
+from json_stream import JSONStreamDecoder, Path
+
+# Load environment variables from .env file
+load_dotenv()
+
+# ---------------------------
+# Config (read from .env or env vars)
+# ---------------------------
+MCP_URL = os.getenv("MCP_URL")  # MCP endpoint
+MCP_REQUEST_TIMEOUT = float(os.getenv("MCP_REQUEST_TIMEOUT", 15))  # seconds for MCP calls
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", 20))  # max open connections in total
+MCP_POOL_PER_HOST = int(os.getenv("MCP_POOL_PER_HOST", 10))  # max open connections per host
+MCP_KEEPALIVE_TIMEOUT = float(os.getenv("MCP_KEEPALIVE_TIMEOUT", 30))  # seconds an idle connection is kept
+MCP_BATCH_FLUSH_DELAY_MS = float(os.getenv("MCP_BATCH_FLUSH_DELAY_MS", 2))  # how long a read waits for others to share its batch
+MCP_BATCH_MAX_SIZE = int(os.getenv("MCP_BATCH_MAX_SIZE", 16))  # actions per batch request (1 disables batching)
+MCP_STREAM_CHUNK_SIZE = int(os.getenv("MCP_STREAM_CHUNK_SIZE", 65536))  # bytes read at a time from streamed responses
+
+# Where a list-events response carries its events (the HTTP server repeats the
+# list under "raw" and "events"), and the small fields read next to them.
+EVENT_ARRAYS: Tuple[Path, ...] = (("events",), ("raw",), ("raw", "items"))
+EVENT_RESULT_FIELDS: Tuple[Path, ...] = (("nextSyncToken",), ("syncTokenExpired",), ("error",))
+
+# Actions that may share a batch. Writes are always sent on their own so they
+# are never reordered against reads issued just before or after them.
+BATCHABLE_ACTIONS = {"list-events", "list-calendars", "freebusy"}
+
+
+class MCPHTTPError(RuntimeError):
+    """An MCP call answered with an HTTP error status (kept in ``status``, with the response ``body``)."""
+
+    def __init__(self, status: int, body: str):
+        super().__init__(f"MCP returned {status}: {body}")
+        self.status = status
+        self.body = body
+
+
+class MCPClient:
+    """
+    Pooled HTTP client for the MCP server.
+
+    The underlying aiohttp session is created lazily on first use and is bound
+    to the event loop that created it. If the client is used from a different
+    loop while that loop is still running (e.g. on another thread), the old
+    session is closed on its own loop and a fresh one is opened. A session whose
+    loop has stopped can no longer be closed, so that raises RuntimeError:
+    callers running their own short-lived loop (asyncio.run) must ``close()``
+    the client before the loop ends.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        pool_size: int = MCP_POOL_SIZE,
+        pool_per_host: int = MCP_POOL_PER_HOST,
+        keepalive_timeout: float = MCP_KEEPALIVE_TIMEOUT,
+        request_timeout: float = MCP_REQUEST_TIMEOUT
+    ):
+        self.url = url or MCP_URL
+        self.pool_size = pool_size
+        self.pool_per_host = pool_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight = 0
+        self._requests = 0
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session for the running loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is not loop:
+            self._retire_session()
+        if self._session is None or self._session.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_per_host,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=self._connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+            self._loop = loop
+        return self._session
+
+    def _retire_session(self) -> None:
+        """Close the session opened on another loop, on that loop, before replacing it."""
+        session, loop = self._session, self._loop
+        if loop is None or loop.is_closed() or not loop.is_running():
+            raise RuntimeError(
+                "MCPClient session belongs to an event loop that is no longer running; "
+                "await close() (or close_mcp_client()) before that loop ends"
+            )
+        asyncio.run_coroutine_threadsafe(session.close(), loop)
+        self._session = None
+        self._connector = None
+        self._loop = None
+
+    async def post(self, payload: dict, url: Optional[str] = None) -> dict:
+        """Send JSON payload to the MCP endpoint and return JSON response."""
+        session = self._ensure_session()
+        self._in_flight += 1
+        self._requests += 1
+        try:
+            async with session.post(url or self.url, json=payload) as resp:
+                text = await resp.text()
+                if resp.status >= 400:
+                    raise MCPHTTPError(resp.status, text)
+                try:
+                    return json.loads(text)
+                except json.JSONDecodeError:
+                    return {"raw": text}
+        finally:
+            self._in_flight -= 1
+
+    async def post_stream(
+        self,
+        payload: dict,
+        arrays: Sequence[Path],
+        fields: Sequence[Path],
+        on_item: Callable[[Path, Path, Any], None],
+        on_field: Callable[[Path, Path, Any], None],
+        url: Optional[str] = None
+    ) -> None:
+        """
+        Send JSON payload and decode the response as it arrives (see JSONStreamDecoder):
+        elements of ``arrays`` go to ``on_item`` one by one and values at ``fields``
+        to ``on_field``; the rest of the body is skipped without being kept.
+        """
+        session = self._ensure_session()
+        self._in_flight += 1
+        self._requests += 1
+        try:
+            async with session.post(url or self.url, json=payload) as resp:
+                if resp.status >= 400:
+                    raise MCPHTTPError(resp.status, await resp.text())
+                decoder = JSONStreamDecoder(arrays, fields, on_item, on_field)
+                text = codecs.getincrementaldecoder("utf-8")()
+                async for chunk in resp.content.iter_chunked(MCP_STREAM_CHUNK_SIZE):
+                    decoder.feed(text.decode(chunk))
+                decoder.feed(text.decode(b"", final=True))
+                decoder.close()
+        finally:
+            self._in_flight -= 1
+
+    async def stream_events(self, payload: dict, on_event: Callable[[Dict], None], url: Optional[str] = None) -> Dict:
+        """
+        Send a list-events payload, passing each event to ``on_event`` as it is
+        decoded. Returns the response's sync fields (nextSyncToken, syncTokenExpired, error).
+        """
+        router = EventRouter(on_event)
+        await self.post_stream(
+            payload, EVENT_ARRAYS, EVENT_RESULT_FIELDS,
+            lambda pattern, path, event: router.item(pattern, event),
+            lambda pattern, path, value: router.field(pattern[-1], value),
+            url
+        )
+        return router.fields
+
+    async def close(self) -> None:
+        """Close the pooled session (and all of its connections)."""
+        session = self._session
+        self._session = None
+        self._connector = None
+        self._loop = None
+        if session is not None and not session.closed:
+            await session.close()
+
+    def pool_stats(self) -> Dict[str, Optional[int]]:
+        """
+        Return connection pool metrics for sizing the pool.
+
+        - open: connections currently held open (in use + idle)
+        - in_use: connections currently serving a request
+        - idle: keep-alive connections waiting to be reused
+        - waiting: requests queued because the pool limit was reached
+
+        The connection counts come from aiohttp internals and are None if this
+        aiohttp version doesn't have them; the request counts are tracked here.
+        """
+        in_use = idle = waiting = 0
+        connector = self._connector
+        if connector is not None and not connector.closed:
+            # aiohttp does not expose these counters publicly; read them defensively.
+            in_use = _private_count(lambda: len(connector._acquired))
+            idle = _private_count(lambda: sum(len(conns) for conns in connector._conns.values()))
+            waiting = _private_count(lambda: sum(len(waiters) for waiters in connector._waiters.values()))
+        return {
+            "open": in_use + idle if in_use is not None and idle is not None else None,
+            "in_use": in_use,
+            "idle": idle,
+            "waiting": waiting,
+            "in_flight_requests": self._in_flight,
+            "total_requests": self._requests,
+            "pool_size": self.pool_size,
+            "pool_per_host": self.pool_per_host,
+        }
+
+
+def _private_count(read: Callable[[], int]) -> Optional[int]:
+    """Read a count from aiohttp's private connector state, or None if it has changed shape."""
+    try:
+        return int(read())
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class EventRouter:
+    """
+    Collects one list-events response from a stream: events are passed on from
+    the first events array that has any (the others are repeats) and the sync
+    fields are kept in ``fields``.
+    """
+
+    def __init__(self, on_event: Callable[[Dict], None]):
+        self.on_event = on_event
+        self.source: Optional[Path] = None
+        self.fields: Dict[str, Any] = {}
+
+    def item(self, pattern: Path, event: Any) -> None:
+        if self.source is None:
+            self.source = pattern
+        if pattern == self.source and isinstance(event, dict):
+            self.on_event(event)
+
+    def field(self, name: str, value: Any) -> None:
+        self.fields[name] = value
+
+
+class MCPBatcher:
+    """
+    Coalesces MCP read actions into batch requests.
+
+    ``post`` queues the payload and waits. The queue is sent as one POST to
+    ``<url>/batch`` once ``flush_delay`` seconds pass after the first queued
+    action, or as soon as ``max_batch`` actions are waiting. Each caller then
+    gets its own response (or error) from the batch. A lone action and writes
+    go through ``client.post`` unchanged. If the server has no batch endpoint
+    (404), batching is turned off for that URL and actions are sent one by one.
+
+    ``stream_events`` does the same for list-events calls whose events are
+    decoded incrementally; they are batched among themselves, and each
+    caller's events are routed to it while the batch response streams in.
+    """
+
+    def __init__(
+        self,
+        client: MCPClient,
+        flush_delay: float = MCP_BATCH_FLUSH_DELAY_MS / 1000,
+        max_batch: int = MCP_BATCH_MAX_SIZE
+    ):
+        self.client = client
+        self.flush_delay = flush_delay
+        self.max_batch = max_batch
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # (url, streamed) -> queued (payload, future, event sink), and the timer that flushes it
+        self._pending: Dict[Tuple[str, bool], List[Tuple[dict, asyncio.Future, Optional[Callable]]]] = {}
+        self._timers: Dict[Tuple[str, bool], asyncio.TimerHandle] = {}
+        self._unsupported = set()  # urls whose server has no batch endpoint
+        self.batches = 0
+        self.batched_actions = 0
+        self.direct_actions = 0
+
+    def _batchable(self, payload: dict, url: str) -> bool:
+        return (
+            self.max_batch > 1
+            and payload.get("action") in BATCHABLE_ACTIONS
+            and url not in self._unsupported
+        )
+
+    async def post(self, payload: dict, url: Optional[str] = None) -> dict:
+        """Send one MCP action, sharing a batch request with concurrent reads when possible."""
+        url = url or self.client.url
+        if not self._batchable(payload, url):
+            self.direct_actions += 1
+            return await self.client.post(payload, url)
+        return await self._enqueue(url, payload, None)
+
+    async def stream_events(self, payload: dict, on_event: Callable[[Dict], None], url: Optional[str] = None) -> Dict:
+        """Like MCPClient.stream_events, sharing a batch request with concurrent list-events calls."""
+        url = url or self.client.url
+        if not self._batchable(payload, url):
+            self.direct_actions += 1
+            return await self.client.stream_events(payload, on_event, url)
+        return await self._enqueue(url, payload, on_event)
+
+    async def _enqueue(self, url: str, payload: dict, on_event: Optional[Callable]):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queues and timers belong to the loop that created them
+            self._pending, self._timers, self._loop = {}, {}, loop
+        key = (url, on_event is not None)
+        future = loop.create_future()
+        queue = self._pending.setdefault(key, [])
+        queue.append((payload, future, on_event))
+        if len(queue) >= self.max_batch:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.flush_delay, self._flush, key)
+        return await future
+
+    def _flush(self, key: Tuple[str, bool]) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        queue = [entry for entry in self._pending.pop(key, []) if not entry[1].done()]
+        if queue:
+            asyncio.ensure_future(self._send(key[0], queue))
+
+    async def _send(self, url: str, queue: List[Tuple[dict, asyncio.Future, Optional[Callable]]]) -> None:
+        if len(queue) == 1:
+            self.direct_actions += 1
+            await self._send_one(url, *queue[0])
+            return
+        batch_url = f"{url.rstrip('/')}/batch"
+        payload = {"requests": [entry[0] for entry in queue]}
+        try:
+            if queue[0][2] is not None:
+                outcomes = await self._stream_batch(batch_url, payload, queue)
+            else:
+                result = await self.client.post(payload, batch_url)
+                responses = result.get("responses")
+                if not isinstance(responses, list) or len(responses) != len(queue):
+                    raise RuntimeError(f"MCP batch returned {len(responses or [])} responses for {len(queue)} requests")
+                outcomes = [(response.get("status", 200), response.get("body")) for response in responses]
+        except MCPHTTPError as e:
+            if e.status == 404:
+                print(f"MCP server at {url} has no batch endpoint; sending actions individually")
+                self._unsupported.add(url)
+                self.direct_actions += len(queue)
+                await asyncio.gather(*(self._send_one(url, *entry) for entry in queue))
+                return
+            self._fail(queue, e)
+            return
+        except Exception as e:
+            self._fail(queue, e)
+            return
+
+        self.batches += 1
+        self.batched_actions += len(queue)
+        for (_, future, _), (status, body) in zip(queue, outcomes):
+            if future.done():
+                continue  # caller gave up
+            if status >= 400:
+                future.set_exception(MCPHTTPError(status, json.dumps(body)))
+            else:
+                future.set_result(body if isinstance(body, dict) else {"raw": body})
+
+    async def _stream_batch(self, batch_url: str, payload: dict, queue) -> List[Tuple[int, Dict]]:
+        """Stream a batch of list-events calls, routing each response's events to its caller."""
+        routers = [EventRouter(on_event) for _, _, on_event in queue]
+        statuses: Dict[int, int] = {}
+        body = ("responses", "*", "body")
+
+        def on_item(pattern: Path, path: Path, event: Any) -> None:
+            if path[1] < len(routers):
+                routers[path[1]].item(pattern[len(body):], event)
+
+        def on_field(pattern: Path, path: Path, value: Any) -> None:
+            if path[1] >= len(routers):
+                return
+            if pattern == ("responses", "*", "status"):
+                statuses[path[1]] = value
+            else:
+                routers[path[1]].field(pattern[-1], value)
+
+        await self.client.post_stream(
+            payload,
+            [body + array for array in EVENT_ARRAYS],
+            [("responses", "*", "status")] + [body + field for field in EVENT_RESULT_FIELDS],
+            on_item, on_field, batch_url
+        )
+        if len(statuses) != len(queue):
+            raise RuntimeError(f"MCP batch returned {len(statuses)} responses for {len(queue)} requests")
+        return [(statuses[i], router.fields) for i, router in enumerate(routers)]
+
+    async def _send_one(self, url: str, payload: dict, future: asyncio.Future, on_event: Optional[Callable]) -> None:
+        try:
+            if on_event is not None:
+                result = await self.client.stream_events(payload, on_event, url)
+            else:
+                result = await self.client.post(payload, url)
+        except Exception as e:
+            self._fail([(payload, future, on_event)], e)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _fail(queue, error: Exception) -> None:
+        for _, future, _ in queue:
+            if not future.done():
+                future.set_exception(error)
+
+    def stats(self) -> Dict[str, float]:
+        """Return batch counters; ``avg_batch_size`` is actions per batch request."""
+        return {
+            "batches": self.batches,
+            "batched_actions": self.batched_actions,
+            "direct_actions": self.direct_actions,
+            "avg_batch_size": round(self.batched_actions / self.batches, 2) if self.batches else 0.0,
+            "flush_delay_ms": self.flush_delay * 1000,
+            "max_batch": self.max_batch,
+        }
+
+
+# ---------------------------
+# Process-wide client
+# ---------------------------
+_client: Optional[MCPClient] = None
+_batcher: Optional[MCPBatcher] = None
+
+def get_mcp_client() -> MCPClient:
+    """Return the process-wide MCP client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = MCPClient()
+    return _client
+
+def get_mcp_batcher() -> MCPBatcher:
+    """Return the process-wide batcher in front of the MCP client, creating it on first use."""
+    global _batcher
+    if _batcher is None:
+        _batcher = MCPBatcher(get_mcp_client())
+    return _batcher
+
+async def close_mcp_client() -> None:
+    """Close the process-wide MCP client's session. Safe to call more than once."""
+    if _client is not None:
+        await _client.close()
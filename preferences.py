@@ -3,10 +3,17 @@ Preference-based scheduling system for calendar agent.
 Implements complex preference logic for suggesting available meeting times.
 """
 
+import asyncio
 import datetime
-from typing import List, Dict, Optional, Tuple
+import hashlib
+import heapq
+import itertools
+from bisect import bisect_left
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 from zoneinfo import ZoneInfo
 import re
+from cache import LRUCache
+from event_index import IntervalIndex, ColumnarIntervals, OccupancyBitmap, int64_column
 
 def resolve_timezone(tz) -> datetime.tzinfo:
     """
@@ -65,15 +72,72 @@ def is_time_rejected(start_iso: str, end_iso: str, rejected_times: set = None) -
 # Meeting Analysis
 # ---------------------------
 
-def is_online_meeting(event: Dict) -> bool:
+class KeywordMatcher:
     """
-    Determine if an event is online based on meeting links and location.
-    
-    Logic:
-    - If event has conferenceData with video entry point (Google Meet, Zoom, etc.) → online
-    - If no meeting link AND has location → in-person
-    - If no meeting link AND no location → check description/keywords for online indicators
+    Precompiled keyword set shared by the meeting classifiers.
+
+    Keywords are lowercased and deduplicated, and any keyword that contains a
+    shorter one is dropped (text containing "google meet" already contains
+    "meet"), so each text is scanned for the fewest keywords possible. Matching
+    uses str's substring search, which outruns a combined regex alternation on
+    long descriptions in CPython. Pass lowercased text.
     """
+    __slots__ = ("keywords",)
+
+    def __init__(self, keywords: List[str]):
+        kept: List[str] = []
+        for keyword in sorted({k.lower() for k in keywords}, key=lambda k: (len(k), k)):
+            if not any(shorter in keyword for shorter in kept):
+                kept.append(keyword)
+        self.keywords = tuple(kept)
+
+    def search(self, *texts: str) -> bool:
+        """True if any keyword occurs in any of the (lowercased) texts."""
+        return any(keyword in text for text in texts if text for keyword in self.keywords)
+
+# Explicit meeting links (checked in description, summary and location)
+MEETING_LINK_KEYWORDS = KeywordMatcher([
+    "meet.google.com", "zoom.us", "teams.microsoft.com", "webex.com",
+    "https://meet.google.com", "http://meet.google.com"
+])
+
+# Other online indicators (checked in description and summary only)
+ONLINE_KEYWORDS = KeywordMatcher([
+    "zoom", "meet", "teams", "webex", "google meet", "video call",
+    "online", "virtual", "link:", "call"
+])
+
+FRIENDLY_KEYWORDS = KeywordMatcher([
+    "lunch", "dinner", "hangout", "catchup", "catch up", "drinks",
+    "pub", "coffee", "tea", "brunch", "breakfast", "social",
+    "friend", "friends", "casual", "informal"
+])
+
+# is_online_meeting results, keyed by (event id, etag) or a hash of the fields it reads
+CLASSIFICATION_CACHE_SIZE = 4096
+classification_cache = LRUCache(max_entries=CLASSIFICATION_CACHE_SIZE)
+
+# Event fields the scheduler reads once an event has been classified (ids for
+# de-duplication and sync, times, status, and the summary shown for conflicts)
+PROJECTED_EVENT_FIELDS = ("id", "iCalUID", "etag", "status", "start", "end", "summary")
+# Set by project_event: the is_online_meeting result, computed before the
+# fields it reads (description, location, conferenceData) were dropped
+ONLINE_FLAG_FIELD = "_isOnline"
+
+def _classification_key(event: Dict) -> Tuple:
+    event_id = event.get("id")
+    etag = event.get("etag")
+    if event_id and etag:
+        return ("etag", event_id, etag)
+    # No etag (e.g. a hand-built event): hash exactly the fields the classifier reads
+    digest = hashlib.blake2b(digest_size=16)
+    for entry in (event.get("conferenceData") or {}).get("entryPoints", []) or []:
+        digest.update(f"{entry.get('entryPointType', '')}\x1f{entry.get('uri', '')}\x1e".encode())
+    for field in ("description", "summary", "location"):
+        digest.update(b"\x1d" + str(event.get(field, "")).encode())
+    return ("content", digest.digest())
+
+def _classify_online(event: Dict) -> bool:
     # First check for conferenceData (Google Meet, Zoom, etc.)
     conference_data = event.get("conferenceData", {})
     if conference_data:
@@ -85,33 +149,56 @@ def is_online_meeting(event: Dict) -> bool:
             if entry_type == "video" or "meet.google.com" in uri or "zoom.us" in uri or "teams.microsoft.com" in uri:
                 return True
     
-    # Check for meeting links in description/summary
     description = event.get("description", "").lower()
     summary = event.get("summary", "").lower()
     location = event.get("location", "").lower()
     
-    # Check for explicit meeting links in text
-    meeting_link_keywords = [
-        "meet.google.com", "zoom.us", "teams.microsoft.com", "webex.com",
-        "https://meet.google.com", "http://meet.google.com"
-    ]
-    text = f"{description} {summary} {location}"
-    if any(keyword in text for keyword in meeting_link_keywords):
+    # Check for explicit meeting links in text. Fields are searched separately
+    # rather than joined: no remaining keyword contains a space, so the result is the same.
+    if MEETING_LINK_KEYWORDS.search(description, summary, location):
         return True
     
     # If there's a location specified and no meeting link, it's in-person
     if location and location.strip():
         return False
     
-    # If no location and no meeting link, check for other online indicators in description
-    online_keywords = [
-        "zoom", "meet", "teams", "webex", "google meet", "video call",
-        "online", "virtual", "link:", "call"
-    ]
-    
+    # If no location and no meeting link, check for other online indicators.
     # Only check description/summary (not location, since we already checked that)
-    text = f"{description} {summary}"
-    return any(keyword in text for keyword in online_keywords)
+    return ONLINE_KEYWORDS.search(description, summary)
+
+def is_online_meeting(event: Dict) -> bool:
+    """
+    Determine if an event is online based on meeting links and location.
+    
+    Logic:
+    - If event has conferenceData with video entry point (Google Meet, Zoom, etc.) → online
+    - If no meeting link AND has location → in-person
+    - If no meeting link AND no location → check description/keywords for online indicators
+
+    Results are memoized per (event id, etag), falling back to a content hash.
+    Projected events (see project_event) carry their result in ONLINE_FLAG_FIELD.
+    """
+    flagged = event.get(ONLINE_FLAG_FIELD)
+    if flagged is not None:
+        return flagged
+    key = _classification_key(event)
+    cached = classification_cache.get(key)
+    if cached is None:
+        cached = _classify_online(event)
+        classification_cache.put(key, cached)
+    return cached
+
+def project_event(event: Dict) -> Dict:
+    """
+    Reduce an event to the fields the scheduler uses, classifying it first.
+    Descriptions, attendees, conference data etc. are dropped, so a large
+    calendar costs a few small dicts per event; cancelled events (sync deltas)
+    are kept as-is apart from the projection.
+    """
+    projected = {field: event[field] for field in PROJECTED_EVENT_FIELDS if field in event}
+    if event.get("status") != "cancelled":
+        projected[ONLINE_FLAG_FIELD] = is_online_meeting(event)
+    return projected
 
 def is_friendly_meeting(description: str) -> bool:
     """
@@ -119,16 +206,507 @@ def is_friendly_meeting(description: str) -> bool:
     """
     if not description:
         return False
+    return FRIENDLY_KEYWORDS.search(description.lower())
+
+# ---------------------------
+# Normalized Events
+# ---------------------------
+
+# Existing in-person events block this much time before and after them
+INPERSON_BUFFER_SECONDS = 30 * 60
+
+def parse_iso_safe(iso_str: Optional[str]) -> Optional[datetime.datetime]:
+    """
+    Parse an event ISO string, handling 'Z', offsets, naive datetimes and
+    all-day dates. Naive values are treated as UTC.
+    """
+    if not iso_str:
+        return None
+    # Handle 'Z' timezone
+    if iso_str.endswith('Z'):
+        iso_str = iso_str[:-1] + '+00:00'
+    # Handle timezone offset formats
+    elif '+' in iso_str[-6:] or '-' in iso_str[-6:]:
+        # Already has timezone, try as-is
+        pass
+    else:
+        # No timezone, add UTC
+        if 'T' in iso_str:
+            if '.' in iso_str:
+                iso_str = iso_str.split('.')[0] + '+00:00'
+            else:
+                iso_str = iso_str + '+00:00'
+        else:
+            iso_str = iso_str + 'T00:00:00+00:00'
     
-    description_lower = description.lower()
-    
-    friendly_keywords = [
-        "lunch", "dinner", "hangout", "catchup", "catch up", "drinks",
-        "pub", "coffee", "tea", "brunch", "breakfast", "social",
-        "friend", "friends", "casual", "informal"
-    ]
-    
-    return any(keyword in description_lower for keyword in friendly_keywords)
+    dt = datetime.datetime.fromisoformat(iso_str)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt
+
+class NormalizedEvent:
+    """
+    Compact, parse-once view of a calendar event used by the preference engine.
+
+    start/end are UTC epoch seconds; is_online is the is_online_meeting()
+    classification and all_day marks date-only (all-day) events. The original
+    event dict is kept in ``event`` for display fields such as the summary, and
+    ``calendar`` records which calendar it came from when several are merged.
+    """
+    __slots__ = ("start", "end", "is_online", "all_day", "event", "calendar")
+
+    def __init__(self, start: int, end: int, is_online: bool, all_day: bool, event: Dict, calendar: Optional[str] = None):
+        self.start = start
+        self.end = end
+        self.is_online = is_online
+        self.all_day = all_day
+        self.event = event
+        self.calendar = calendar
+
+    @property
+    def busy_start(self) -> int:
+        """Start of the time this event blocks (30 min earlier for in-person events)."""
+        return self.start if self.is_online else self.start - INPERSON_BUFFER_SECONDS
+
+    @property
+    def busy_end(self) -> int:
+        """End of the time this event blocks (30 min later for in-person events)."""
+        return self.end if self.is_online else self.end + INPERSON_BUFFER_SECONDS
+
+    def start_datetime(self, tz=None) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.start, resolve_timezone(tz))
+
+    def end_datetime(self, tz=None) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.end, resolve_timezone(tz))
+
+    def __repr__(self) -> str:
+        return f"NormalizedEvent(start={self.start}, end={self.end}, is_online={self.is_online}, all_day={self.all_day})"
+
+def _time_string(value) -> Optional[str]:
+    """The ISO string of an event's start/end field ({"dateTime"}, {"date"} or a bare string)."""
+    if isinstance(value, dict):
+        return value.get("dateTime") or value.get("date")
+    return value
+
+def normalize_event(event: Dict) -> Optional[NormalizedEvent]:
+    """Parse one event dict. Returns None if it has no usable start/end."""
+    if not isinstance(event, dict):
+        return None
+    start_value = event.get("start")
+    end_value = event.get("end")
+    # Handle different event formats
+    start_str = _time_string(start_value)
+    end_str = _time_string(end_value)
+    if not start_str or not end_str:
+        return None
+    try:
+        start = parse_iso_safe(start_str)
+        end = parse_iso_safe(end_str)
+        if not start or not end:
+            return None
+        is_online = is_online_meeting(event)
+    except Exception:
+        return None
+    all_day = isinstance(start_value, dict) and not start_value.get("dateTime") and bool(start_value.get("date"))
+    return NormalizedEvent(int(start.timestamp()), int(end.timestamp()), is_online, all_day, event)
+
+def normalize_events(events) -> List[NormalizedEvent]:
+    """
+    Normalize a fetched event window once, sorted by start time.
+    Lists that are already normalized are returned unchanged, so every
+    preference function can accept either raw events or normalized ones.
+    """
+    if isinstance(events, EventWindow):
+        return events.events
+    if not events:
+        return []
+    if isinstance(events, list) and isinstance(events[0], NormalizedEvent):
+        return events
+    normalized = []
+    for event in events:
+        if isinstance(event, NormalizedEvent):
+            normalized.append(event)
+            continue
+        item = normalize_event(event)
+        if item is not None:
+            normalized.append(item)
+    normalized.sort(key=lambda e: e.start)
+    return normalized
+
+class EventWindow:
+    """
+    A fetched event window, normalized once and indexed for availability queries.
+
+    ``busy_index`` covers every event with the in-person buffer applied (the
+    is_slot_free rule). Conflict listing for a requested time ignores all-day
+    events and only applies the buffer when the proposed meeting is in-person
+    (the check_busy rule); those indexes are built on first use.
+    Iterating an EventWindow yields its NormalizedEvents in start order.
+
+    ``use_bitmap`` attaches an AvailabilityBitmap over a fixed horizon; is_free
+    (and so is_slot_free) then answers from the bitmap in O(1) and only falls
+    back to the index for slots it can't answer.
+    """
+
+    def __init__(self, events: List[NormalizedEvent]):
+        self.events = events
+        self.busy_index = IntervalIndex((e.busy_start, e.busy_end, e) for e in events)
+        self._timed_index: Optional[IntervalIndex] = None
+        self._timed_busy_index: Optional[IntervalIndex] = None
+        self._columns: Optional[EventColumns] = None
+        self._starts: Optional[List[int]] = None
+        self.bitmap: Optional[AvailabilityBitmap] = None
+
+    @classmethod
+    def from_events(cls, events) -> "EventWindow":
+        """Build a window from raw or normalized events (an EventWindow is returned as-is)."""
+        if isinstance(events, EventWindow):
+            return events
+        return cls(normalize_events(events))
+
+    @classmethod
+    def from_calendars(cls, events_by_calendar: Dict[str, List[Dict]]) -> "EventWindow":
+        """
+        Build one window from several calendars' events (raw lists or EventWindows).
+
+        Each calendar is normalized (sorted by start) and tagged with its id, then
+        the sorted timelines are combined with a k-way merge. An event that appears
+        on more than one calendar (e.g. a shared invite) is kept once, attributed
+        to the first calendar it was listed under.
+        """
+        timelines = []
+        for calendar, events in events_by_calendar.items():
+            # Tagged copies, since normalized events may be shared with a cached window
+            timelines.append([
+                NormalizedEvent(e.start, e.end, e.is_online, e.all_day, e.event, calendar)
+                for e in normalize_events(events)
+            ])
+        merged: List[NormalizedEvent] = []
+        seen = set()
+        for event in heapq.merge(*timelines, key=lambda e: e.start):
+            uid = event.event.get("iCalUID") or event.event.get("id")
+            if uid is not None:
+                key = (uid, event.start, event.end)
+                if key in seen:
+                    continue
+                seen.add(key)
+            merged.append(event)
+        return cls(merged)
+
+    def slice(self, start: float, end: float) -> "EventWindow":
+        """
+        A new window of the events overlapping [start, end) (epoch seconds), the
+        set list-events returns for that range, reusing the normalized events.
+        """
+        count = bisect_left(self.starts, end)  # events starting before `end`
+        return EventWindow([e for e in self.events[:count] if e.end > start])
+
+    @property
+    def starts(self) -> List[int]:
+        if self._starts is None:
+            self._starts = [e.start for e in self.events]
+        return self._starts
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def use_bitmap(self, horizon_start: datetime.datetime, horizon_end: datetime.datetime, resolution_seconds: int = 60) -> "AvailabilityBitmap":
+        """Build the availability bitmap for [horizon_start, horizon_end) and use it for slot checks."""
+        self.bitmap = AvailabilityBitmap(self.events, horizon_start, horizon_end, resolution_seconds)
+        return self.bitmap
+
+    def is_free(self, start: float, end: float) -> bool:
+        """True if [start, end) (epoch seconds) clears every event and in-person buffer."""
+        if self.bitmap is not None:
+            free = self.bitmap.is_free(start, end)
+            if free is not None:
+                return free
+        return not self.busy_index.overlaps_any(start, end)
+
+    @property
+    def columns(self) -> "EventColumns":
+        """Columnar view of the window for batch slot evaluation, built on first use."""
+        if self._columns is None:
+            self._columns = EventColumns(self.events)
+        return self._columns
+
+    def free_mask(self, starts, ends):
+        """Vectorized is_free over arrays of candidate starts/ends (epoch seconds)."""
+        if self.bitmap is not None:
+            # Each bitmap check is already O(1)
+            return [self.is_free(start, end) for start, end in zip(starts, ends)]
+        return self.columns.busy.free_mask(starts, ends)
+
+    def conflicts(self, start: float, end: float, inperson: bool = False) -> List[NormalizedEvent]:
+        """Timed events overlapping [start, end), in start order; in-person buffers apply when ``inperson``."""
+        # Payloads are positions in self.events so results come back in event order
+        if inperson:
+            if self._timed_busy_index is None:
+                self._timed_busy_index = IntervalIndex(
+                    (e.busy_start, e.busy_end, i) for i, e in enumerate(self.events) if not e.all_day
+                )
+            positions = self._timed_busy_index.conflicts(start, end)
+        else:
+            if self._timed_index is None:
+                self._timed_index = IntervalIndex(
+                    (e.start, e.end, i) for i, e in enumerate(self.events) if not e.all_day
+                )
+            positions = self._timed_index.conflicts(start, end)
+        return [self.events[i] for i in sorted(positions)]
+
+class EventColumns:
+    """
+    Structure-of-arrays view of an EventWindow: int64 start/end columns and the
+    buffered (busy) start/end columns, in event order. ``busy`` evaluates whole
+    candidate grids against the buffered columns (the is_slot_free rule).
+    Columns are NumPy arrays when NumPy is installed, lists of ints otherwise.
+    """
+    __slots__ = ("starts", "ends", "busy_starts", "busy_ends", "busy")
+
+    def __init__(self, events: List[NormalizedEvent]):
+        self.starts = int64_column(e.start for e in events)
+        self.ends = int64_column(e.end for e in events)
+        self.busy_starts = int64_column(e.busy_start for e in events)
+        self.busy_ends = int64_column(e.busy_end for e in events)
+        self.busy = ColumnarIntervals(self.busy_starts, self.busy_ends)
+
+class AvailabilityBitmap:
+    """
+    Minute-resolution occupancy of a fixed horizon (e.g. check_busy's 14 days),
+    built once per event fetch as an alternative availability backend.
+
+    Two layers are kept: ``meetings`` marks the events themselves (what an
+    online proposal conflicts with) and ``buffers`` marks the 30 minutes around
+    in-person events. A slot check is an O(1) prefix-sum range test; the
+    buffered rule (is_slot_free) requires both layers to be clear.
+    """
+
+    def __init__(
+        self,
+        events: List[NormalizedEvent],
+        horizon_start: datetime.datetime,
+        horizon_end: datetime.datetime,
+        resolution_seconds: int = 60
+    ):
+        origin = int(horizon_start.timestamp())
+        end = int(horizon_end.timestamp())
+        self.meetings = OccupancyBitmap(((e.start, e.end) for e in events), origin, end, resolution_seconds)
+        buffers = []
+        for e in events:
+            if not e.is_online:
+                buffers.append((e.busy_start, e.start))
+                buffers.append((e.end, e.busy_end))
+        self.buffers = OccupancyBitmap(buffers, origin, end, resolution_seconds)
+
+    def is_free(self, start: float, end: float, buffered: bool = True) -> Optional[bool]:
+        """
+        O(1) availability of [start, end) (epoch seconds), or None if the slot
+        leaves the horizon or events don't align to the resolution.
+        """
+        free = self.meetings.is_free(start, end)
+        if not buffered or not free:
+            return free
+        return self.buffers.is_free(start, end)
+
+class SlotGrid:
+    """
+    Candidate slots evaluated against an EventWindow in one vectorized pass.
+
+    The suggestion loops build their full 14-day grid up front, then look each
+    slot up here instead of checking it individually. Slots that were not part
+    of the grid fall back to a single index lookup.
+    """
+
+    def __init__(self, window: EventWindow, slots: List[Tuple[datetime.datetime, datetime.datetime]]):
+        self.window = window
+        starts = [int(start.timestamp()) for start, _ in slots]
+        ends = [int(end.timestamp()) for _, end in slots]
+        mask = window.free_mask(starts, ends)
+        self._free = {(start, end): bool(free) for start, end, free in zip(starts, ends, mask)}
+
+    def is_free(self, start: datetime.datetime, end: datetime.datetime) -> bool:
+        key = (int(start.timestamp()), int(end.timestamp()))
+        free = self._free.get(key)
+        if free is None:
+            free = self.window.is_free(*key)
+        return free
+
+def daily_slots(
+    first_day: datetime.date,
+    days: int,
+    times: List[Tuple[int, int]],
+    zone: datetime.tzinfo,
+    duration_minutes: int,
+    weekdays_only: bool = False
+) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+    """Candidate (start, end) slots at the given wall-clock times on each of ``days`` days from first_day."""
+    slots = []
+    for day_offset in range(days):
+        check_date = first_day + datetime.timedelta(days=day_offset)
+        if weekdays_only and check_date.weekday() >= 5:
+            continue
+        for hour, minute in times:
+            slot_start = datetime.datetime.combine(check_date, datetime.time(hour, minute)).replace(tzinfo=zone)
+            slots.append((slot_start, slot_start + datetime.timedelta(minutes=duration_minutes)))
+    return slots
+
+# ---------------------------
+# Candidate Pipeline
+# ---------------------------
+# Suggestions are produced lazily: rule sources generate candidate slots in
+# their own preference order, ranked_merge interleaves sources by rank, filters
+# drop past / today / rejected / busy slots as candidates are pulled, and the
+# consumer takes only as many as it needs.
+
+class Candidate:
+    """A proposed slot from a preference rule; ``rank`` orders candidates across rules."""
+    __slots__ = ("start", "end", "reason", "rank")
+
+    def __init__(self, start: datetime.datetime, end: datetime.datetime, reason: str, rank: Tuple):
+        self.start = start
+        self.end = end
+        self.reason = reason
+        self.rank = rank
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (format_iso_datetime(self.start), format_iso_datetime(self.end))
+
+    def as_suggestion(self) -> Dict[str, str]:
+        start_iso, end_iso = self.key
+        return {"start_iso": start_iso, "end_iso": end_iso, "reason": self.reason}
+
+# Rule sources
+
+def around_online_meetings(window: EventWindow, duration_minutes: int, priority: int = 0) -> Iterator[Candidate]:
+    """
+    Slots right before and right after each online meeting, 9:30 AM - 7:00 PM.
+    Reasons stay generic so suggestions don't reveal other meetings.
+
+    The window is checked on each meeting's own clock (the UTC offset its start
+    and end were written with), not the viewer's timezone, and meetings are
+    taken in start order, the order list-events returns them in.
+    """
+    duration = datetime.timedelta(minutes=duration_minutes)
+    seq = itertools.count()
+    for event in window:
+        if not event.is_online:
+            continue
+        event_start = parse_iso_safe(_time_string(event.event.get("start"))) or event.start_datetime()
+        event_end = parse_iso_safe(_time_string(event.event.get("end"))) or event.end_datetime()
+        before_time = event_start - duration
+        if (before_time.hour, before_time.minute) >= (9, 30) and before_time.hour < 19:
+            yield Candidate(before_time, event_start, "Available time slot", (priority, next(seq)))
+        after_end = event_end + duration
+        if event_end.hour < 19 and after_end.hour <= 19:
+            yield Candidate(event_end, after_end, "Available time slot", (priority, next(seq)))
+
+def daily_candidates(
+    first_day: datetime.date,
+    days: int,
+    times: List[Tuple[int, int]],
+    zone: datetime.tzinfo,
+    duration_minutes: int,
+    reason: Callable[[datetime.datetime], str],
+    priority: int = 0,
+    weekdays_only: bool = False
+) -> Iterator[Candidate]:
+    """Slots at the given wall-clock times on each day, ranked by (day, position in ``times``)."""
+    for start, end in daily_slots(first_day, days, times, zone, duration_minutes, weekdays_only):
+        yield Candidate(start, end, reason(start), (priority, start.date(), times.index((start.hour, start.minute))))
+
+def weekday_evening_fallbacks(first_day: datetime.date, zone, duration_minutes: int, priority: int = 1) -> Iterator[Candidate]:
+    """6:00 PM, 5:30 PM and 5:00 PM (in that order) on weekdays for 14 days, ending by 7:59 PM."""
+    candidates = daily_candidates(
+        first_day, 14, [(18, 0), (17, 30), (17, 0)], zone, duration_minutes,
+        lambda start: f"{format_time(start).lstrip('0')} on {start.strftime('%A, %B %d')}",
+        priority, weekdays_only=True
+    )
+    return (c for c in candidates if c.end.hour <= 19)
+
+def saturday_mornings(today: datetime.date, zone, duration_minutes: int, weeks: int = 1, priority: int = 2) -> Iterator[Candidate]:
+    """10:30 AM on the next ``weeks`` Saturdays (never today)."""
+    days_until_saturday = (5 - today.weekday()) % 7 or 7
+    for week in range(weeks):
+        saturday_date = today + datetime.timedelta(days=days_until_saturday + 7 * week)
+        for start, end in daily_slots(saturday_date, 1, [(10, 30)], zone, duration_minutes):
+            yield Candidate(start, end, f"Saturday 10:30 AM ({saturday_date.strftime('%B %d')})", (priority, saturday_date, 0))
+
+def meal_times(first_day: datetime.date, zone, duration_minutes: int, priority: int = 0) -> Iterator[Candidate]:
+    """Lunch (12:00 PM) and dinner (6:30 PM) for 14 days, in day order."""
+    lunch = daily_candidates(first_day, 14, [(12, 0)], zone, duration_minutes,
+                             lambda start: f"Lunch time on {start.strftime('%A, %B %d')}", priority)
+    dinner = daily_candidates(first_day, 14, [(18, 30)], zone, duration_minutes,
+                              lambda start: f"Dinner time on {start.strftime('%A, %B %d')}", priority)
+    return ranked_merge(lunch, dinner)
+
+def evening_drinks(first_day: datetime.date, zone, duration_minutes: int, priority: int = 1) -> Iterator[Candidate]:
+    """7:30 PM for 14 days."""
+    return daily_candidates(first_day, 14, [(19, 30)], zone, duration_minutes,
+                            lambda start: f"Evening on {start.strftime('%A, %B %d')}", priority)
+
+def afternoon_coffee(first_day: datetime.date, zone, duration_minutes: int, priority: int = 0) -> Iterator[Candidate]:
+    """4:00 PM for 14 days."""
+    return daily_candidates(first_day, 14, [(16, 0)], zone, duration_minutes,
+                            lambda start: f"4:00 PM on {start.strftime('%A, %B %d')}", priority)
+
+def next_week_afternoons(today: datetime.date, zone, duration_minutes: int, priority: int = 1) -> Iterator[Candidate]:
+    """3, 4 and 5 PM on the weekdays of the week starting 7 days from today."""
+    return daily_candidates(today + datetime.timedelta(days=7), 7, [(15, 0), (16, 0), (17, 0)], zone, duration_minutes,
+                            lambda start: f"{start.hour}:00 PM on {start.strftime('%A, %B %d')}",
+                            priority, weekdays_only=True)
+
+# Merge, filters and consumer
+
+def ranked_merge(*sources: Iterator[Candidate]) -> Iterator[Candidate]:
+    """Lazily merge sources (each already in rank order) by rank; ties keep source order."""
+    return heapq.merge(*sources, key=lambda candidate: candidate.rank)
+
+def available(
+    candidates: Iterator[Candidate],
+    now: datetime.datetime,
+    is_free: Callable[[datetime.datetime, datetime.datetime], bool],
+    rejected_times: set = None,
+    exclude: set = None
+) -> Iterator[Candidate]:
+    """
+    Filter a candidate stream lazily: future, not today, not rejected, not a
+    duplicate (or in ``exclude``), and free. The availability check runs last,
+    only for candidates that pass the cheap tests.
+    """
+    seen = set(exclude or ())
+    for candidate in candidates:
+        if candidate.start <= now or candidate.start.date() <= now.date():
+            continue
+        key = candidate.key
+        if key in seen or is_time_rejected(key[0], key[1], rejected_times):
+            continue
+        seen.add(key)
+        if is_free(candidate.start, candidate.end):
+            yield candidate
+
+def take(candidates: Iterator[Candidate], count: int, group: Optional[Callable[[Candidate], object]] = None) -> List[Dict[str, str]]:
+    """
+    Pull up to ``count`` suggestions. With ``group``, a group that is already
+    started is finished before stopping (e.g. lunch and dinner of the same day).
+    """
+    taken: List[Dict[str, str]] = []
+    last_group = None
+    for candidate in candidates:
+        if len(taken) >= count and (group is None or group(candidate) != last_group):
+            break
+        taken.append(candidate.as_suggestion())
+        if group is not None:
+            last_group = group(candidate)
+        elif len(taken) >= count:
+            break
+    return taken
+
+def candidate_day(candidate: Candidate) -> datetime.date:
+    return candidate.start.date()
 
 # ---------------------------
 # Preference Logic: Online Meetings
@@ -152,210 +730,35 @@ async def suggest_online_times(
     Wall-clock preference times (e.g. 6:00 PM) are interpreted in ``local_tz``
     (an IANA name or tzinfo; defaults to UTC) so the returned ISO instants are
     correct for that zone.
+
+    Rules, in order: right before/after other online meetings (9:30 AM - 7:00 PM),
+    then 6:00 / 5:30 / 5:00 PM on weekdays, then Saturday 10:30 AM. Never today.
     """
-    suggestions = []
     zone = resolve_timezone(local_tz)
 
     # Get current time to ensure we don't suggest past times
     now = datetime.datetime.now(datetime.timezone.utc)
-    
-    # Preference 1: Time window 9:30 AM - 7:00 PM
-    preferred_start_hour = 9
-    preferred_start_minute = 30
-    preferred_end_hour = 19  # 7 PM
-    
-    # Preference 2: Try to schedule around other online meetings
-    online_events = [e for e in events if is_online_meeting(e)]
-    
-    # Collect suggestions from all online events, but limit to avoid too many
-    for event in online_events:
-        if len(suggestions) >= 5:  # Stop if we have enough suggestions
-            break
-        event_start_str = event.get("start", {}).get("dateTime") or event.get("start", {}).get("date", "")
-        event_end_str = event.get("end", {}).get("dateTime") or event.get("end", {}).get("date", "")
-        if not event_start_str or not event_end_str:
-            continue
-        try:
-            # Parse ISO format strings, handling 'Z' timezone and various formats
-            def parse_iso_safe(iso_str):
-                if not iso_str:
-                    return None
-                # Handle 'Z' timezone
-                if iso_str.endswith('Z'):
-                    iso_str = iso_str[:-1] + '+00:00'
-                # Handle timezone offset formats
-                elif '+' in iso_str[-6:] or '-' in iso_str[-6:]:
-                    # Already has timezone, try as-is
-                    pass
-                else:
-                    # No timezone, add UTC
-                    if 'T' in iso_str:
-                        if '.' in iso_str:
-                            iso_str = iso_str.split('.')[0] + '+00:00'
-                        else:
-                            iso_str = iso_str + '+00:00'
-                    else:
-                        iso_str = iso_str + 'T00:00:00+00:00'
-                
-                dt = datetime.datetime.fromisoformat(iso_str)
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=datetime.timezone.utc)
-                return dt
-            
-            event_start = parse_iso_safe(event_start_str)
-            event_end = parse_iso_safe(event_end_str)
-            if not event_start or not event_end:
-                continue
-        except:
-            continue
-        
-        # Suggest right before (if within preferred window, in the future, and not today)
-        before_time = event_start - datetime.timedelta(minutes=duration_minutes)
-
-        if (before_time > now and  # Must be in the future
-            before_time.date() > now.date() and  # Must not be today
-            (before_time.hour > preferred_start_hour or 
-            (before_time.hour == preferred_start_hour and before_time.minute >= preferred_start_minute))):
-            if before_time.hour < preferred_end_hour:
-                # Check if this slot is free
-                slot_end = event_start
-                start_iso = format_iso_datetime(before_time)
-                end_iso = format_iso_datetime(slot_end)
-                if not is_time_rejected(start_iso, end_iso, rejected_times):
-                    is_free = await is_slot_free(before_time, slot_end, events, mcp_post_func, buffer_minutes=0, calendar_email=calendar_email)
-                    if is_free:
-                        # Use generic reason - don't reveal information about other meetings
-                        suggestions.append({
-                            "start_iso": start_iso,
-                            "end_iso": end_iso,
-                            "reason": "Available time slot"  # Generic reason, no private info
-                        })
-                        if len(suggestions) >= 5:  # Stop if we have enough
-                            break
-        
-        # Suggest right after (if within preferred window, in the future, and not today)
-        if len(suggestions) >= 5:  # Stop if we have enough before checking "after"
-            break
-        after_time = event_end
-        slot_end = after_time + datetime.timedelta(minutes=duration_minutes)
-        if (after_time > now and  # Must be in the future
-            after_time.date() > now.date() and  # Must not be today
-            after_time.hour < preferred_end_hour and 
-            slot_end.hour <= preferred_end_hour):
-            # Check if this slot is free (with 15 min buffer if previous was in-person)
-            buffer = 15 if not is_online_meeting(event) else 0
-            start_iso = format_iso_datetime(after_time)
-            end_iso = format_iso_datetime(slot_end)
-            if not is_time_rejected(start_iso, end_iso, rejected_times):
-                if await is_slot_free(after_time, slot_end, events, mcp_post_func, buffer_minutes=buffer, calendar_email=calendar_email):
-                    # Use generic reason - don't reveal information about other meetings
-                    suggestions.append({
-                        "start_iso": start_iso,
-                        "end_iso": end_iso,
-                        "reason": "Available time slot"  # Generic reason, no private info
-                    })
-                    if len(suggestions) >= 5:  # Stop if we have enough
-                        break
-    
-    # Preference 3: Continue generating suggestions even if we have some
-    # This ensures we have multiple options (before/after + fallbacks)
-    # Preference 4: Fallback to 6:00 PM, 5:30 PM, and 5:00 PM on free weekdays
-    if len(suggestions) < 5:  # Generate more if we don't have enough yet
-        # Always start from tomorrow (never suggest for today)
-        today = now.date()
-        start_date_for_suggestions = today + datetime.timedelta(days=1)
-        
-        # Times to suggest: 6:00 PM, 5:30 PM, 5:00 PM (in that order)
-        fallback_times = [
-            (18, 0),   # 6:00 PM
-            (17, 30),  # 5:30 PM
-            (17, 0)    # 5:00 PM
-        ]
-        
-        for day_offset in range(14):  # Check next 14 days to find available slots
-            if len(suggestions) >= 5:  # Stop if we have enough
-                break
-            check_date = start_date_for_suggestions + datetime.timedelta(days=day_offset)
-            if check_date.weekday() < 5:  # Weekday (Mon-Fri)
-                # Try each time slot for this date
-                for hour, minute in fallback_times:
-                    if len(suggestions) >= 5:  # Stop if we have enough
-                        break
-                    suggested_time = datetime.datetime.combine(
-                        check_date,
-                        datetime.time(hour, minute)
-                    ).replace(tzinfo=zone)
-                    slot_end = suggested_time + datetime.timedelta(minutes=duration_minutes)
-                    
-                    # Ensure it's in the future and within preferred hours
-                    if suggested_time > now and slot_end.hour <= preferred_end_hour:
-                        start_iso = format_iso_datetime(suggested_time)
-                        end_iso = format_iso_datetime(slot_end)
-                        if not is_time_rejected(start_iso, end_iso, rejected_times):
-                            # NOTE: This is in suggest_online_times, so is_inperson_meeting=False
-                            # But we should still check for conflicts with in-person events
-                            # For online meetings, we don't need the 30min buffer, but we should still avoid conflicts
-                            if await is_slot_free(suggested_time, slot_end, events, mcp_post_func, buffer_minutes=0, calendar_email=calendar_email, is_inperson_meeting=False):
-                                # Format time string for display
-                                if hour == 18:
-                                    time_str = "6:00 PM"
-                                elif hour == 17 and minute == 30:
-                                    time_str = "5:30 PM"
-                                elif hour == 17:
-                                    time_str = "5:00 PM"
-                                else:
-                                    time_str = f"{hour}:{minute:02d} PM" if hour >= 12 else f"{hour}:{minute:02d} AM"
-                                suggestions.append({
-                                    "start_iso": start_iso,
-                                    "end_iso": end_iso,
-                                    "reason": f"{time_str} on {check_date.strftime('%A, %B %d')}"
-                                })
-                                if len(suggestions) >= 5:
-                                    break
-    
-    # Preference 5: Saturday 10:30 AM or next week
-    if len(suggestions) < 5:  # Generate more if we don't have enough yet
-        # Try Saturday 10:30 AM - always skip today
-        today = now.date()
-        days_until_saturday = (5 - today.weekday()) % 7
-        if days_until_saturday == 0:
-            # If today is Saturday, always use next Saturday
-            days_until_saturday = 7
-        
-        saturday_date = today + datetime.timedelta(days=days_until_saturday)
-        saturday_time = datetime.datetime.combine(
-            saturday_date,
-            datetime.time(10, 30)  # 10:30 AM
-        ).replace(tzinfo=zone)
-        slot_end = saturday_time + datetime.timedelta(minutes=duration_minutes)
-        
-        # Ensure it's in the future
-        if saturday_time > now:
-            start_iso = format_iso_datetime(saturday_time)
-            end_iso = format_iso_datetime(slot_end)
-            if not is_time_rejected(start_iso, end_iso, rejected_times):
-                if await is_slot_free(saturday_time, slot_end, events, mcp_post_func, buffer_minutes=0, calendar_email=calendar_email):
-                    suggestions.append({
-                        "start_iso": start_iso,
-                        "end_iso": end_iso,
-                        "reason": f"Saturday 10:30 AM ({saturday_date.strftime('%B %d')})"
-                    })
-    
-    # Deduplicate by (start_iso, end_iso) while preserving order
-    seen = set()
-    unique = []
-    for s in suggestions:
-        key = (s['start_iso'], s['end_iso'])
-        if key not in seen:
-            seen.add(key)
-            unique.append(s)
+    tomorrow = now.date() + datetime.timedelta(days=1)
+
+    # Parse and index the event window once; every slot check below reuses it
+    events = EventWindow.from_events(events)
+    # Evaluate the 14-day fallback grid in one vectorized pass
+    grid = SlotGrid(events, daily_slots(tomorrow, 14, [(18, 0), (17, 30), (17, 0)], zone, duration_minutes, weekdays_only=True))
 
-    return unique[:6]  # Return top 6 suggestions (2 batches of 3)
+    candidates = ranked_merge(
+        around_online_meetings(events, duration_minutes),
+        weekday_evening_fallbacks(tomorrow, zone, duration_minutes),
+        saturday_mornings(now.date(), zone, duration_minutes)
+    )
+    return take(available(candidates, now, grid.is_free, rejected_times), 5)
 
 # ---------------------------
 # Preference Logic: In-Person Meetings
 # ---------------------------
 
+# Where business meetings are suggested
+DEFAULT_BUSINESS_LOCATION = "Crosstown café, Oxford city centre"
+
 async def suggest_inperson_times(
     duration_minutes: int,
     description: str,
@@ -375,171 +778,124 @@ async def suggest_inperson_times(
     Wall-clock preference times (lunch 12 PM, dinner 6:30 PM, etc.) are
     interpreted in ``local_tz`` (an IANA name or tzinfo; defaults to UTC) so the
     returned ISO instants are correct for that zone.
+
+    Friendly meetings get lunch or dinner (whole days, at least 3 slots), or
+    7:30 PM if none are free. Business meetings get 4:00 PM coffee at the
+    default location, or 3-5 PM next week if none are free.
     """
-    suggestions = []
-    location = None
     is_friendly = is_friendly_meeting(description)
     zone = resolve_timezone(local_tz)
+    # Parse and index the event window once; every slot check below reuses it
+    events = EventWindow.from_events(events)
 
     # Get current time to ensure we don't suggest past times
     now = datetime.datetime.now(datetime.timezone.utc)
-    
-    # Preference 1: Determine tone and suggest accordingly
+    tomorrow = now.date() + datetime.timedelta(days=1)
+
+    # Evaluate every candidate the rules below may pull in one vectorized pass
     if is_friendly:
-        # Friendly meetings: lunch, dinner (6:30 PM+), or evening for pub
-        # Always start from tomorrow (never suggest for today)
-        today = now.date()
-        start_date_for_suggestions = today + datetime.timedelta(days=1)
-        
-        for day_offset in range(14):  # Check next 14 days
-            check_date = start_date_for_suggestions + datetime.timedelta(days=day_offset)
-            
-            # Lunch time (12:00 PM)
-            lunch_time = datetime.datetime.combine(
-                check_date,
-                datetime.time(12, 0)
-            ).replace(tzinfo=zone)
-            lunch_end = lunch_time + datetime.timedelta(minutes=duration_minutes)
-            
-            # Only suggest if in the future
-            if lunch_time > now:
-                start_iso = format_iso_datetime(lunch_time)
-                end_iso = format_iso_datetime(lunch_end)
-                if not is_time_rejected(start_iso, end_iso, rejected_times):
-                    if await is_slot_free(lunch_time, lunch_end, events, mcp_post_func, buffer_minutes=0, calendar_email=calendar_email, is_inperson_meeting=True):
-                        suggestions.append({
-                            "start_iso": start_iso,
-                            "end_iso": end_iso,
-                            "reason": f"Lunch time on {check_date.strftime('%A, %B %d')}"
-                        })
-            
-            # Dinner time (6:30 PM+), interpreted in the caller's local timezone.
-            dinner_time = datetime.datetime.combine(
-                check_date,
-                datetime.time(18, 30)
-            ).replace(tzinfo=zone)
-            dinner_end = dinner_time + datetime.timedelta(minutes=duration_minutes)
-            
-            # Only suggest if in the future
-            if dinner_time > now:
-                # Check if this time was already rejected
-                start_iso = format_iso_datetime(dinner_time)
-                end_iso = format_iso_datetime(dinner_end)
-                if rejected_times and (start_iso, end_iso) in rejected_times:
-                    continue  # Skip rejected times
-                
-                is_free = await is_slot_free(dinner_time, dinner_end, events, mcp_post_func, buffer_minutes=0, calendar_email=calendar_email, is_inperson_meeting=True)
-                if is_free:
-                    suggestions.append({
-                        "start_iso": start_iso,
-                        "end_iso": end_iso,
-                        "reason": f"Dinner time on {check_date.strftime('%A, %B %d')}"
-                    })
-            
-            if len(suggestions) >= 3:
-                break
+        grid_slots = daily_slots(tomorrow, 14, [(12, 0), (18, 30), (19, 30)], zone, duration_minutes)
     else:
-        # Business meetings: 4:00 PM coffee/walk
-        location = "Crosstown café, Oxford city centre"
-        # Always start from tomorrow (never suggest for today)
-        today = now.date()
-        start_date_for_suggestions = today + datetime.timedelta(days=1)
-        
-        for day_offset in range(14):  # Check next 14 days
-            check_date = start_date_for_suggestions + datetime.timedelta(days=day_offset)
-            coffee_time = datetime.datetime.combine(
-                check_date,
-                datetime.time(16, 0)  # 4:00 PM
-            ).replace(tzinfo=zone)
-            coffee_end = coffee_time + datetime.timedelta(minutes=duration_minutes)
-            
-            # Only suggest if in the future
-            if coffee_time > now:
-                start_iso = format_iso_datetime(coffee_time)
-                end_iso = format_iso_datetime(coffee_end)
-                if not is_time_rejected(start_iso, end_iso, rejected_times):
-                    if await is_slot_free(coffee_time, coffee_end, events, mcp_post_func, buffer_minutes=0, calendar_email=calendar_email, is_inperson_meeting=True):
-                        suggestions.append({
-                            "start_iso": start_iso,
-                            "end_iso": end_iso,
-                            "reason": f"4:00 PM on {check_date.strftime('%A, %B %d')}"
-                        })
-                        if len(suggestions) >= 3:
-                            break
-    
-    # Preference 2: If initial suggestions don't work, iterate
-    if not suggestions:
-        if is_friendly:
-            # Friendly: flexible, past 7 PM or lunchtime
-            # Always start from tomorrow (never suggest for today)
-            today = now.date()
-            start_date_for_suggestions = today + datetime.timedelta(days=1)
-            
-            for day_offset in range(14):  # Check next 14 days
-                check_date = start_date_for_suggestions + datetime.timedelta(days=day_offset)
-                
-                # Try 7:30 PM
-                evening_time = datetime.datetime.combine(
-                    check_date,
-                    datetime.time(19, 30)
-                ).replace(tzinfo=zone)
-                evening_end = evening_time + datetime.timedelta(minutes=duration_minutes)
-                
-                # Only suggest if in the future
-                if evening_time > now:
-                    start_iso = format_iso_datetime(evening_time)
-                    end_iso = format_iso_datetime(evening_end)
-                    if not is_time_rejected(start_iso, end_iso, rejected_times):
-                        if await is_slot_free(evening_time, evening_end, events, mcp_post_func, buffer_minutes=0, calendar_email=calendar_email, is_inperson_meeting=True):
-                            suggestions.append({
-                                "start_iso": start_iso,
-                                "end_iso": end_iso,
-                                "reason": f"Evening on {check_date.strftime('%A, %B %d')}"
-                            })
-                            if len(suggestions) >= 3:
-                                break
-        else:
-            # Business: 3-5 PM next week
-            today = now.date()
-            # Start from next week (7 days from now)
-            start_date_for_suggestions = today + datetime.timedelta(days=7)
-            
-            for day_offset in range(7):  # Check next week
-                check_date = start_date_for_suggestions + datetime.timedelta(days=day_offset)
-                if check_date.weekday() < 5:  # Weekday
-                    for hour in [15, 16, 17]:  # 3 PM, 4 PM, 5 PM
-                        business_time = datetime.datetime.combine(
-                            check_date,
-                            datetime.time(hour, 0)
-                        ).replace(tzinfo=zone)
-                        business_end = business_time + datetime.timedelta(minutes=duration_minutes)
-                        
-                        # Only suggest if in the future
-                        if business_time > now:
-                            start_iso = format_iso_datetime(business_time)
-                            end_iso = format_iso_datetime(business_end)
-                            if not is_time_rejected(start_iso, end_iso, rejected_times):
-                                if await is_slot_free(business_time, business_end, events, mcp_post_func, buffer_minutes=0, calendar_email=calendar_email, is_inperson_meeting=True):
-                                    suggestions.append({
-                                        "start_iso": start_iso,
-                                        "end_iso": end_iso,
-                                        "reason": f"{hour}:00 PM on {check_date.strftime('%A, %B %d')}"
-                                    })
-                                    if len(suggestions) >= 6:
-                                        break
-                    if len(suggestions) >= 6:
-                        break
-    
-    # Deduplicate by (start_iso, end_iso) while preserving order
-    seen = set()
-    unique = []
-    for s in suggestions:
-        key = (s['start_iso'], s['end_iso'])
-        if key not in seen:
-            seen.add(key)
-            unique.append(s)
+        grid_slots = daily_slots(tomorrow, 14, [(16, 0)], zone, duration_minutes)
+        grid_slots += daily_slots(now.date() + datetime.timedelta(days=7), 7, [(15, 0), (16, 0), (17, 0)], zone, duration_minutes, weekdays_only=True)
+    grid = SlotGrid(events, grid_slots)
+
+    if is_friendly:
+        location = None
+        suggestions = take(available(meal_times(tomorrow, zone, duration_minutes), now, grid.is_free, rejected_times), 3, group=candidate_day)
+        if not suggestions:
+            suggestions = take(available(evening_drinks(tomorrow, zone, duration_minutes), now, grid.is_free, rejected_times), 3)
+    else:
+        location = DEFAULT_BUSINESS_LOCATION
+        suggestions = take(available(afternoon_coffee(tomorrow, zone, duration_minutes), now, grid.is_free, rejected_times), 3)
+        if not suggestions:
+            suggestions = take(available(next_week_afternoons(now.date(), zone, duration_minutes), now, grid.is_free, rejected_times), 6)
+
+    return suggestions, location
+
+# ---------------------------
+# Suggestion Cursors
+# ---------------------------
+
+def suggestion_stream(
+    shown: List[Dict[str, str]],
+    meeting_type: str,
+    duration_minutes: int,
+    description: Optional[str],
+    events,
+    now: datetime.datetime,
+    rejected_times: set = None,
+    local_tz=None
+) -> Iterator[Dict[str, str]]:
+    """
+    Lazily continue a suggestion list past suggest_online_times / suggest_inperson_times.
+
+    Pulls further free, future, not-rejected slots from the same rule sources,
+    every rule in priority order and without the suggestion caps, skipping
+    anything in ``shown``. Slots are generated and checked only as they are
+    pulled, and never past the fetched event window (14 days).
+    """
+    window = EventWindow.from_events(events)
+    zone = resolve_timezone(local_tz)
+    tomorrow = now.date() + datetime.timedelta(days=1)
+    if meeting_type == "online":
+        candidates = ranked_merge(
+            around_online_meetings(window, duration_minutes),
+            weekday_evening_fallbacks(tomorrow, zone, duration_minutes),
+            saturday_mornings(now.date(), zone, duration_minutes, weeks=2)
+        )
+    elif is_friendly_meeting(description or "business meeting"):
+        candidates = ranked_merge(meal_times(tomorrow, zone, duration_minutes), evening_drinks(tomorrow, zone, duration_minutes))
+    else:
+        candidates = ranked_merge(afternoon_coffee(tomorrow, zone, duration_minutes), next_week_afternoons(now.date(), zone, duration_minutes))
+
+    def is_free(start: datetime.datetime, end: datetime.datetime) -> bool:
+        return window.is_free(start.timestamp(), end.timestamp())
+
+    exclude = {(s["start_iso"], s["end_iso"]) for s in shown}
+    for candidate in available(candidates, now, is_free, rejected_times, exclude):
+        yield candidate.as_suggestion()
+
+class SuggestionCursor:
+    """
+    Position in a lazily generated suggestion stream, so "show me more" pages
+    through it without re-fetching events or re-running the preference rules.
+    ``window`` is the (start, end) span the suggestions fall in, and ``lock``
+    lets concurrent "more" requests on one cursor be served one after another.
+    """
+
+    def __init__(
+        self,
+        stream: Iterator[Dict[str, str]],
+        location: Optional[str] = None,
+        calendars: Optional[List[str]] = None,
+        window: Optional[Tuple[datetime.datetime, datetime.datetime]] = None
+    ):
+        self._stream = stream
+        self._next: Optional[Dict[str, str]] = None
+        self.location = location
+        self.calendars = calendars  # calendars the stream was computed from (None: the defaults)
+        self.window = window
+        self.lock = asyncio.Lock()
+        self.served = 0
+
+    def _peek(self) -> Optional[Dict[str, str]]:
+        if self._next is None:
+            self._next = next(self._stream, None)
+        return self._next
 
-    return unique[:6], location  # Return top 6 suggestions (2 batches of 3)
+    @property
+    def has_more(self) -> bool:
+        return self._peek() is not None
+
+    def take(self, count: int) -> List[Dict[str, str]]:
+        """Return up to ``count`` further suggestions."""
+        batch = []
+        while len(batch) < count and self._peek() is not None:
+            batch.append(self._next)
+            self._next = None
+        self.served += len(batch)
+        return batch
 
 # ---------------------------
 # Helper Functions
@@ -549,182 +905,32 @@ async def is_slot_free(
     start: datetime.datetime,
     end: datetime.datetime,
     existing_events: List[Dict],
-    mcp_post_func,  # Kept for compatibility but not used
-    buffer_minutes: int = 0,
-    calendar_email: str = None,  # Kept for compatibility but not used
-    is_inperson_meeting: bool = False  # True if the proposed meeting is in-person
+    buffer_minutes: int = 0
 ) -> bool:
     """
     Check if a time slot is free, considering buffer time.
     Uses the existing_events list to determine availability (no additional MCP calls).
+    existing_events may be raw events, normalized events or an EventWindow; pass an
+    EventWindow when checking many slots so the index is built only once. If the
+    window has an availability bitmap attached (EventWindow.use_bitmap), the check
+    is answered from the bitmap in constant time.
     
     For in-person meetings: requires 30 minutes buffer BEFORE and AFTER any existing in-person event.
     """
     # Add buffer before start (if specified)
-    check_start = start
+    check_start = start.timestamp()
     if buffer_minutes > 0:
-        check_start = start - datetime.timedelta(minutes=buffer_minutes)
-    
-    # Check against existing events (derived from the single list-events call)
-    for event in existing_events:
-        # Handle different event formats
-        event_start_str = None
-        event_end_str = None
-        
-        if isinstance(event, dict):
-            # Try different possible structures
-            if "start" in event:
-                if isinstance(event["start"], dict):
-                    event_start_str = event["start"].get("dateTime") or event["start"].get("date")
-                else:
-                    event_start_str = event["start"]
-            
-            if "end" in event:
-                if isinstance(event["end"], dict):
-                    event_end_str = event["end"].get("dateTime") or event["end"].get("date")
-                else:
-                    event_end_str = event["end"]
-        
-        if not event_start_str or not event_end_str:
-            continue
-        
-        try:
-            # Parse ISO format strings, handling 'Z' timezone and various formats
-            def parse_iso_safe(iso_str):
-                if not iso_str:
-                    return None
-                # Handle 'Z' timezone
-                if iso_str.endswith('Z'):
-                    iso_str = iso_str[:-1] + '+00:00'
-                # Handle timezone offset formats
-                elif '+' in iso_str[-6:] or '-' in iso_str[-6:]:
-                    # Already has timezone, try as-is
-                    pass
-                else:
-                    # No timezone, add UTC
-                    if 'T' in iso_str:
-                        if '.' in iso_str:
-                            iso_str = iso_str.split('.')[0] + '+00:00'
-                        else:
-                            iso_str = iso_str + '+00:00'
-                    else:
-                        iso_str = iso_str + 'T00:00:00+00:00'
-                
-                dt = datetime.datetime.fromisoformat(iso_str)
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=datetime.timezone.utc)
-                return dt
-            
-            event_start = parse_iso_safe(event_start_str)
-            event_end = parse_iso_safe(event_end_str)
-            if not event_start or not event_end:
-                continue
-            
-            # Determine if existing event is in-person
-            existing_is_inperson = not is_online_meeting(event)
-            
-            # For in-person meetings: need 30 min buffer BEFORE and AFTER existing in-person events
-            # IMPORTANT: If the proposed meeting is in-person, we need buffer around existing in-person events
-            # If the proposed meeting is online, we still need buffer around existing in-person events
-            # (can't schedule online right after an in-person event ends)
-            if existing_is_inperson:
-                # Add 30 minutes buffer before the existing event (can't schedule right before)
-                effective_event_start = event_start - datetime.timedelta(minutes=30)
-                # Add 30 minutes buffer after the existing event (can't schedule right after)
-                effective_event_end = event_end + datetime.timedelta(minutes=30)
-            else:
-                effective_event_start = event_start
-                effective_event_end = event_end
-            
-            # Check for overlap: [check_start, end) overlaps [effective_event_start, effective_event_end)
-            # Two intervals overlap if: start1 < end2 AND start2 < end1
-            # For in-person meetings with buffers, we need to ensure no meeting starts within the buffer zone
-            # If suggested meeting starts before buffer ends AND suggested meeting ends after buffer starts, it conflicts
-            # This ensures that if an event ends at 6:00 PM, we can't schedule anything starting before 6:30 PM
-            overlaps = check_start < effective_event_end and effective_event_start < end
-            
-            if overlaps:
-                return False
-        except Exception:
-            continue
+        check_start -= buffer_minutes * 60
+    check_end = end.timestamp()
     
-    # Slot is free if no overlapping events found
-    return True
+    # Check against existing events (derived from the single list-events call).
+    # For in-person meetings: need 30 min buffer BEFORE and AFTER existing in-person events.
+    # If the proposed meeting is online, we still need buffer around existing in-person events
+    # (can't schedule online right after an in-person event ends). The window's busy index
+    # already includes that buffer, so this is a single O(log n) lookup.
+    window = EventWindow.from_events(existing_events)
+    return window.is_free(check_start, check_end)
 
 def format_time(dt: datetime.datetime) -> str:
     """Format datetime for display."""
     return dt.strftime("%I:%M %p")
-
-def get_upcoming_events(events: List[Dict], start_date: datetime.datetime, days: int = 14) -> List[Dict]:
-    """
-    Filter events to get upcoming ones within the specified days.
-    """
-    end_date = start_date + datetime.timedelta(days=days)
-    upcoming = []
-    
-    for event in events:
-        event_start_str = event.get("start", {}).get("dateTime") or event.get("start", {}).get("date", "")
-        if not event_start_str:
-            continue
-        try:
-            # Parse ISO format strings, handling 'Z' timezone and various formats
-            def parse_iso_safe(iso_str):
-                if not iso_str:
-                    return None
-                # Handle 'Z' timezone
-                if iso_str.endswith('Z'):
-                    iso_str = iso_str[:-1] + '+00:00'
-                # Handle timezone offset formats
-                elif '+' in iso_str[-6:] or '-' in iso_str[-6:]:
-                    # Already has timezone, try as-is
-                    pass
-                else:
-                    # No timezone, add UTC
-                    if 'T' in iso_str:
-                        if '.' in iso_str:
-                            iso_str = iso_str.split('.')[0] + '+00:00'
-                        else:
-                            iso_str = iso_str + '+00:00'
-                    else:
-                        iso_str = iso_str + 'T00:00:00+00:00'
-                
-                dt = datetime.datetime.fromisoformat(iso_str)
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=datetime.timezone.utc)
-                return dt
-            
-            event_start = parse_iso_safe(event_start_str)
-            if not event_start:
-                continue
-            if event_start and start_date <= event_start <= end_date:
-                upcoming.append(event)
-        except:
-            continue
-    
-    def get_event_start(event):
-        event_start_str = event.get("start", {}).get("dateTime") or event.get("start", {}).get("date", "")
-        if not event_start_str:
-            return datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
-        try:
-            # Parse ISO format strings, handling 'Z' timezone and various formats
-            if event_start_str.endswith('Z'):
-                event_start_str = event_start_str[:-1] + '+00:00'
-            elif '+' not in event_start_str[-6:] and '-' not in event_start_str[-6:]:
-                # No timezone, add UTC
-                if 'T' in event_start_str:
-                    if '.' in event_start_str:
-                        event_start_str = event_start_str.split('.')[0] + '+00:00'
-                    else:
-                        event_start_str = event_start_str + '+00:00'
-                else:
-                    event_start_str = event_start_str + 'T00:00:00+00:00'
-            
-            event_start = datetime.datetime.fromisoformat(event_start_str)
-            if event_start.tzinfo is None:
-                event_start = event_start.replace(tzinfo=datetime.timezone.utc)
-            return event_start
-        except:
-            return datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
-    
-    return sorted(upcoming, key=get_event_start)
-
@@ -0,0 +1,173 @@
+"""
+Background prefetch of the scheduling horizon.
+Keeps a recent snapshot of each configured calendar's upcoming events in memory,
+refreshed on a timer and right after bookings, so availability checks read from
+memory instead of waiting on MCP. Snapshots older than the staleness bound are
+not served; callers then fetch synchronously as before.
+"""
+
+import time
+import asyncio
+import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from cache import filter_events_to_window
+
+
+class CalendarSnapshot:
+    """Prefetched events for one calendar over [start, end), and when they were fetched."""
+
+    def __init__(self, start: datetime.datetime, end: datetime.datetime, events: List[Dict]):
+        self.start = start
+        self.end = end
+        self.events = list(events)
+        self.index: Any = None  # built from events on first use, dropped when they change
+        self.fetched_at = time.monotonic()
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def covers(self, start: datetime.datetime, end: datetime.datetime) -> bool:
+        return self.start <= start and self.end >= end
+
+
+class CalendarPrefetcher:
+    """
+    Refreshes a snapshot of [now, now + horizon) for every calendar returned by
+    ``calendars_func``, every ``interval`` seconds, using ``load_func(calendar,
+    start, end)``.
+
+    ``get`` serves a request from a snapshot that covers its window and is at
+    most ``max_staleness`` seconds old, and returns None otherwise (the caller
+    falls back to a synchronous fetch). A failed refresh keeps the previous
+    snapshot, which is served until it goes stale. ``get_indexed`` serves the
+    same snapshots as ``index_func(events)`` (e.g. EventWindow.from_events),
+    built once per snapshot.
+    """
+
+    def __init__(
+        self,
+        load_func: Callable[[str, datetime.datetime, datetime.datetime], Awaitable[List[Dict]]],
+        calendars_func: Callable[[], Awaitable[List[str]]],
+        horizon: datetime.timedelta = datetime.timedelta(days=15),
+        interval: float = 30,
+        max_staleness: float = 120,
+        index_func: Optional[Callable[[List[Dict]], Any]] = None
+    ):
+        self.load_func = load_func
+        self.index_func = index_func
+        self.calendars_func = calendars_func
+        self.horizon = horizon
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self._snapshots: Dict[str, CalendarSnapshot] = {}
+        # Bumped on every local write, so a refresh that started before the
+        # write can't overwrite the patched snapshot with older data
+        self._versions: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.hits = 0
+        self.stale = 0
+        self.misses = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the refresh loop on the running event loop (first refresh immediately)."""
+        if not self.running:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop the refresh loop. Snapshots are kept but will go stale."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                calendars = await self.calendars_func()
+                await asyncio.gather(*(self.refresh(calendar) for calendar in calendars))
+            except Exception as e:
+                print(f"Calendar prefetch failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self, calendar: str) -> None:
+        """Fetch [now, now + horizon) for one calendar and replace its snapshot."""
+        version = self._versions.get(calendar, 0)
+        start = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+        end = start + self.horizon
+        try:
+            events = await self.load_func(calendar, start, end)
+        except Exception as e:
+            self.refresh_failures += 1
+            print(f"Calendar prefetch for {calendar} failed: {e}")
+            return
+        if self._versions.get(calendar, 0) != version:
+            return  # a booking landed meanwhile; the refresh it scheduled wins
+        self._snapshots[calendar] = CalendarSnapshot(start, end, events)
+        self.refreshes += 1
+
+    def _fresh_snapshot(self, calendar: str, start: datetime.datetime, end: datetime.datetime) -> Optional[CalendarSnapshot]:
+        snapshot = self._snapshots.get(calendar)
+        if snapshot is None or not snapshot.covers(start, end):
+            self.misses += 1
+            return None
+        if snapshot.age() > self.max_staleness:
+            self.stale += 1
+            return None
+        self.hits += 1
+        return snapshot
+
+    def get(self, calendar: str, start: datetime.datetime, end: datetime.datetime) -> Optional[List[Dict]]:
+        """Events overlapping [start, end) from a fresh covering snapshot, or None."""
+        snapshot = self._fresh_snapshot(calendar, start, end)
+        if snapshot is None:
+            return None
+        return filter_events_to_window(snapshot.events, start, end)
+
+    def get_indexed(self, calendar: str, start: datetime.datetime, end: datetime.datetime) -> Any:
+        """index_func(events) of a fresh snapshot covering [start, end), or None; the caller narrows it."""
+        snapshot = self._fresh_snapshot(calendar, start, end)
+        if snapshot is None:
+            return None
+        if snapshot.index is None:
+            snapshot.index = self.index_func(snapshot.events)
+        return snapshot.index
+
+    def record_write(self, calendar: str, event: Optional[Dict] = None) -> None:
+        """
+        Apply a booking made through this process: patch the created event into
+        the snapshot (or drop the snapshot if there is no event to patch in),
+        then refresh the calendar in the background while the loop is running.
+        """
+        self._versions[calendar] = self._versions.get(calendar, 0) + 1
+        snapshot = self._snapshots.get(calendar)
+        if snapshot is not None:
+            if isinstance(event, dict) and event.get("start") and event.get("end"):
+                event_id = event.get("id")
+                if event_id:
+                    snapshot.events = [e for e in snapshot.events if e.get("id") != event_id]
+                snapshot.events.append(event)
+                snapshot.index = None
+            else:
+                del self._snapshots[calendar]
+        if self.running:
+            asyncio.ensure_future(self.refresh(calendar))
+
+    def stats(self) -> Dict:
+        """Return refresh and read counters and the age of each snapshot."""
+        return {
+            "running": self.running,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "hits": self.hits,
+            "stale": self.stale,
+            "misses": self.misses,
+            "snapshot_age_seconds": {calendar: round(s.age(), 1) for calendar, s in self._snapshots.items()},
+            "interval": self.interval,
+            "max_staleness": self.max_staleness,
+        }
@@ -1,27 +1,34 @@
 # busy_check_agent.py
 import os
+import time
 import asyncio
 import json
 import re
+import hashlib
+import zlib
+import threading
 import uuid
-from typing import List, Dict, Optional, Tuple
+from typing import AsyncIterator, Callable, List, Dict, Optional, Tuple
 import datetime
 from dateutil import parser as dateparser
-import aiohttp
 from dotenv import load_dotenv
+from mcp_client import get_mcp_batcher, close_mcp_client
+from cache import EventWindowCache, CalendarRegistry, LRUCache, SingleFlight
+from calendar_sync import CalendarSyncStore
+from prefetcher import CalendarPrefetcher
 from preferences import (
-    is_online_meeting, is_friendly_meeting,
-    suggest_online_times, suggest_inperson_times,
-    get_upcoming_events, resolve_timezone
+    suggest_online_times, suggest_inperson_times, resolve_timezone,
+    EventWindow, format_iso_datetime, INPERSON_BUFFER_SECONDS,
+    SuggestionCursor, suggestion_stream, project_event
 )
 
 # Load environment variables from .env file
 load_dotenv()
 
 # agent_squad imports (same as your project)
-from agent_squad.orchestrator import AgentSquad
 from agent_squad.agents.openai_agent import OpenAIAgent, OpenAIAgentOptions
-from agent_squad.classifiers.openai_classifier import OpenAIClassifier, OpenAIClassifierOptions
+from agent_registry import AgentRegistry, run_sync, iterate_sync
+from time_parser import parse_time_window, FastPathStats
 
 # ---------------------------
 # Config (read from .env or env vars)
@@ -29,101 +36,147 @@ from agent_squad.classifiers.openai_classifier import OpenAIClassifier, OpenAICl
 MCP_URL = os.getenv("MCP_URL")  # MCP endpoint
 MCP_USER_ID = os.getenv("MCP_USER_ID")
 MCP_CALENDAR_EMAIL = os.getenv("MCP_CALENDAR_EMAIL")  # Calendar email address (optional, defaults to "primary")
+MCP_CALENDAR_IDS = [c.strip() for c in os.getenv("MCP_CALENDAR_IDS", "").split(",") if c.strip()]  # calendars checked together (optional)
+CALENDAR_FETCH_CONCURRENCY = int(os.getenv("CALENDAR_FETCH_CONCURRENCY", 4))  # calendars fetched in parallel
 OPENAI_KEY = os.getenv("OPENAI_API_KEY")  # used by OpenAIAgent
-REQUEST_TIMEOUT = 15  # seconds for MCP calls
+EVENT_CACHE_TTL = float(os.getenv("EVENT_CACHE_TTL", 60))  # seconds a fetched event window stays fresh (0 disables)
+EVENT_CACHE_MAX_ENTRIES = int(os.getenv("EVENT_CACHE_MAX_ENTRIES", 64))
+EVENT_CACHE_PAD_MINUTES = int(os.getenv("EVENT_CACHE_PAD_MINUTES", 60))  # extra minutes fetched past the window end
+CALENDAR_REGISTRY_TTL = float(os.getenv("CALENDAR_REGISTRY_TTL", 3600))  # seconds before the calendar list is refreshed in the background
+CALENDAR_SYNC = os.getenv("CALENDAR_SYNC", "true").lower() == "true"  # incremental sync via Google sync tokens
+CALENDAR_SYNC_HORIZON_PAD_DAYS = int(os.getenv("CALENDAR_SYNC_HORIZON_PAD_DAYS", 7))  # days synced past the window end
+AVAILABILITY_BACKEND = os.getenv("AVAILABILITY_BACKEND", "index").lower()  # "index" (interval index) or "bitmap" (minute bitmap)
+AVAILABILITY_BITMAP_RESOLUTION = int(os.getenv("AVAILABILITY_BITMAP_RESOLUTION", 60))  # bitmap cell size in seconds
+AGENT_DISPATCH_MODE = os.getenv("AGENT_DISPATCH_MODE", "direct").lower()  # "direct" (call the agent) or "routed" (AgentSquad + classifier)
+AGENT_CLASSIFIER_BASELINE_MS = float(os.getenv("AGENT_CLASSIFIER_BASELINE_MS", 500))  # assumed classifier hop cost, for the estimated saving until a routed call measures it
+TIME_PARSER_FAST_PATH = os.getenv("TIME_PARSER_FAST_PATH", "true").lower() == "true"  # rule-based parse before the LLM
+TIME_PARSE_CACHE_TTL = float(os.getenv("TIME_PARSE_CACHE_TTL", 300))  # seconds a parsed time window is reused (0 disables)
+TIME_PARSE_CACHE_MAX_ENTRIES = int(os.getenv("TIME_PARSE_CACHE_MAX_ENTRIES", 512))
+REPLY_FORMATTER_MODE = os.getenv("REPLY_FORMATTER_MODE", "template").lower()  # "template" (render suggestion replies locally) or "llm"
+SUGGESTION_CURSOR_TTL = float(os.getenv("SUGGESTION_CURSOR_TTL", 900))  # seconds an idle "more suggestions" cursor is kept
+SUGGESTION_CURSOR_MAX_ENTRIES = int(os.getenv("SUGGESTION_CURSOR_MAX_ENTRIES", 256))
+MORE_SUGGESTIONS_MAX_COUNT = int(os.getenv("MORE_SUGGESTIONS_MAX_COUNT", 20))  # suggestions per /api/more-suggestions page
+SUGGESTION_BATCH_MAX_SPECS = int(os.getenv("SUGGESTION_BATCH_MAX_SPECS", 12))  # meeting variants per /api/suggest-batch call
+MCP_STREAM_EVENTS = os.getenv("MCP_STREAM_EVENTS", "true").lower() == "true"  # decode list-events incrementally, keeping only used fields
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"  # keep the scheduling horizon in memory
+PREFETCH_INTERVAL = float(os.getenv("PREFETCH_INTERVAL", 30))  # seconds between background refreshes
+PREFETCH_MAX_STALENESS = float(os.getenv("PREFETCH_MAX_STALENESS", 120))  # older snapshots are not served (sync fetch instead)
+PREFETCH_HORIZON_DAYS = int(os.getenv("PREFETCH_HORIZON_DAYS", 15))  # days prefetched (covers the 14-day horizon)
+
+# Cache of list-events windows. Windows are fetched slightly past the requested
+# end so that the rolling "now .. now+14 days" window of later requests is a
+# sub-window of an earlier fetch and can be served from memory.
+event_cache = EventWindowCache(ttl_seconds=EVENT_CACHE_TTL, max_entries=EVENT_CACHE_MAX_ENTRIES, index_func=EventWindow.from_events)
+
+# In-flight list-events fetches keyed by (calendar, window start, fetch end), so
+# a burst of identical availability checks makes one MCP call between them.
+event_fetches = SingleFlight()
 
 # ---------------------------
 # MCP helpers
 # ---------------------------
 async def mcp_post(payload: dict) -> dict:
-    """Send JSON payload to MCP_URL and return JSON response."""
-    async with aiohttp.ClientSession() as session:
-        async with session.post(MCP_URL, json=payload, timeout=REQUEST_TIMEOUT) as resp:
-            text = await resp.text()
-            if resp.status >= 400:
-                raise RuntimeError(f"MCP returned {resp.status}: {text}")
-            try:
-                return json.loads(text)
-            except json.JSONDecodeError:
-                return {"raw": text}
+    """
+    Send JSON payload to MCP_URL and return JSON response.
+    Uses the process-wide pooled client so connections are reused across calls;
+    reads issued together (e.g. several calendars) share one batch request.
+    """
+    return await get_mcp_batcher().post(payload, MCP_URL)
+
+async def mcp_stream_events(payload: dict, on_event: Callable[[Dict], None]) -> dict:
+    """
+    Send a list-events payload to MCP_URL, decoding the response incrementally.
+    Each event is classified and projected to the fields the scheduler uses
+    (project_event) before it reaches ``on_event``, so neither the raw body nor
+    full event dicts are held. Returns the sync fields of the response.
+    """
+    return await get_mcp_batcher().stream_events(payload, lambda event: on_event(project_event(event)), MCP_URL)
+
+# Local per-calendar event stores refreshed with sync-token deltas
+sync_store = CalendarSyncStore(
+    mcp_post,
+    user_id=MCP_USER_ID,
+    horizon_pad=datetime.timedelta(days=CALENDAR_SYNC_HORIZON_PAD_DAYS),
+    stream_func=mcp_stream_events if MCP_STREAM_EVENTS else None
+)
+
+async def lookup_calendars(user_id: Optional[str]) -> Dict:
+    """
+    List the user's calendars via MCP and resolve the primary calendar email.
+    Returns {"primary": <calendar id>, "calendars": [<calendar id>, ...]}.
+    """
+    payload = {
+        "user_id": user_id,
+        "action": "list-calendars",
+        "params": {}
+    }
+    result = await mcp_post(payload)
+    # Parse the result to find primary calendar
+    if isinstance(result, dict) and "content" in result:
+        content = result["content"]
+        if isinstance(content, list) and len(content) > 0:
+            text = content[0].get("text", "") if isinstance(content[0], dict) else str(content[0])
+            lines = text.split("\n")
+            calendar_ids = []
+            for line in lines:
+                match = re.search(r'\(([^)]+)\)', line)
+                if match:
+                    calendar_ids.append(match.group(1))
+            
+            for calendar_id in calendar_ids:
+                if "@" in calendar_id and "." in calendar_id:
+                    return {"primary": calendar_id, "calendars": calendar_ids}
+            
+            if lines:
+                match = re.search(r'\(([^)]+)\)', lines[0])
+                if match:
+                    calendar_id = match.group(1)
+                    if calendar_id.lower() == "primary":
+                        raise ValueError("Found 'primary' calendar ID but need actual email address")
+                    return {"primary": calendar_id, "calendars": calendar_ids}
+    
+    raise ValueError("Could not determine primary calendar email from calendar list")
+
+# Calendar list resolved once per user and refreshed in the background
+calendar_registry = CalendarRegistry(lookup_calendars, ttl_seconds=CALENDAR_REGISTRY_TTL)
 
 async def get_primary_calendar_email() -> str:
     """
     Get the primary calendar email address by listing calendars.
     Falls back to MCP_CALENDAR_EMAIL from env if available.
+    The calendar list is cached per user (see calendar_registry), so only the
+    first call makes a list-calendars round trip; concurrent first calls share it.
     """
     # First try environment variable
     if MCP_CALENDAR_EMAIL:
         return MCP_CALENDAR_EMAIL
     
-    # Try to get from list-calendars
     try:
-        payload = {
-            "user_id": MCP_USER_ID,
-            "action": "list-calendars",
-            "params": {}
-        }
-        result = await mcp_post(payload)
-        # Parse the result to find primary calendar
-        if isinstance(result, dict) and "content" in result:
-            content = result["content"]
-            if isinstance(content, list) and len(content) > 0:
-                text = content[0].get("text", "") if isinstance(content[0], dict) else str(content[0])
-                lines = text.split("\n")
-                
-                for line in lines:
-                    if not line.strip():
-                        continue
-                    match = re.search(r'\(([^)]+)\)', line)
-                    if match:
-                        calendar_id = match.group(1)
-                        if "@" in calendar_id and "." in calendar_id:
-                            return calendar_id
-                
-                if lines:
-                    match = re.search(r'\(([^)]+)\)', lines[0])
-                    if match:
-                        calendar_id = match.group(1)
-                        if calendar_id.lower() == "primary":
-                            raise ValueError("Found 'primary' calendar ID but need actual email address")
-                        return calendar_id
-        
-        raise ValueError("Could not determine primary calendar email from calendar list")
+        entry = await calendar_registry.get(MCP_USER_ID)
+        return entry["primary"]
     except Exception as e:
         raise ValueError(f"Failed to get primary calendar email: {e}. Please set MCP_CALENDAR_EMAIL in .env file with your Google account email.")
 
-async def get_events_for_window(start_iso: str, end_iso: str, calendar_email: str = None) -> List[Dict]:
+async def fetch_events(calendar_email: str, time_min: str, time_max: str) -> List[Dict]:
     """
-    Get events for a time window using list-events (instead of freebusy).
-    Returns list of event dictionaries.
+    Fetch events for [time_min, time_max) with a single list-events call.
+    time_min/time_max must already be in the MCP server's ISO format.
     """
-    if calendar_email is None:
-        calendar_email = await get_primary_calendar_email()
-    
-    # Normalize ISO strings to the format the MCP server expects:
-    # ^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{3})?(Z|[+-]\d{2}:\d{2})$
-    def normalize_iso(iso_str: str) -> str:
-        dt = dateparser.isoparse(iso_str)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=datetime.timezone.utc)
-        else:
-            dt = dt.astimezone(datetime.timezone.utc)
-        # UTC, second precision, trailing 'Z'
-        return dt.strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
-    
-    normalized_start = normalize_iso(start_iso)
-    normalized_end = normalize_iso(end_iso)
-    
     payload = {
         "user_id": MCP_USER_ID,
         "action": "list-events",
         "params": {
             "calendarId": calendar_email,
-            "timeMin": normalized_start,
-            "timeMax": normalized_end
+            "timeMin": time_min,
+            "timeMax": time_max
         }
     }
-    
+
+    if MCP_STREAM_EVENTS:
+        events: List[Dict] = []
+        await mcp_stream_events(payload, events.append)
+        return events
+
     result = await mcp_post(payload)
 
     # Extract events from response
@@ -148,6 +201,147 @@ async def get_events_for_window(start_iso: str, end_iso: str, calendar_email: st
     
     return events
 
+async def load_events_window(calendar_email: str, start: datetime.datetime, end: datetime.datetime) -> List[Dict]:
+    """
+    Fetch events for [start, end) (aware UTC datetimes) from MCP, bypassing caches:
+    through the calendar's sync-token event store when supported, otherwise with
+    a plain list-events call.
+    """
+    if CALENDAR_SYNC and sync_store.is_supported(calendar_email):
+        # Incremental path: only changed/deleted events are transferred once synced
+        return await sync_store.sync_window(calendar_email, start, end)
+    return await fetch_events(calendar_email, format_iso_utc(start), format_iso_utc(end))
+
+async def get_events_for_window(start_iso: str, end_iso: str, calendar_email: str = None) -> List[Dict]:
+    """
+    Get events for a time window using list-events (instead of freebusy).
+    Returns list of event dictionaries.
+    Goes through get_event_window (prefetch snapshot, cache, sync store, shared
+    in-flight fetches); events without a usable start/end are left out.
+    """
+    window = await get_event_window(start_iso, end_iso, calendar_email)
+    return [e.event for e in window]
+
+async def get_event_window(start_iso: str, end_iso: str, calendar_email: str = None) -> EventWindow:
+    """
+    Like get_events_for_window, but returns the events overlapping the window as
+    an indexed EventWindow.
+    Served from the background prefetcher's snapshot when a fresh one covers it, then
+    from the in-process event-window cache when a fresh cached window covers it;
+    otherwise refreshed through the calendar's sync-token event store (only changed
+    events are transferred), falling back to a plain list-events fetch. Concurrent
+    callers whose window lies inside a fetch already in flight for the same
+    calendar wait for that fetch instead of making their own.
+    Events are normalized once per fetched window: the prefetch snapshot and the
+    cache keep the normalized window next to the events (rebuilt only when a fetch,
+    sync delta or booking changes them), and each request takes a slice of it.
+    """
+    if calendar_email is None:
+        calendar_email = await get_primary_calendar_email()
+    
+    # Normalize ISO strings to the format the MCP server expects:
+    # ^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{3})?(Z|[+-]\d{2}:\d{2})$
+    def normalize_iso(iso_str: str) -> str:
+        dt = dateparser.isoparse(iso_str)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=datetime.timezone.utc)
+        else:
+            dt = dt.astimezone(datetime.timezone.utc)
+        # UTC, second precision, trailing 'Z'
+        return dt.strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
+    
+    window_start = dateparser.isoparse(normalize_iso(start_iso))
+    window_end = dateparser.isoparse(normalize_iso(end_iso))
+
+    start_ts, end_ts = window_start.timestamp(), window_end.timestamp()
+
+    prefetched = prefetcher.get_indexed(calendar_email, window_start, window_end)
+    if prefetched is not None:
+        return prefetched.slice(start_ts, end_ts)
+
+    cached = event_cache.get_indexed(calendar_email, window_start, window_end)
+    if cached is not None:
+        return cached.slice(start_ts, end_ts)
+
+    fetch_end = window_end
+    if event_cache.enabled:
+        fetch_end = window_end + datetime.timedelta(minutes=EVENT_CACHE_PAD_MINUTES)
+
+    async def load() -> EventWindow:
+        events = await load_events_window(calendar_email, window_start, fetch_end)
+        window = EventWindow.from_events(events)
+        if fetch_end != window_end:
+            event_cache.put(calendar_email, window_start, fetch_end, events, index=window)
+        return window
+
+    def covers(key) -> bool:
+        calendar, start, end = key
+        return calendar == calendar_email and start <= window_start and end >= window_end
+
+    # A prefetch refresh in flight returns raw events rather than a window
+    fetched = EventWindow.from_events(
+        await event_fetches.do((calendar_email, window_start, fetch_end), load, covers=covers)
+    )
+
+    # Trim the padding (or a wider shared fetch) back off so callers see exactly
+    # the requested window, each with their own window
+    return fetched.slice(start_ts, end_ts)
+
+async def get_events_for_calendars(start_iso: str, end_iso: str, calendar_ids: List[str]) -> Dict[str, EventWindow]:
+    """
+    Get events for a time window from several calendars at once.
+    Each calendar goes through get_event_window (cache, sync store), with at
+    most CALENDAR_FETCH_CONCURRENCY fetches in flight, so the total latency is
+    about that of the slowest calendar. If any calendar fails, the rest are
+    cancelled and the error is raised.
+    Returns {calendar id: EventWindow}, in the order of calendar_ids.
+    """
+    semaphore = asyncio.Semaphore(max(1, CALENDAR_FETCH_CONCURRENCY))
+
+    async def fetch(calendar_id: str) -> EventWindow:
+        async with semaphore:
+            return await get_event_window(start_iso, end_iso, calendar_id)
+
+    results = await gather_or_cancel(*(fetch(calendar_id) for calendar_id in calendar_ids))
+    return dict(zip(calendar_ids, results))
+
+async def configured_calendars() -> List[str]:
+    """The calendars availability checks use by default (MCP_CALENDAR_IDS, else the primary)."""
+    return MCP_CALENDAR_IDS or [MCP_CALENDAR_EMAIL or await get_primary_calendar_email()]
+
+async def allowed_calendar_ids(calendar_ids) -> Optional[List[str]]:
+    """
+    Validate calendar ids sent by a client; None (or an empty list) means the defaults.
+    Only the configured calendars (MCP_CALENDAR_IDS, else the primary) may be
+    checked, so the public page can't read other calendars the MCP account can
+    reach. Raises ValueError for anything else.
+    """
+    if calendar_ids is None:
+        return None
+    if not isinstance(calendar_ids, list) or not all(isinstance(c, str) and c for c in calendar_ids):
+        raise ValueError("calendar_ids must be a list of calendar id strings")
+    allowed = await configured_calendars()
+    unknown = [c for c in calendar_ids if c not in allowed]
+    if unknown:
+        raise ValueError(f"Calendars not available: {', '.join(unknown)}")
+    return list(dict.fromkeys(calendar_ids)) or None
+
+async def prefetch_events(calendar_email: str, start: datetime.datetime, end: datetime.datetime) -> List[Dict]:
+    # Shared with get_event_window's single-flight, so a request arriving
+    # mid-refresh waits for the refresh instead of fetching again
+    return await event_fetches.do((calendar_email, start, end), lambda: load_events_window(calendar_email, start, end))
+
+# Keeps the scheduling horizon of each configured calendar in memory; started
+# and stopped with the API server's event loop (see api_server).
+prefetcher = CalendarPrefetcher(
+    prefetch_events,
+    configured_calendars,
+    horizon=datetime.timedelta(days=PREFETCH_HORIZON_DAYS),
+    interval=PREFETCH_INTERVAL,
+    max_staleness=PREFETCH_MAX_STALENESS,
+    index_func=EventWindow.from_events
+)
+
 def overlaps(start1: datetime.datetime, end1: datetime.datetime, start2: datetime.datetime, end2: datetime.datetime) -> bool:
     """
     Check if two time ranges overlap.
@@ -159,10 +353,7 @@ async def is_slot_free(
     start: datetime.datetime,
     end: datetime.datetime,
     existing_events: List[Dict],
-    mcp_post_func,  # Kept for compatibility but not used
-    buffer_minutes: int = 0,
-    calendar_email: str = None,  # Kept for compatibility but not used
-    is_inperson_meeting: bool = False  # True if the proposed meeting is in-person
+    buffer_minutes: int = 0
 ) -> bool:
     """
     Check if a time slot is free, considering buffer time.
@@ -171,37 +362,217 @@ async def is_slot_free(
     For in-person meetings: requires 30 minutes buffer AFTER any existing in-person event.
     """
     from preferences import is_slot_free as pref_is_slot_free
-    return await pref_is_slot_free(start, end, existing_events, mcp_post_func, buffer_minutes, calendar_email, is_inperson_meeting)
+    return await pref_is_slot_free(start, end, existing_events, buffer_minutes)
+
+async def gather_or_cancel(*aws):
+    """
+    Run awaitables concurrently and return their results in order.
+
+    Unlike asyncio.gather, the first failure cancels the remaining awaitables
+    (and waits for them to unwind) before the original exception is re-raised,
+    so no stage keeps running for a request that has already failed. If the
+    caller is cancelled, every stage is cancelled with it.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    except asyncio.CancelledError:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    failures = [task.exception() for task in tasks if task in done and not task.cancelled() and task.exception()]
+    if not failures:
+        return [task.result() for task in tasks]
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    raise failures[0]
 
 # ---------------------------
-# Agent 1: Parse user query and extract time window
+# Agent registry
 # ---------------------------
-async def parse_time_window_from_query(user_query: str, conversation_history: List[Dict[str, str]] = None) -> Dict[str, str]:
+# Both agents are built once per process and share one OpenAI client (and its
+# connection pool); see build_time_parser_agent / build_formatter_agent below.
+agent_registry = AgentRegistry(api_key=OPENAI_KEY, classifier_baseline_ms=AGENT_CLASSIFIER_BASELINE_MS)
+
+TIME_PARSER_AGENT = "time_parser"
+FORMATTER_AGENT = "response_formatter"
+FORMATTER_STREAM_AGENT = "response_formatter_stream"
+
+async def run_agent_request(agent_name: str, prompt: str, mode: Optional[str] = None):
     """
-    Agent 1: Takes a natural language query and extracts the time window.
-    Uses conversation history to understand context (e.g., "tomorrow" from previous queries).
-    Returns a dict with 'start_iso' and 'end_iso' in ISO 8601 format (e.g., "2025-11-14T15:00:00Z").
-    
+    Send a prompt to a registered agent without blocking the event loop and
+    return the agent's output message.
+
+    agent_squad's OpenAI agents and classifier (1.1.x) call the synchronous
+    OpenAI client from inside their coroutines, which never suspend. Awaiting
+    them here would block the shared loop for the whole model call, so they are
+    stepped to completion with run_sync on a worker thread (no event loop per
+    call); the shared loop keeps serving other requests while the model responds.
+
     Args:
-        user_query: Current user query
-        conversation_history: List of previous conversation turns [{"user": "...", "assistant": "..."}, ...]
+        agent_name: Registered agent (TIME_PARSER_AGENT or FORMATTER_AGENT)
+        prompt: Full prompt text
+        mode: "direct" calls the agent itself; "routed" goes through AgentSquad,
+            whose classifier spends an extra LLM call picking the only agent there
+            is. Defaults to AGENT_DISPATCH_MODE.
+
+    Each call gets a unique session id (so the LLM never sees history from
+    previous requests) and any stored chat is dropped afterwards.
     """
-    classifier = OpenAIClassifier(options=OpenAIClassifierOptions(api_key=OPENAI_KEY))
-    orchestrator = AgentSquad(classifier=classifier)
-    
-    query_parser_agent = OpenAIAgent(
+    mode = mode or AGENT_DISPATCH_MODE
+    session_id = agent_registry.new_session_id(agent_name)
+    started = time.perf_counter()
+    try:
+        if mode == "routed":
+            orchestrator = agent_registry.get(agent_name)
+            response = await asyncio.to_thread(
+                run_sync,
+                orchestrator.route_request(prompt, user_id=MCP_USER_ID, session_id=session_id)
+            )
+            return response.output
+        agent = agent_registry.get_agent(agent_name)
+        return await asyncio.to_thread(
+            run_sync,
+            agent.process_request(prompt, MCP_USER_ID, session_id, [])
+        )
+    finally:
+        agent_registry.end_session(agent_name, session_id)
+        agent_registry.record_timing(agent_name, mode, time.perf_counter() - started)
+
+async def stream_agent_request(agent_name: str, prompt: str) -> AsyncIterator[str]:
+    """
+    Send a prompt to a streaming agent and yield its text chunks as they arrive.
+
+    The synchronous OpenAI stream is consumed on a worker thread (like
+    run_agent_request) and each chunk is handed back to this loop through a
+    queue. If the consumer stops early (e.g. the client disconnected), the
+    worker stops reading the stream at the next chunk.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stopped = threading.Event()
+    done = object()
+    session_id = agent_registry.new_session_id(agent_name)
+    agent = agent_registry.get_agent(agent_name)
+    started = time.perf_counter()
+
+    def put(item) -> None:
+        if not stopped.is_set():
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+
+    def worker():
+        try:
+            stream = run_sync(agent.process_request(prompt, MCP_USER_ID, session_id, []))
+            for chunk in iterate_sync(stream):
+                if stopped.is_set():
+                    break
+                if chunk.text:
+                    put(chunk.text)
+            put(done)
+        except Exception as e:
+            put(e)
+
+    thread = threading.Thread(target=worker, name=f"{agent_name}-stream", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+        agent_registry.end_session(agent_name, session_id)
+        agent_registry.record_timing(agent_name, "stream", time.perf_counter() - started)
+
+# ---------------------------
+# Agent 1: Parse user query and extract time window
+# ---------------------------
+def build_time_parser_agent(client) -> OpenAIAgent:
+    return OpenAIAgent(
         options=OpenAIAgentOptions(
             name="Time Window Parser",
             description="Extracts time windows from natural language queries and returns ISO 8601 formatted dates.",
             api_key=OPENAI_KEY,
+            client=client,
             model="gpt-4o-mini",
             streaming=False
         )
     )
-    orchestrator.add_agent(query_parser_agent)
 
+agent_registry.register(TIME_PARSER_AGENT, build_time_parser_agent)
+
+# How many queries the rule-based parser answered vs sent to the LLM
+time_parse_stats = FastPathStats()
+
+# Parsed time windows for repeated queries (retries, repeated follow-ups)
+time_parse_cache = LRUCache(max_entries=TIME_PARSE_CACHE_MAX_ENTRIES, ttl_seconds=TIME_PARSE_CACHE_TTL)
+
+def time_parse_cache_key(
+    user_query: str,
+    conversation_history: Optional[List[Dict[str, str]]],
+    timezone: Optional[str],
+    now: datetime.datetime
+) -> Tuple[str, str, str, str]:
+    """
+    Key for time_parse_cache: the normalized query, a hash of the history turns
+    the parser actually sees, the viewer timezone, and the viewer's current date
+    (so "tomorrow" parsed yesterday is never reused today).
+    """
+    normalized_query = re.sub(r"\s+", " ", user_query.strip().lower()).rstrip("?!. ")
+    history = [(turn.get("user", ""), turn.get("assistant", "")) for turn in (conversation_history or [])[-5:]]
+    history_hash = hashlib.sha1(json.dumps(history).encode()).hexdigest()
+    date_bucket = now.astimezone(resolve_timezone(timezone)).date().isoformat()
+    return (normalized_query, history_hash, timezone or "", date_bucket)
+
+async def parse_time_window_from_query(
+    user_query: str,
+    conversation_history: List[Dict[str, str]] = None,
+    timezone: Optional[str] = None
+) -> Dict[str, str]:
+    """
+    Agent 1: Takes a natural language query and extracts the time window.
+    Uses conversation history to understand context (e.g., "tomorrow" from previous queries).
+    Returns a dict with 'start_iso' and 'end_iso' in ISO 8601 format (e.g., "2025-11-14T15:00:00Z").
+
+    Common phrases ("tomorrow at 3pm for 30 minutes", "Friday 2-4pm") are parsed
+    by rules (time_parser) without an LLM call; the LLM handles everything the
+    rules are not confident about. Results are cached for TIME_PARSE_CACHE_TTL
+    seconds, so a repeated query is answered from memory.
+    
+    Args:
+        user_query: Current user query
+        conversation_history: List of previous conversation turns [{"user": "...", "assistant": "..."}, ...]
+        timezone: Viewer's IANA timezone; wall-clock times in the query are read in this zone
+    """
     # Get current time for context
     now = datetime.datetime.now(datetime.timezone.utc)
+
+    cache_key = time_parse_cache_key(user_query, conversation_history, timezone, now)
+    cached = time_parse_cache.get(cache_key)
+    if cached is not None:
+        return dict(cached)
+    time_window = await _parse_time_window(user_query, conversation_history, timezone, now)
+    time_parse_cache.put(cache_key, dict(time_window))
+    return time_window
+
+async def _parse_time_window(
+    user_query: str,
+    conversation_history: Optional[List[Dict[str, str]]],
+    timezone: Optional[str],
+    now: datetime.datetime
+) -> Dict[str, str]:
+    """Uncached parse: rule-based fast path, then the LLM parser agent."""
+    if TIME_PARSER_FAST_PATH:
+        time_window = parse_time_window(user_query, now, timezone)
+        time_parse_stats.record(fast=time_window is not None)
+        if time_window is not None:
+            return time_window
+
     current_time_iso = now.isoformat().replace('+00:00', 'Z')
     
     # Build conversation history context
@@ -219,10 +590,14 @@ async def parse_time_window_from_query(user_query: str, conversation_history: Li
         history_context += "For example, if the user previously asked about 'tomorrow at 9am' and now asks 'what about 10am', "
         history_context += "they are asking about 'tomorrow at 10am'.\n"
     
+    timezone_context = ""
+    if timezone:
+        timezone_context = f"User's timezone: {timezone} (times in the query are local to this zone; convert them to UTC)\n"
+
     parser_prompt = f"""You are a time parser. Extract the requested time window from the user's query and return ONLY valid JSON.
 
 Current UTC time: {current_time_iso}
-{history_context}
+{timezone_context}{history_context}
 Current user query: "{user_query}"
 
 Return a JSON object with exactly these fields:
@@ -241,14 +616,13 @@ Example response:
 {{"start_iso": "2025-11-14T15:00:00Z", "end_iso": "2025-11-14T15:30:00Z"}}
 """
     
-    # Use a unique session_id to prevent memory from previous requests
-    unique_session_id = f"time_parser_{uuid.uuid4().hex[:8]}"
-    response = await orchestrator.route_request(parser_prompt, user_id=MCP_USER_ID, session_id=unique_session_id)
+    # Runs in a fresh session so no memory carries over from previous requests
+    output = await run_agent_request(TIME_PARSER_AGENT, parser_prompt)
     
     # Extract JSON from response
     response_text = ""
-    if hasattr(response.output, "content"):
-        content = response.output.content
+    if hasattr(output, "content"):
+        content = output.content
         if isinstance(content, list):
             for part in content:
                 if isinstance(part, dict) and "text" in part:
@@ -260,7 +634,7 @@ Example response:
         else:
             response_text = str(content)
     else:
-        response_text = str(response.output)
+        response_text = str(output)
     
     # Try to extract JSON from the response (handle code blocks and markdown)
     response_text = re.sub(r'```json\s*', '', response_text)
@@ -289,44 +663,77 @@ Example response:
 # ---------------------------
 # Agent 2: Format response conversationally
 # ---------------------------
-async def format_reply_with_llm(
-    is_busy: bool, 
-    overlaps: List[Dict], 
-    user_question: str, 
-    conversation_history: List[Dict[str, str]] = None,
-    suggested_times: List[Dict] = None,
-    suggested_location: Optional[str] = None,
-    meeting_type: Optional[str] = None,
-    duration_minutes: Optional[int] = None,
-    timezone: Optional[str] = None
-) -> str:
-    """
-    Agent 2: Formats the availability check results into a conversational response.
-    Takes the overlap results and creates a natural, friendly reply for the user.
-    
-    Args:
-        is_busy: Whether the requested time is busy
-        overlaps: List of overlapping time slots
-        user_question: Current user question
-        conversation_history: List of previous conversation turns for context
-        suggested_times: List of suggested time slots
-        suggested_location: Suggested location for in-person meetings
-        meeting_type: "online" or "in-person"
-        duration_minutes: Duration of the meeting
-    """
-    classifier = OpenAIClassifier(options=OpenAIClassifierOptions(api_key=OPENAI_KEY))
-    orchestrator = AgentSquad(classifier=classifier)
-    formatter_agent = OpenAIAgent(
+def build_formatter_agent(client, streaming: bool = False) -> OpenAIAgent:
+    return OpenAIAgent(
         options=OpenAIAgentOptions(
             name="Scheduler Assistant",
             description="A calendar assistant that suggests meeting times. NEVER says 'I understand those times don't work' or asks users to suggest times. Always presents ONE time and asks if it works.",
             api_key=OPENAI_KEY,
+            client=client,
             model="gpt-4o-mini",
-            streaming=False
+            streaming=streaming
         )
     )
-    orchestrator.add_agent(formatter_agent)
 
+agent_registry.register(FORMATTER_AGENT, build_formatter_agent)
+agent_registry.register(FORMATTER_STREAM_AGENT, lambda client: build_formatter_agent(client, streaming=True))
+
+# Phrasings the formatter prompt allows for a single suggestion
+SUGGESTION_REPLY_TEMPLATES = [
+    "How about {time}{location}? Does that work for you?",
+    "What about {time}{location}? Does that work for you?",
+    "Does {time}{location} work for you?",
+]
+
+def format_suggestion_time(suggestion: Dict, timezone: Optional[str] = None) -> str:
+    """
+    Format a suggestion as e.g. "Thursday, November 14 at 03:00 PM - 03:30 PM (GMT)"
+    in the viewer's timezone. The reason is never included (it can describe other meetings).
+    """
+    start_iso = suggestion.get("start_iso", "")
+    end_iso = suggestion.get("end_iso", "")
+    try:
+        tz = resolve_timezone(timezone)
+        start_dt = dateparser.isoparse(start_iso).astimezone(tz)
+        end_dt = dateparser.isoparse(end_iso).astimezone(tz)
+        start_str = start_dt.strftime("%A, %B %d at %I:%M %p")
+        end_str = end_dt.strftime("%I:%M %p")
+        tz_label = start_dt.strftime("%Z")
+        suggested_times_text = f"{start_str} - {end_str}"
+        if tz_label:
+            suggested_times_text += f" ({tz_label})"
+        return suggested_times_text
+    except Exception:
+        return f"{start_iso} - {end_iso}"
+
+def render_suggestion_reply(
+    suggestion: Dict,
+    suggested_location: Optional[str] = None,
+    timezone: Optional[str] = None,
+    template: Optional[str] = None
+) -> str:
+    """
+    Render the one-suggestion reply locally ("How about [time] at [location]? Does that
+    work for you?"). Without an explicit template, the phrasing is picked from
+    SUGGESTION_REPLY_TEMPLATES by the suggestion's start time, so the same suggestion
+    always gets the same reply while consecutive suggestions vary.
+    """
+    if template is None:
+        index = zlib.crc32(suggestion.get("start_iso", "").encode()) % len(SUGGESTION_REPLY_TEMPLATES)
+        template = SUGGESTION_REPLY_TEMPLATES[index]
+    location_text = f" at {suggested_location}" if suggested_location else ""
+    return template.format(time=format_suggestion_time(suggestion, timezone), location=location_text)
+
+def build_formatter_prompt(
+    is_busy: bool,
+    overlaps: List[Dict],
+    user_question: str,
+    conversation_history: List[Dict[str, str]] = None,
+    suggested_times: List[Dict] = None,
+    suggested_location: Optional[str] = None,
+    timezone: Optional[str] = None
+) -> str:
+    """Build the formatter agent's prompt for an availability result (see format_reply_with_llm)."""
     # Don't include conversation history when we have suggestions to avoid LLM seeing rejections
     # This prevents the LLM from generating "I understand those times don't work" messages
     history_context = ""
@@ -350,22 +757,8 @@ async def format_reply_with_llm(
     if suggested_times and len(suggested_times) > 0:
         # Only show the first/best suggestion in the response
         first_suggestion = suggested_times[0]
-        start_iso = first_suggestion.get("start_iso", "")
-        end_iso = first_suggestion.get("end_iso", "")
-        reason = first_suggestion.get("reason", "")
-        try:
-            tz = resolve_timezone(timezone)
-            start_dt = dateparser.isoparse(start_iso).astimezone(tz)
-            end_dt = dateparser.isoparse(end_iso).astimezone(tz)
-            start_str = start_dt.strftime("%A, %B %d at %I:%M %p")
-            end_str = end_dt.strftime("%I:%M %p")
-            tz_label = start_dt.strftime("%Z")
-            suggested_times_text = f"{start_str} - {end_str}"
-            if tz_label:
-                suggested_times_text += f" ({tz_label})"
-            # DO NOT include reason - it contains private information about other meetings
-        except:
-            suggested_times_text = f"{start_iso} - {end_iso}"
+        # DO NOT include reason - it contains private information about other meetings
+        suggested_times_text = format_suggestion_time(first_suggestion, timezone)
     
     overlap_text = ""
     if overlaps:
@@ -412,15 +805,52 @@ Availability: {availability_status}
 
 Format a natural response."""
 
-    # Use a unique session_id to prevent memory from previous requests
-    # This ensures the LLM doesn't remember rejections from previous interactions
-    unique_session_id = f"response_formatter_{uuid.uuid4().hex[:8]}"
-    response = await orchestrator.route_request(user_prompt, user_id=MCP_USER_ID, session_id=unique_session_id)
+    return user_prompt
+
+async def format_reply_with_llm(
+    is_busy: bool, 
+    overlaps: List[Dict], 
+    user_question: str, 
+    conversation_history: List[Dict[str, str]] = None,
+    suggested_times: List[Dict] = None,
+    suggested_location: Optional[str] = None,
+    meeting_type: Optional[str] = None,
+    duration_minutes: Optional[int] = None,
+    timezone: Optional[str] = None
+) -> str:
+    """
+    Agent 2: Formats the availability check results into a conversational response.
+    Takes the overlap results and creates a natural, friendly reply for the user.
+    
+    Args:
+        is_busy: Whether the requested time is busy
+        overlaps: List of overlapping time slots
+        user_question: Current user question
+        conversation_history: List of previous conversation turns for context
+        suggested_times: List of suggested time slots
+        suggested_location: Suggested location for in-person meetings
+        meeting_type: "online" or "in-person"
+        duration_minutes: Duration of the meeting
+
+    With REPLY_FORMATTER_MODE=template (the default), replies that present a
+    suggestion are rendered locally (render_suggestion_reply); the LLM is only
+    called for free-form answers without suggestions.
+    """
+    if suggested_times and REPLY_FORMATTER_MODE == "template":
+        return render_suggestion_reply(suggested_times[0], suggested_location, timezone)
+
+    user_prompt = build_formatter_prompt(
+        is_busy, overlaps, user_question, conversation_history,
+        suggested_times, suggested_location, timezone
+    )
+
+    # Runs in a fresh session so the LLM doesn't remember rejections from previous interactions
+    output = await run_agent_request(FORMATTER_AGENT, user_prompt)
     
     # Extract response content
     response_text = ""
-    if hasattr(response.output, 'content'):
-        content = response.output.content
+    if hasattr(output, 'content'):
+        content = output.content
         if isinstance(content, list) and len(content) > 0:
             text_parts = []
             for item in content:
@@ -434,14 +864,155 @@ Format a natural response."""
         else:
             response_text = str(content) if content else ""
     else:
-        response_text = str(response.output)
+        response_text = str(output)
     
     return response_text.strip()
 
+async def stream_reply_with_llm(
+    is_busy: bool,
+    overlaps: List[Dict],
+    user_question: str,
+    conversation_history: List[Dict[str, str]] = None,
+    suggested_times: List[Dict] = None,
+    suggested_location: Optional[str] = None,
+    meeting_type: Optional[str] = None,
+    duration_minutes: Optional[int] = None,
+    timezone: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of format_reply_with_llm: yields the reply in chunks as the
+    formatter model produces them. Template replies are yielded as one chunk.
+    Takes the same arguments as format_reply_with_llm.
+    """
+    if suggested_times and REPLY_FORMATTER_MODE == "template":
+        yield render_suggestion_reply(suggested_times[0], suggested_location, timezone)
+        return
+    user_prompt = build_formatter_prompt(
+        is_busy, overlaps, user_question, conversation_history,
+        suggested_times, suggested_location, timezone
+    )
+    async for chunk in stream_agent_request(FORMATTER_STREAM_AGENT, user_prompt):
+        yield chunk
+
 # ---------------------------
 # Main orchestration function
 # ---------------------------
-async def check_busy(
+# Format as ISO with Z suffix (UTC) - matches MCP regex: ^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{3})?(Z|[+-]\d{2}:\d{2})$
+def format_iso_utc(dt: datetime.datetime) -> str:
+    """Format datetime as ISO 8601 with Z suffix for UTC (no microseconds)."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    else:
+        dt = dt.astimezone(datetime.timezone.utc)
+    # Use strftime to avoid microseconds - format: YYYY-MM-DDTHH:MM:SS
+    formatted = dt.strftime('%Y-%m-%dT%H:%M:%S')
+    # Append 'Z' for UTC
+    return formatted + 'Z'
+
+async def fetch_event_window(
+    start: datetime.datetime,
+    end: datetime.datetime,
+    calendar_ids: Optional[List[str]] = None
+) -> Tuple[str, EventWindow]:
+    """
+    Get the events for [start, end) using list-events (instead of freebusy) and
+    index them. Returns (calendar email, EventWindow).
+
+    ``calendar_ids`` defaults to the configured calendars (MCP_CALENDAR_IDS, else
+    MCP_CALENDAR_EMAIL or the resolved primary) and must be a subset of them
+    (ValueError otherwise). With several calendars, all of them are fetched
+    concurrently and merged into one timeline; each event keeps the calendar it
+    came from. The first calendar is the one returned.
+    """
+    calendar_ids = await allowed_calendar_ids(calendar_ids) or await configured_calendars()
+    if len(calendar_ids) > 1:
+        events_by_calendar = await get_events_for_calendars(format_iso_utc(start), format_iso_utc(end), calendar_ids)
+        return calendar_ids[0], EventWindow.from_calendars(events_by_calendar)
+    calendar_email = calendar_ids[0]
+    return calendar_email, await get_event_window(format_iso_utc(start), format_iso_utc(end), calendar_email)
+
+def normalize_rejected_times(rejected_times: Optional[List[Dict[str, str]]]) -> set:
+    """Normalize [{"start_iso", "end_iso"}, ...] to a set of (start_iso, end_iso) for fast lookup."""
+    rejected_time_set = set()
+    if rejected_times:
+        for rejected in rejected_times:
+            start_iso = rejected.get('start_iso', '')
+            end_iso = rejected.get('end_iso', '')
+            if start_iso and end_iso:
+                rejected_time_set.add((start_iso, end_iso))
+    return rejected_time_set
+
+async def compute_suggestions(
+    event_window: EventWindow,
+    meeting_type: Optional[str],
+    duration_minutes: Optional[int],
+    meeting_description: Optional[str],
+    rejected_time_set: set,
+    now: datetime.datetime,
+    horizon_end: datetime.datetime,
+    calendar_email: str,
+    timezone: Optional[str] = None,
+    calendar_ids: Optional[List[str]] = None
+) -> Tuple[List[Dict], Optional[str], Optional[str]]:
+    """
+    Run the preference engine for one meeting spec over an already fetched window.
+
+    Returns (suggested_times, suggested_location, suggestion cursor id); the
+    cursor pages through further alternatives via more_suggestions.
+    """
+    suggested_times = []
+    suggested_location = None
+    cursor_id = None
+    
+    # Use preferences to suggest times based on meeting type
+    if meeting_type == "online":
+        suggested_times = await suggest_online_times(
+            duration_minutes=duration_minutes,
+            events=event_window,
+            start_date=now,
+            end_date=horizon_end,
+            mcp_post_func=mcp_post,
+            calendar_email=calendar_email,
+            rejected_times=rejected_time_set,
+            local_tz=timezone
+        )
+    elif meeting_type == "in-person":
+        # For in-person, the description determines friendly vs business; without one, use business logic
+        suggested_times, suggested_location = await suggest_inperson_times(
+            duration_minutes=duration_minutes,
+            description=meeting_description or "business meeting",
+            events=event_window,
+            start_date=now,
+            end_date=horizon_end,
+            mcp_post_func=mcp_post,
+            calendar_email=calendar_email,
+            rejected_times=rejected_time_set,
+            local_tz=timezone
+        )
+    
+    # Filter out rejected times from final suggestions
+    if rejected_time_set:
+        suggested_times = [
+            t for t in suggested_times 
+            if (t.get('start_iso'), t.get('end_iso')) not in rejected_time_set
+        ]
+    
+    if meeting_type in ("online", "in-person"):
+        # Keep the fetched window and the rule position so /api/more-suggestions
+        # can page through further alternatives without re-running this request
+        cursor_id = open_suggestion_cursor(SuggestionCursor(
+            suggestion_stream(
+                suggested_times, meeting_type, duration_minutes, meeting_description,
+                event_window, now, rejected_time_set, timezone
+            ),
+            suggested_location,
+            calendar_ids,
+            (now, horizon_end)
+        ))
+    
+    return suggested_times, suggested_location, cursor_id
+
+async def check_busy_stream(
     user_query: str, 
     conversation_history: List[Dict[str, str]] = None,
     meeting_type: Optional[str] = None,
@@ -449,159 +1020,96 @@ async def check_busy(
     duration_minutes: Optional[int] = None,
     rejected_times: Optional[List[Dict[str, str]]] = None,
     skip_llm_formatting: bool = False,  # If True, skip LLM and return simple message
-    timezone: Optional[str] = None  # IANA timezone for interpreting/displaying wall-clock times
-) -> Dict:
+    timezone: Optional[str] = None,  # IANA timezone for interpreting/displaying wall-clock times
+    calendar_ids: Optional[List[str]] = None,  # Calendars checked together (default: MCP_CALENDAR_IDS or the primary)
+    stream_reply: bool = True  # If False, the reply is produced in one piece (format_reply_with_llm)
+) -> AsyncIterator[Tuple[str, Dict]]:
     """
-    Top-level function that orchestrates the two-agent workflow.
-    
-    Agent 1: Parses user query → extracts time window → queries MCP → returns busy times
-    Agent 2: Takes overlap results → formats conversationally
-    
-    Args:
-        user_query: Natural language query (e.g., "Am I free tomorrow at 3pm for 30 minutes?")
-        conversation_history: List of previous conversation turns [{"user": "...", "assistant": "..."}, ...]
-        meeting_type: "online" or "in-person"
-        meeting_description: Description/purpose of the meeting
-        duration_minutes: Duration of the meeting in minutes
-    
-    Returns:
-        Dict with 'response' (str), 'suggested_time', 'suggested_times', 'suggested_location'
+    The two-agent workflow as a stream of (event, data) pairs, yielded as each stage finishes:
+
+        ("time_window", {"start_iso", "end_iso"})        parsed requested window
+        ("availability", {"is_busy", "conflicts"})       verdict for that window
+        ("suggestions", {"suggested_times", "suggested_time", "suggested_location"})
+        ("token", {"text"})                              reply text, chunk by chunk
+        ("done", result)                                 same dict check_busy returns
+
+    Takes the same arguments as check_busy.
     """
-    # Step 1: Agent 1 - Parse user query and extract time window (with conversation history)
-    time_window = await parse_time_window_from_query(user_query, conversation_history)
-    start_iso = time_window["start_iso"]
-    end_iso = time_window["end_iso"]
-    
-    # Step 2: Get events for the next 2 weeks using list-events (instead of freebusy)
+    # Step 2 setup: events are always fetched for the next 2 weeks, whatever the query says
     now = datetime.datetime.now(datetime.timezone.utc)
     query_start = now
     query_end = now + datetime.timedelta(days=14)
     
-    # Format as ISO with Z suffix (UTC) - matches MCP regex: ^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{3})?(Z|[+-]\d{2}:\d{2})$
-    def format_iso_utc(dt: datetime.datetime) -> str:
-        """Format datetime as ISO 8601 with Z suffix for UTC (no microseconds)."""
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=datetime.timezone.utc)
-        else:
-            dt = dt.astimezone(datetime.timezone.utc)
-        # Use strftime to avoid microseconds - format: YYYY-MM-DDTHH:MM:SS
-        formatted = dt.strftime('%Y-%m-%dT%H:%M:%S')
-        # Append 'Z' for UTC
-        return formatted + 'Z'
-    
-    query_start_iso = format_iso_utc(query_start)
-    query_end_iso = format_iso_utc(query_end)
-    
-    calendar_email = MCP_CALENDAR_EMAIL or await get_primary_calendar_email()
-    events = await get_events_for_window(query_start_iso, query_end_iso, calendar_email)
+    # Step 1 (Agent 1 - parse the time window, with conversation history) doesn't depend
+    # on the fetch, so both run concurrently and the time window is sent as soon as it
+    # is parsed. If either fails (or the client goes away) the other is cancelled.
+    parse = asyncio.ensure_future(parse_time_window_from_query(user_query, conversation_history, timezone))
+    fetch = asyncio.ensure_future(fetch_event_window(query_start, query_end, calendar_ids))
+    try:
+        await asyncio.wait([parse, fetch], return_when=asyncio.FIRST_COMPLETED)
+        if not parse.done():
+            fetch.result()  # the fetch finished first: re-raise its failure, if any
+        time_window = await parse
+        start_iso = time_window["start_iso"]
+        end_iso = time_window["end_iso"]
+        yield "time_window", {"start_iso": start_iso, "end_iso": end_iso}
+        calendar_email, event_window = await fetch
+    except BaseException:
+        for task in (parse, fetch):
+            task.cancel()
+        await asyncio.gather(parse, fetch, return_exceptions=True)
+        raise
     
     # Step 3: Check if requested time is busy (accounting for buffers for in-person meetings)
     requested_start = dateparser.isoparse(start_iso)
     requested_end = dateparser.isoparse(end_iso)
+    if requested_start.tzinfo is None:
+        requested_start = requested_start.replace(tzinfo=datetime.timezone.utc)
+    if requested_end.tzinfo is None:
+        requested_end = requested_end.replace(tzinfo=datetime.timezone.utc)
     
-    is_busy = False
-    overlaps_list = []
+    # The fetched window is parsed and indexed once; the overlap check and both
+    # suggestion engines below share it.
+    if AVAILABILITY_BACKEND == "bitmap":
+        # Constant-time slot checks over the fetched 14-day horizon
+        event_window.use_bitmap(query_start, query_end, AVAILABILITY_BITMAP_RESOLUTION)
     
-    for event in events:
-        event_start_str = event.get("start", {}).get("dateTime") or event.get("start", {}).get("date", "")
-        event_end_str = event.get("end", {}).get("dateTime") or event.get("end", {}).get("date", "")
-        
-        if not event_start_str or not event_end_str:
-            continue
-        
-        try:
-            # Parse ISO format
-            if event_start_str.endswith('Z'):
-                event_start_str = event_start_str[:-1] + '+00:00'
-            if event_end_str.endswith('Z'):
-                event_end_str = event_end_str[:-1] + '+00:00'
-            
-            event_start = dateparser.isoparse(event_start_str)
-            event_end = dateparser.isoparse(event_end_str)
-            
-            # For in-person meetings: apply 30 min buffer before and after existing in-person events
-            existing_is_inperson = not is_online_meeting(event)
-            
-            if meeting_type == "in-person" and existing_is_inperson:
-                # Add 30 minutes buffer before and after the existing event
-                effective_event_start = event_start - datetime.timedelta(minutes=30)
-                effective_event_end = event_end + datetime.timedelta(minutes=30)
-            else:
-                effective_event_start = event_start
-                effective_event_end = event_end
-            
-            # Check for overlap with effective times (including buffers)
-            if overlaps(requested_start, requested_end, effective_event_start, effective_event_end):
-                is_busy = True
-                overlaps_list.append({
-                    "start": event_start.isoformat().replace('+00:00', 'Z'),
-                    "end": event_end.isoformat().replace('+00:00', 'Z'),
-                    "summary": event.get("summary", "Busy")
-                })
-        except:
-            continue
+    # Check for overlap with effective times (including buffers for in-person meetings)
+    overlaps_list = [
+        {
+            "start": format_iso_datetime(event.start_datetime()),
+            "end": format_iso_datetime(event.end_datetime()),
+            "summary": event.event.get("summary", "Busy"),
+            **({"calendar": event.calendar} if event.calendar else {})
+        }
+        for event in event_window.conflicts(
+            requested_start.timestamp(),
+            requested_end.timestamp(),
+            inperson=(meeting_type == "in-person")
+        )
+    ]
+    is_busy = bool(overlaps_list)
+    yield "availability", {"is_busy": is_busy, "conflicts": overlaps_list}
     
     # Step 4: Always suggest times proactively when meeting details are provided
     suggested_times = []
     suggested_location = None
+    cursor_id = None
     
     # Always suggest times if meeting type and duration are provided (proactive suggestions)
     if meeting_type and duration_minutes:
-        # Normalize rejected_times to a set for fast lookup
-        rejected_time_set = set()
-        if rejected_times:
-            for rejected in rejected_times:
-                start_iso = rejected.get('start_iso', '')
-                end_iso = rejected.get('end_iso', '')
-                if start_iso and end_iso:
-                    rejected_time_set.add((start_iso, end_iso))
-        
-        # Use preferences to suggest times based on meeting type
-        if meeting_type == "online":
-            suggested_times = await suggest_online_times(
-                duration_minutes=duration_minutes,
-                events=events,
-                start_date=now,
-                end_date=query_end,
-                mcp_post_func=mcp_post,
-                calendar_email=calendar_email,
-                rejected_times=rejected_time_set,
-                local_tz=timezone
-            )
-        elif meeting_type == "in-person":
-            # For in-person, we need description to determine if it's friendly or business
-            if meeting_description:
-                suggested_times, suggested_location = await suggest_inperson_times(
-                    duration_minutes=duration_minutes,
-                    description=meeting_description,
-                    events=events,
-                    start_date=now,
-                    end_date=query_end,
-                    mcp_post_func=mcp_post,
-                    calendar_email=calendar_email,
-                    rejected_times=rejected_time_set,
-                    local_tz=timezone
-                )
-            else:
-                # If no description, use default business meeting logic
-                suggested_times, suggested_location = await suggest_inperson_times(
-                    duration_minutes=duration_minutes,
-                    description="business meeting",  # Default to business
-                    events=events,
-                    start_date=now,
-                    end_date=query_end,
-                    mcp_post_func=mcp_post,
-                    calendar_email=calendar_email,
-                    rejected_times=rejected_time_set,
-                    local_tz=timezone
-                )
-        
-        # Filter out rejected times from final suggestions
-        if rejected_time_set:
-            suggested_times = [
-                t for t in suggested_times 
-                if (t.get('start_iso'), t.get('end_iso')) not in rejected_time_set
-            ]
+        rejected_time_set = normalize_rejected_times(rejected_times)
+        suggested_times, suggested_location, cursor_id = await compute_suggestions(
+            event_window, meeting_type, duration_minutes, meeting_description,
+            rejected_time_set, now, query_end, calendar_email, timezone, calendar_ids
+        )
+    
+    yield "suggestions", {
+        "suggested_times": suggested_times,
+        "suggested_time": suggested_times[0] if suggested_times else None,
+        "suggested_location": suggested_location,
+        "suggestion_cursor": cursor_id
+    }
     
     # Step 5: Agent 2 - Format response conversationally
     # Skip LLM formatting if requested (e.g., when fetching more suggestions)
@@ -609,25 +1117,30 @@ async def check_busy(
     if skip_llm_formatting:
         # Use simple template message when fetching more suggestions
         if suggested_times and len(suggested_times) > 0:
-            first_suggestion = suggested_times[0]
-            start_iso = first_suggestion.get("start_iso", "")
-            end_iso = first_suggestion.get("end_iso", "")
-            try:
-                tz = resolve_timezone(timezone)
-                start_dt = dateparser.isoparse(start_iso).astimezone(tz)
-                end_dt = dateparser.isoparse(end_iso).astimezone(tz)
-                start_str = start_dt.strftime("%A, %B %d at %I:%M %p")
-                end_str = end_dt.strftime("%I:%M %p")
-                tz_label = start_dt.strftime("%Z")
-                suggested_times_text = f"{start_str} - {end_str}"
-                if tz_label:
-                    suggested_times_text += f" ({tz_label})"
-            except:
-                suggested_times_text = f"{start_iso} - {end_iso}"
-            location_text = f" at {suggested_location}" if suggested_location else ""
-            assistant_reply = f"What about {suggested_times_text}{location_text}? Does that work for you?"
+            # Always "What about ...?" when presenting the next suggestion
+            assistant_reply = render_suggestion_reply(
+                suggested_times[0], suggested_location, timezone,
+                template=SUGGESTION_REPLY_TEMPLATES[1]
+            )
         else:
             assistant_reply = "Let me check for more available times..."
+        yield "token", {"text": assistant_reply}
+    elif stream_reply:
+        chunks = []
+        async for chunk in stream_reply_with_llm(
+            is_busy,
+            overlaps_list,
+            user_query,
+            conversation_history,
+            suggested_times=suggested_times,
+            suggested_location=suggested_location,
+            meeting_type=meeting_type,
+            duration_minutes=duration_minutes,
+            timezone=timezone
+        ):
+            chunks.append(chunk)
+            yield "token", {"text": chunk}
+        assistant_reply = "".join(chunks).strip()
     else:
         assistant_reply = await format_reply_with_llm(
             is_busy,
@@ -640,6 +1153,7 @@ async def check_busy(
             duration_minutes=duration_minutes,
             timezone=timezone
         )
+        yield "token", {"text": assistant_reply}
     
     # Return dict with response and suggestions
     result = {
@@ -653,11 +1167,205 @@ async def check_busy(
     if suggested_location:
         result["suggested_location"] = suggested_location
     
+    if cursor_id:
+        result["suggestion_cursor"] = cursor_id
+    
+    yield "done", result
+
+async def check_busy(
+    user_query: str, 
+    conversation_history: List[Dict[str, str]] = None,
+    meeting_type: Optional[str] = None,
+    meeting_description: Optional[str] = None,
+    duration_minutes: Optional[int] = None,
+    rejected_times: Optional[List[Dict[str, str]]] = None,
+    skip_llm_formatting: bool = False,  # If True, skip LLM and return simple message
+    timezone: Optional[str] = None,  # IANA timezone for interpreting/displaying wall-clock times
+    calendar_ids: Optional[List[str]] = None  # Calendars checked together (default: MCP_CALENDAR_IDS or the primary)
+) -> Dict:
+    """
+    Top-level function that orchestrates the two-agent workflow.
+    
+    Agent 1: Parses user query → extracts time window → queries MCP → returns busy times
+    Agent 2: Takes overlap results → formats conversationally
+    
+    Args:
+        user_query: Natural language query (e.g., "Am I free tomorrow at 3pm for 30 minutes?")
+        conversation_history: List of previous conversation turns [{"user": "...", "assistant": "..."}, ...]
+        meeting_type: "online" or "in-person"
+        meeting_description: Description/purpose of the meeting
+        duration_minutes: Duration of the meeting in minutes
+        calendar_ids: Calendars whose events all count as busy; conflicts name their calendar
+    
+    Returns:
+        Dict with 'response' (str), 'suggested_time', 'suggested_times', 'suggested_location',
+        and 'suggestion_cursor' (for more_suggestions) when suggestions were computed
+    """
+    result = {}
+    async for event, data in check_busy_stream(
+        user_query,
+        conversation_history,
+        meeting_type=meeting_type,
+        meeting_description=meeting_description,
+        duration_minutes=duration_minutes,
+        rejected_times=rejected_times,
+        skip_llm_formatting=skip_llm_formatting,
+        timezone=timezone,
+        calendar_ids=calendar_ids,
+        stream_reply=False
+    ):
+        if event == "done":
+            result = data
     return result
 
+# ---------------------------
+# Batch suggestions (several meeting variants at once)
+# ---------------------------
+async def suggest_batch(
+    specs: List[Dict],
+    rejected_times: Optional[List[Dict[str, str]]] = None,
+    timezone: Optional[str] = None,
+    calendar_ids: Optional[List[str]] = None
+) -> Dict:
+    """
+    Suggest times for several meeting variants in one pass, without LLM formatting.
+
+    The calendar is fetched and normalized once; every spec then runs the
+    preference engine over the same indexed window.
+
+    Args:
+        specs: [{"meeting_type": "online" | "in-person", "duration_minutes": int,
+                 "description": str (optional)}, ...]
+        rejected_times: Times to exclude for every spec
+        timezone: Viewer's IANA timezone for wall-clock preferences
+        calendar_ids: Calendars checked together (default: MCP_CALENDAR_IDS or the primary)
+
+    Returns:
+        Dict with 'results': one entry per spec, in order, with the spec fields plus
+        'suggested_times', 'suggested_time', 'suggested_location' and 'suggestion_cursor'
+
+    Raises:
+        ValueError: if specs is empty, too long, or a spec is invalid
+    """
+    if not specs:
+        raise ValueError("At least one meeting spec is required")
+    if len(specs) > SUGGESTION_BATCH_MAX_SPECS:
+        raise ValueError(f"At most {SUGGESTION_BATCH_MAX_SPECS} meeting specs per batch")
+    for spec in specs:
+        if spec.get("meeting_type") not in ("online", "in-person"):
+            raise ValueError(f"meeting_type must be 'online' or 'in-person', got {spec.get('meeting_type')!r}")
+        duration = spec.get("duration_minutes")
+        if not isinstance(duration, int) or isinstance(duration, bool) or not 0 < duration <= 24 * 60:
+            raise ValueError(f"duration_minutes must be a positive number of minutes, got {duration!r}")
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    horizon_end = now + datetime.timedelta(days=14)
+    calendar_email, event_window = await fetch_event_window(now, horizon_end, calendar_ids)
+    if AVAILABILITY_BACKEND == "bitmap":
+        event_window.use_bitmap(now, horizon_end, AVAILABILITY_BITMAP_RESOLUTION)
+    rejected_time_set = normalize_rejected_times(rejected_times)
+
+    results = []
+    for spec in specs:
+        suggested_times, suggested_location, cursor_id = await compute_suggestions(
+            event_window, spec["meeting_type"], spec["duration_minutes"], spec.get("description"),
+            rejected_time_set, now, horizon_end, calendar_email, timezone, calendar_ids
+        )
+        results.append({
+            "meeting_type": spec["meeting_type"],
+            "duration_minutes": spec["duration_minutes"],
+            "description": spec.get("description"),
+            "suggested_times": suggested_times,
+            "suggested_time": suggested_times[0] if suggested_times else None,
+            "suggested_location": suggested_location,
+            "suggestion_cursor": cursor_id
+        })
+    return {"results": results}
+
+# ---------------------------
+# Suggestion cursors ("show me more times")
+# ---------------------------
+suggestion_cursors = LRUCache(max_entries=SUGGESTION_CURSOR_MAX_ENTRIES, ttl_seconds=SUGGESTION_CURSOR_TTL)
+
+def open_suggestion_cursor(cursor: SuggestionCursor) -> str:
+    """Store a cursor and return its id."""
+    cursor_id = uuid.uuid4().hex
+    suggestion_cursors.put(cursor_id, cursor)
+    return cursor_id
+
+async def more_suggestions(cursor_id: str, count: int = 3) -> Optional[Dict]:
+    """
+    Return the next ``count`` suggestions from a cursor opened by check_busy.
+    No LLM call is made: the cursor resumes the preference rules over the event
+    window fetched by the original request. Since that window may be minutes old,
+    the page is re-checked against the calendars' current events and slots
+    booked since are skipped. The current events come from the prefetch snapshot
+    or event cache (which bookings patch); they are fetched at most once per
+    call, for the cursor's whole window, if neither has them.
+
+    ``count`` must be between 1 and MORE_SUGGESTIONS_MAX_COUNT (ValueError
+    otherwise). Concurrent calls on one cursor are served one after another.
+    Returns None if the cursor is unknown or has expired (the caller should
+    run check_busy again), otherwise a dict with 'suggested_times',
+    'suggested_time', 'suggested_location' and 'has_more'.
+    """
+    if not 1 <= count <= MORE_SUGGESTIONS_MAX_COUNT:
+        raise ValueError(f"count must be between 1 and {MORE_SUGGESTIONS_MAX_COUNT}")
+    cursor = suggestion_cursors.get(cursor_id)
+    if cursor is None:
+        return None
+    # Padded so in-person buffers of events just outside a page count
+    padding = datetime.timedelta(seconds=INPERSON_BUFFER_SECONDS)
+    current: Optional[EventWindow] = None
+    covered = None
+    batch = []
+    async with cursor.lock:
+        while len(batch) < count:
+            page = cursor.take(count - len(batch))
+            if not page:
+                break
+            starts = [dateparser.isoparse(s["start_iso"]) for s in page]
+            ends = [dateparser.isoparse(s["end_iso"]) for s in page]
+            low, high = min(starts) - padding, max(ends) + padding
+            if current is None or not (covered[0] <= low and high <= covered[1]):
+                if cursor.window is not None:
+                    low, high = min(low, cursor.window[0] - padding), max(high, cursor.window[1] + padding)
+                _, current = await fetch_event_window(low, high, cursor.calendars)
+                covered = (low, high)
+            batch.extend(
+                suggestion for suggestion, start, end in zip(page, starts, ends)
+                if current.is_free(start.timestamp(), end.timestamp())
+            )
+        suggestion_cursors.put(cursor_id, cursor)  # idle expiry restarts on every page
+        has_more = cursor.has_more
+    return {
+        "suggested_times": batch,
+        "suggested_time": batch[0] if batch else None,
+        "suggested_location": cursor.location,
+        "has_more": has_more
+    }
+
 # ---------------------------
 # Create calendar event
 # ---------------------------
+async def record_booking(calendar_email: str, created: Optional[Dict]) -> None:
+    """
+    Keep the in-memory calendar state in step with a booking so the new slot is
+    never suggested again, whichever calendars availability is checked against.
+
+    The booked calendar and every configured calendar get the event patched into
+    their cached windows and prefetch snapshots (or those dropped if there is no
+    event to patch in); availability merges them, so the slot is busy however
+    they are combined. Only the booked calendar's sync store is patched; the
+    others drop their sync token, since an event patched into a calendar that
+    does not hold it would never be removed by an incremental sync.
+    """
+    for calendar in dict.fromkeys([calendar_email, *await configured_calendars()]):
+        if not (created is not None and event_cache.add_event(calendar, created)):
+            event_cache.invalidate(calendar)
+        prefetcher.record_write(calendar, created)
+        sync_store.record_write(calendar, created if calendar == calendar_email else None)
+
 async def create_calendar_event(
     start_iso: str,
     end_iso: str,
@@ -715,7 +1423,6 @@ async def create_calendar_event(
         # Add Google Meet conference data ONLY for online meetings
         if meeting_type == "online":
             # Generate a unique request ID for Google Meet
-            import time
             import random
             request_id = f"meet-{int(time.time() * 1000)}-{random.randint(1000, 9999)}"
             event_params["conferenceData"] = {
@@ -740,6 +1447,9 @@ async def create_calendar_event(
     
     result = await mcp_post(payload)
     
+    created = (result.get("raw") or result.get("event")) if isinstance(result, dict) else None
+    await record_booking(calendar_email, created if isinstance(created, dict) else None)
+    
     # Extract event details from response
     event_id = None
     html_link = None
@@ -846,5 +1556,12 @@ async def interactive_mode():
             print(f"\nError: {e}\n")
             print("-" * 60)
 
+async def run_interactive() -> None:
+    """Interactive mode on its own event loop, closing the MCP session before the loop ends."""
+    try:
+        await interactive_mode()
+    finally:
+        await close_mcp_client()
+
 if __name__ == "__main__":
-    asyncio.run(interactive_mode())
+    asyncio.run(run_interactive())
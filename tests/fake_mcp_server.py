@@ -0,0 +1,109 @@
+"""
+Local stand-in for the MCP HTTP server, for tests.
+Serves /mcp/calendar (and /mcp/calendar/batch) from an in-memory calendar and
+emits Google-style sync tokens.
+"""
+
+import itertools
+from typing import Dict, List, Optional
+from aiohttp import web
+
+
+class FakeMCPServer:
+    """
+    In-memory calendar behind an aiohttp app that speaks the MCP HTTP protocol.
+
+    list-events with ``sync: true`` (full sync) or a ``syncToken`` (incremental)
+    returns a ``nextSyncToken``; incremental responses contain only the events
+    changed since that token, with deleted events marked ``status: cancelled``.
+    ``batch_requests`` records the bodies posted to the batch endpoint; set
+    ``batch_enabled = False`` to serve a server without one.
+    """
+
+    def __init__(self):
+        self.events: Dict[str, Dict] = {}
+        self.requests: List[Dict] = []
+        self._versions = itertools.count(1)
+        self._changes: List[tuple] = []  # (version, event_id)
+        self.expired_tokens = set()
+        self.batch_requests: List[Dict] = []
+        self.batch_enabled = True
+        self._runner: Optional[web.AppRunner] = None
+        self.url: Optional[str] = None
+
+    # ---- calendar mutations ----
+    def put_event(self, event_id: str, start: str, end: str, **fields) -> Dict:
+        event = {"id": event_id, "status": "confirmed", "start": {"dateTime": start}, "end": {"dateTime": end}, **fields}
+        self.events[event_id] = event
+        self._changes.append((next(self._versions), event_id))
+        return event
+
+    def delete_event(self, event_id: str) -> None:
+        self.events[event_id]["status"] = "cancelled"
+        self._changes.append((next(self._versions), event_id))
+
+    def _current_token(self) -> str:
+        version = self._changes[-1][0] if self._changes else 0
+        return f"token-{version}"
+
+    # ---- HTTP handling ----
+    def _run_action(self, body: Dict) -> tuple:
+        """Return (status, response body) for one action."""
+        self.requests.append(body)
+        action, params = body.get("action"), body.get("params") or {}
+        if action == "list-events":
+            return 200, self._list_events(params)
+        if action == "list-calendars":
+            return 200, {"content": [{"type": "text", "text": "Primary (me@example.com)\n"}]}
+        return 400, {"error": f"Unknown action {action}", "content": []}
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        status, body = self._run_action(await request.json())
+        return web.json_response(body, status=status)
+
+    async def _handle_batch(self, request: web.Request) -> web.Response:
+        if not self.batch_enabled:
+            raise web.HTTPNotFound()
+        batch = await request.json()
+        self.batch_requests.append(batch)
+        responses = []
+        for body in batch["requests"]:
+            status, response = self._run_action(body)
+            responses.append({"status": status, "body": response})
+        return web.json_response({"responses": responses})
+
+    def _list_events(self, params: Dict) -> Dict:
+        token = params.get("syncToken")
+        if token:
+            if token in self.expired_tokens:
+                return {"content": [], "events": [], "nextSyncToken": None, "syncTokenExpired": True}
+            since = int(token.split("-")[1])
+            changed_ids = {event_id for version, event_id in self._changes if version > since}
+            events = [self.events[event_id] for event_id in changed_ids]
+        else:
+            events = [
+                e for e in self.events.values()
+                if e["status"] != "cancelled"
+                and e["start"]["dateTime"] < params.get("timeMax", "9999")
+                and e["end"]["dateTime"] > params.get("timeMin", "0000")
+            ]
+        response = {"content": [], "raw": events, "events": events}
+        if token or params.get("sync"):
+            response["nextSyncToken"] = self._current_token()
+        return response
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/mcp/calendar", self._handle)
+        app.router.add_post("/mcp/calendar/batch", self._handle_batch)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/mcp/calendar"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
@@ -0,0 +1,78 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from agent_squad.agents.openai_agent import OpenAIAgent, OpenAIAgentOptions
+
+from agent_registry import AgentRegistry, iterate_sync, run_sync
+
+
+class FakeCompletions:
+    """Stands in for the synchronous OpenAI client's chat.completions."""
+
+    def create(self, stream=False, **options):
+        if stream:
+            return iter(SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))]) for text in ["Tue", "sday"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Tuesday"))])
+
+
+def build_agent(streaming: bool) -> OpenAIAgent:
+    client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    return OpenAIAgent(OpenAIAgentOptions(name="parser", description="test", api_key="unused", client=client, streaming=streaming))
+
+
+def test_direct_calls_only_estimate_the_saving_until_a_routed_call_is_measured():
+    registry = AgentRegistry(api_key=None, classifier_baseline_ms=400)
+    registry.record_timing("parser", "direct", 0.2)
+    registry.record_timing("parser", "direct", 0.4)
+    parser = registry.timing_stats()["parser"]
+    assert parser["direct"] == {"calls": 2, "avg_ms": 300.0}
+    assert parser["saved_ms_per_request"] is None
+    assert parser["saved_ms_total"] is None
+    assert parser["estimated_saved_ms_per_request"] == 400.0
+    assert parser["estimated_saved_ms_total"] == 800.0
+
+
+def test_measured_classifier_hop_replaces_the_baseline():
+    async def main():
+        registry = AgentRegistry(api_key=None, classifier_baseline_ms=400)
+
+        async def classify(text, history):
+            await asyncio.sleep(0.02)
+            return "parser-agent"
+
+        timed = registry._timed_classify("parser", classify)
+        assert await timed("tomorrow at 3pm", []) == "parser-agent"
+        registry.record_timing("parser", "routed", 0.5)
+        registry.record_timing("parser", "stream", 0.1)
+        parser = registry.timing_stats()["parser"]
+        assert parser["classifier"]["calls"] == 1
+        assert parser["saved_ms_per_request"] == parser["classifier"]["avg_ms"] >= 20
+        assert parser["saved_ms_total"] == round(parser["saved_ms_per_request"], 1)
+        assert "estimated_saved_ms_per_request" not in parser
+    asyncio.run(main())
+
+
+def test_no_saving_without_unrouted_calls_or_a_baseline():
+    registry = AgentRegistry(api_key=None)
+    registry.record_timing("parser", "direct", 0.2)
+    registry.record_timing("formatter", "routed", 0.2)
+    report = registry.timing_stats()
+    assert report["parser"]["saved_ms_per_request"] is None
+    assert "estimated_saved_ms_per_request" not in report["parser"]
+    assert "saved_ms_per_request" not in report["formatter"]
+
+
+def test_agent_requests_run_to_completion_without_an_event_loop():
+    reply = run_sync(build_agent(streaming=False).process_request("when?", "user", "session", []))
+    assert reply.content == [{"text": "Tuesday"}]
+
+
+def test_agent_streams_are_iterated_without_an_event_loop():
+    stream = run_sync(build_agent(streaming=True).process_request("when?", "user", "session", []))
+    assert [chunk.text for chunk in iterate_sync(stream) if chunk.text] == ["Tue", "sday"]
+
+
+def test_run_sync_refuses_coroutines_that_wait_on_a_loop():
+    with pytest.raises(RuntimeError, match="awaited the event loop"):
+        run_sync(asyncio.sleep(0))
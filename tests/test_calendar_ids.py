@@ -0,0 +1,90 @@
+import asyncio
+import datetime
+
+import pytest
+
+import scheduling
+from preferences import EventWindow
+
+UTC = datetime.timezone.utc
+
+
+def event(event_id, start, end, **fields):
+    return {"id": event_id, "start": {"dateTime": start}, "end": {"dateTime": end}, **fields}
+
+
+WORK = [
+    event("standup", "2026-10-19T09:00:00Z", "2026-10-19T09:15:00Z", summary="Standup"),
+    event("review", "2026-10-19T14:00:00Z", "2026-10-19T15:00:00Z", summary="Review", iCalUID="shared"),
+]
+PERSONAL = [
+    event("gym", "2026-10-19T07:00:00Z", "2026-10-19T08:00:00Z", summary="Gym"),
+    event("review-copy", "2026-10-19T14:00:00Z", "2026-10-19T15:00:00Z", summary="Review", iCalUID="shared"),
+    event("dentist", "2026-10-19T11:00:00Z", "2026-10-19T12:00:00Z", summary="Dentist"),
+]
+
+
+@pytest.fixture
+def calendars(monkeypatch):
+    monkeypatch.setattr(scheduling, "MCP_CALENDAR_IDS", ["work@example.com", "personal@example.com"])
+    fetched = []
+
+    async def get_event_window(start_iso, end_iso, calendar_email):
+        fetched.append(calendar_email)
+        return EventWindow.from_events({"work@example.com": WORK, "personal@example.com": PERSONAL}[calendar_email])
+
+    monkeypatch.setattr(scheduling, "get_event_window", get_event_window)
+    return fetched
+
+
+def test_calendars_are_merged_in_start_order_with_their_provenance():
+    window = EventWindow.from_calendars({"work@example.com": WORK, "personal@example.com": PERSONAL})
+    assert [(e.event["id"], e.calendar) for e in window] == [
+        ("gym", "personal@example.com"),
+        ("standup", "work@example.com"),
+        ("dentist", "personal@example.com"),
+        ("review", "work@example.com"),  # the shared invite is kept once, under the first calendar
+    ]
+
+
+def test_fetch_event_window_checks_the_configured_calendars(calendars):
+    start = datetime.datetime(2026, 10, 19, tzinfo=UTC)
+    calendar, window = asyncio.run(scheduling.fetch_event_window(start, start + datetime.timedelta(days=1)))
+    assert calendar == "work@example.com"
+    assert sorted(calendars) == ["personal@example.com", "work@example.com"]
+    conflicts = window.conflicts(
+        datetime.datetime(2026, 10, 19, 11, 30, tzinfo=UTC).timestamp(),
+        datetime.datetime(2026, 10, 19, 14, 30, tzinfo=UTC).timestamp(),
+        inperson=False,
+    )
+    assert [(e.event["summary"], e.calendar) for e in conflicts] == [
+        ("Dentist", "personal@example.com"),
+        ("Review", "work@example.com"),
+    ]
+
+
+def test_a_subset_of_the_configured_calendars_can_be_requested(calendars):
+    start = datetime.datetime(2026, 10, 19, tzinfo=UTC)
+    calendar, window = asyncio.run(scheduling.fetch_event_window(start, start + datetime.timedelta(days=1), ["personal@example.com"]))
+    assert calendar == "personal@example.com"
+    assert calendars == ["personal@example.com"]
+    assert len(window) == 3
+
+
+@pytest.mark.parametrize("calendar_ids", [
+    "work@example.com",  # a string, not a list
+    ["work@example.com", 3],
+    [""],
+    {"work@example.com": True},
+    ["someone-else@example.com"],  # reachable by the MCP account, but not configured
+])
+def test_invalid_or_unconfigured_calendar_ids_are_rejected(calendars, calendar_ids):
+    with pytest.raises(ValueError):
+        asyncio.run(scheduling.allowed_calendar_ids(calendar_ids))
+    assert calendars == []
+
+
+def test_missing_calendar_ids_use_the_defaults(calendars):
+    assert asyncio.run(scheduling.allowed_calendar_ids(None)) is None
+    assert asyncio.run(scheduling.allowed_calendar_ids([])) is None
+    assert asyncio.run(scheduling.allowed_calendar_ids(["work@example.com", "work@example.com"])) == ["work@example.com"]
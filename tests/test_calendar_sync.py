@@ -0,0 +1,103 @@
+import asyncio
+import datetime
+
+import pytest
+
+from calendar_sync import CalendarSyncStore
+from mcp_client import MCPClient
+from tests.fake_mcp_server import FakeMCPServer
+
+UTC = datetime.timezone.utc
+WINDOW_START = datetime.datetime(2030, 1, 1, tzinfo=UTC)
+WINDOW_END = datetime.datetime(2030, 1, 15, tzinfo=UTC)
+
+
+def run_with_store(scenario, streaming=False):
+    """Run ``scenario(server, store)`` against a fresh fake MCP server."""
+    async def main():
+        server = FakeMCPServer()
+        url = await server.start()
+        client = MCPClient(url=url)
+        store = CalendarSyncStore(client.post, user_id="test", stream_func=client.stream_events if streaming else None)
+        try:
+            return await scenario(server, store)
+        finally:
+            await client.close()
+            await server.stop()
+    return asyncio.run(main())
+
+
+def event_ids(events):
+    return sorted(e["id"] for e in events)
+
+
+def test_first_sync_is_full_and_returns_window_events():
+    async def scenario(server, store):
+        server.put_event("a", "2030-01-02T10:00:00Z", "2030-01-02T11:00:00Z")
+        server.put_event("b", "2030-01-03T10:00:00Z", "2030-01-03T11:00:00Z")
+        events = await store.sync_window("me@example.com", WINDOW_START, WINDOW_END)
+        assert event_ids(events) == ["a", "b"]
+        assert server.requests[-1]["params"]["sync"] is True
+        assert store.stats()["full_syncs"] == 1
+    run_with_store(scenario)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_refresh_applies_only_changed_and_deleted_events(streaming):
+    async def scenario(server, store):
+        for i in range(50):
+            server.put_event(f"e{i}", f"2030-01-{2 + i % 10:02d}T10:00:00Z", f"2030-01-{2 + i % 10:02d}T11:00:00Z")
+        await store.sync_window("me@example.com", WINDOW_START, WINDOW_END)
+
+        server.put_event("new", "2030-01-05T15:00:00Z", "2030-01-05T16:00:00Z")
+        server.put_event("e1", "2030-01-06T15:00:00Z", "2030-01-06T16:00:00Z")
+        server.delete_event("e2")
+        events = await store.sync_window("me@example.com", WINDOW_START, WINDOW_END)
+
+        sync_request = server.requests[-1]["params"]
+        assert "syncToken" in sync_request and "timeMin" not in sync_request
+        assert store.stats()["incremental_syncs"] == 1
+        # 50 events on the full sync, then only the 3 changed ones
+        assert store.stats()["events_received"] == 53
+        ids = event_ids(events)
+        assert "new" in ids and "e2" not in ids and len(ids) == 50
+        moved = next(e for e in events if e["id"] == "e1")
+        assert moved["start"]["dateTime"] == "2030-01-06T15:00:00Z"
+    run_with_store(scenario, streaming)
+
+
+def test_expired_sync_token_falls_back_to_full_sync():
+    async def scenario(server, store):
+        server.put_event("a", "2030-01-02T10:00:00Z", "2030-01-02T11:00:00Z")
+        await store.sync_window("me@example.com", WINDOW_START, WINDOW_END)
+        server.expired_tokens.add(store.get_calendar("me@example.com").sync_token)
+        server.put_event("b", "2030-01-03T10:00:00Z", "2030-01-03T11:00:00Z")
+
+        events = await store.sync_window("me@example.com", WINDOW_START, WINDOW_END)
+        assert event_ids(events) == ["a", "b"]
+        assert store.stats()["full_syncs"] == 2
+    run_with_store(scenario)
+
+
+def test_window_past_synced_range_triggers_full_sync():
+    async def scenario(server, store):
+        await store.sync_window("me@example.com", WINDOW_START, WINDOW_END)
+        later_end = WINDOW_END + store.horizon_pad + datetime.timedelta(days=1)
+        await store.sync_window("me@example.com", WINDOW_START, later_end)
+        assert store.stats()["full_syncs"] == 2
+        assert store.stats()["incremental_syncs"] == 0
+    run_with_store(scenario)
+
+
+def test_booking_is_patched_in_and_a_write_without_event_forces_a_full_sync():
+    async def scenario(server, store):
+        server.put_event("a", "2030-01-02T10:00:00Z", "2030-01-02T11:00:00Z")
+        await store.sync_window("me@example.com", WINDOW_START, WINDOW_END)
+        booked = {"id": "booked", "start": {"dateTime": "2030-01-04T10:00:00Z"}, "end": {"dateTime": "2030-01-04T11:00:00Z"}}
+        store.record_write("me@example.com", booked)
+        assert event_ids(store.get_calendar("me@example.com").events_in_window(WINDOW_START, WINDOW_END)) == ["a", "booked"]
+
+        store.record_write("me@example.com")
+        await store.sync_window("me@example.com", WINDOW_START, WINDOW_END)
+        assert store.stats()["full_syncs"] == 2
+    run_with_store(scenario)
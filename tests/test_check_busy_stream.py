@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+import scheduling
+from preferences import EventWindow
+
+TIME_WINDOW = {"start_iso": "2026-10-19T14:00:00Z", "end_iso": "2026-10-19T14:30:00Z"}
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    state = {"release_fetch": None, "fetch_error": None, "parse_cancelled": False, "fetch_cancelled": False}
+
+    async def parse_time_window_from_query(user_query, conversation_history, timezone=None):
+        try:
+            if state["fetch_error"] is not None:
+                await asyncio.sleep(10)  # a slow LLM parse
+            return TIME_WINDOW
+        except asyncio.CancelledError:
+            state["parse_cancelled"] = True
+            raise
+
+    async def fetch_event_window(start, end, calendar_ids=None):
+        try:
+            if state["fetch_error"] is not None:
+                raise state["fetch_error"]
+            await state["release_fetch"].wait()
+            return "me@example.com", EventWindow.from_events([])
+        except asyncio.CancelledError:
+            state["fetch_cancelled"] = True
+            raise
+
+    monkeypatch.setattr(scheduling, "parse_time_window_from_query", parse_time_window_from_query)
+    monkeypatch.setattr(scheduling, "fetch_event_window", fetch_event_window)
+    return state
+
+
+def test_time_window_is_sent_before_the_fetch_finishes(stages):
+    async def main():
+        stages["release_fetch"] = asyncio.Event()
+        stream = scheduling.check_busy_stream("tomorrow at 2pm", skip_llm_formatting=True)
+        assert await asyncio.wait_for(stream.__anext__(), timeout=1) == ("time_window", TIME_WINDOW)
+
+        stages["release_fetch"].set()
+        event, payload = await stream.__anext__()
+        assert event == "availability" and payload == {"is_busy": False, "conflicts": []}
+        await stream.aclose()
+    asyncio.run(main())
+
+
+def test_closing_the_stream_early_cancels_the_fetch(stages):
+    async def main():
+        stages["release_fetch"] = asyncio.Event()
+        stream = scheduling.check_busy_stream("tomorrow at 2pm", skip_llm_formatting=True)
+        await stream.__anext__()
+        await stream.aclose()
+        assert stages["fetch_cancelled"]
+    asyncio.run(main())
+
+
+def test_fetch_failure_cancels_the_parse(stages):
+    async def main():
+        stages["fetch_error"] = RuntimeError("MCP down")
+        stream = scheduling.check_busy_stream("tomorrow at 2pm", skip_llm_formatting=True)
+        with pytest.raises(RuntimeError, match="MCP down"):
+            await asyncio.wait_for(stream.__anext__(), timeout=1)
+        assert stages["parse_cancelled"]
+    asyncio.run(main())
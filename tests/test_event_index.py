@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from event_index import ColumnarIntervals, IntervalIndex, OccupancyBitmap
+
+MINUTE = 60
+ORIGIN = 1_700_000_040  # a minute boundary
+HORIZON = 24 * 60 * MINUTE
+
+
+def brute_force_free(intervals, start, end):
+    return not any(s < end and e > start for s, e in intervals)
+
+
+def random_intervals(rng, count):
+    intervals = []
+    for _ in range(count):
+        start = ORIGIN + rng.randrange(0, 24 * 60) * MINUTE
+        length = rng.choice([0, 0, 15, 30, 60, 90]) * MINUTE  # zero-length events included
+        intervals.append((start, start + length))
+    return intervals
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_backends_agree_with_brute_force(seed):
+    rng = random.Random(seed)
+    intervals = random_intervals(rng, rng.randrange(0, 30))
+    index = IntervalIndex((s, e, None) for s, e in intervals)
+    bitmap = OccupancyBitmap(intervals, ORIGIN, ORIGIN + HORIZON, MINUTE)
+    queries = []
+    for _ in range(300):
+        start = ORIGIN + rng.randrange(0, 24 * 60 - 120) * MINUTE
+        queries.append((start, start + rng.choice([15, 30, 45, 60]) * MINUTE))
+    queries += [(s, s + 30 * MINUTE) for s, e in intervals if s + 30 * MINUTE <= ORIGIN + HORIZON]
+    queries += [(s - 30 * MINUTE, s) for s, e in intervals if s - 30 * MINUTE >= ORIGIN]
+    queries += [(s - 15 * MINUTE, s + 15 * MINUTE) for s, e in intervals if s - 15 * MINUTE >= ORIGIN]
+    queries = [(start, end) for start, end in queries if bitmap.covers(start, end)]
+
+    columnar = ColumnarIntervals([s for s, _ in sorted(intervals)], [e for _, e in sorted(intervals)])
+    mask = columnar.free_mask([s for s, _ in queries], [e for _, e in queries])
+    for (start, end), column_free in zip(queries, mask):
+        expected = brute_force_free(intervals, start, end)
+        assert (not index.overlaps_any(start, end)) == expected
+        assert bool(column_free) == expected
+        assert bitmap.is_free(start, end) == expected
+
+
+def test_zero_length_event_blocks_only_slots_that_straddle_it():
+    point = ORIGIN + 60 * MINUTE
+    bitmap = OccupancyBitmap([(point, point)], ORIGIN, ORIGIN + HORIZON, MINUTE)
+    assert bitmap.is_free(point - 30 * MINUTE, point + 30 * MINUTE) is False
+    assert bitmap.is_free(point, point + 30 * MINUTE) is True
+    assert bitmap.is_free(point - 30 * MINUTE, point) is True
+
+
+def test_zero_length_query_inside_a_busy_event_is_busy():
+    bitmap = OccupancyBitmap([(ORIGIN, ORIGIN + 60 * MINUTE)], ORIGIN, ORIGIN + HORIZON, MINUTE)
+    assert bitmap.is_free(ORIGIN + 30, ORIGIN + 30) is False
+    assert bitmap.is_free(ORIGIN + 90 * MINUTE + 30, ORIGIN + 90 * MINUTE + 30) is True
+    # on a cell boundary the bitmap can't tell "inside" from "where two events meet"
+    assert bitmap.is_free(ORIGIN + 30 * MINUTE, ORIGIN + 30 * MINUTE) is None
+
+
+def test_unaligned_event_only_makes_its_own_cells_inexact():
+    intervals = [(ORIGIN + 30, ORIGIN + 10 * MINUTE), (ORIGIN + 120 * MINUTE, ORIGIN + 180 * MINUTE)]
+    bitmap = OccupancyBitmap(intervals, ORIGIN, ORIGIN + HORIZON, MINUTE)
+    assert not bitmap.exact
+    assert bitmap.is_free(ORIGIN, ORIGIN + 5 * MINUTE) is None
+    assert bitmap.is_free(ORIGIN + 90 * MINUTE, ORIGIN + 150 * MINUTE) is False
+    assert bitmap.is_free(ORIGIN + 300 * MINUTE, ORIGIN + 360 * MINUTE) is True
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_bitmap_with_unaligned_events_is_right_or_defers(seed):
+    rng = random.Random(seed)
+    intervals = []
+    for s, e in random_intervals(rng, rng.randrange(0, 30)):
+        shift = rng.choice([0, 0, 20])
+        intervals.append((s + shift, e + shift if e == s else e + rng.choice([0, 0, 40])))
+    bitmap = OccupancyBitmap(intervals, ORIGIN, ORIGIN + HORIZON, MINUTE)
+    for _ in range(300):
+        start = ORIGIN + rng.randrange(0, (24 * 60 - 120) * MINUTE)
+        end = start + rng.choice([0, 0, 15, 30, 60]) * MINUTE
+        free = bitmap.is_free(start, end)
+        assert free is None or free == brute_force_free(intervals, start, end)
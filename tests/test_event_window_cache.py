@@ -0,0 +1,88 @@
+import asyncio
+import datetime
+import random
+
+import scheduling
+from cache import EventWindowCache, filter_events_to_window
+from preferences import EventWindow
+
+UTC = datetime.timezone.utc
+DAY = datetime.datetime(2026, 10, 19, tzinfo=UTC)
+
+
+def iso(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def event(event_id, start, minutes):
+    return {"id": event_id, "start": {"dateTime": iso(start)}, "end": {"dateTime": iso(start + datetime.timedelta(minutes=minutes))}}
+
+
+def test_slice_matches_filtering_the_raw_events():
+    rng = random.Random(7)
+    events = [
+        event(str(i), DAY + datetime.timedelta(minutes=15 * rng.randrange(0, 4 * 24 * 3)), rng.choice([0, 30, 60, 240]))
+        for i in range(200)
+    ]
+    events.append({"id": "all-day", "start": {"date": "2026-10-20"}, "end": {"date": "2026-10-21"}})
+    window = EventWindow.from_events(events)
+    for _ in range(50):
+        start = DAY + datetime.timedelta(minutes=rng.randrange(0, 3 * 24 * 60))
+        end = start + datetime.timedelta(minutes=rng.randrange(1, 24 * 60))
+        expected = [e["id"] for e in filter_events_to_window(events, start, end)]
+        assert sorted(e.event["id"] for e in window.slice(start.timestamp(), end.timestamp())) == sorted(expected)
+
+
+def test_indexed_entry_is_built_once_and_rebuilt_after_a_booking():
+    builds = []
+
+    def index(events):
+        builds.append(len(events))
+        return EventWindow.from_events(events)
+
+    cache = EventWindowCache(ttl_seconds=60, index_func=index)
+    cache.put("me@example.com", DAY, DAY + datetime.timedelta(days=2), [event("a", DAY.replace(hour=9), 30)])
+    first = cache.get_indexed("me@example.com", DAY, DAY + datetime.timedelta(days=1))
+    second = cache.get_indexed("me@example.com", DAY + datetime.timedelta(hours=1), DAY + datetime.timedelta(days=1))
+    assert first is second and builds == [1]
+
+    cache.add_event("me@example.com", event("b", DAY.replace(hour=14), 30))
+    rebuilt = cache.get_indexed("me@example.com", DAY, DAY + datetime.timedelta(days=1))
+    assert builds == [1, 2] and len(rebuilt) == 2
+
+    # A fetch that stores its already-built window is reused as-is
+    fetched = EventWindow.from_events([])
+    cache.put("me@example.com", DAY, DAY + datetime.timedelta(days=3), [], index=fetched)
+    assert cache.get_indexed("me@example.com", DAY, DAY + datetime.timedelta(days=3)) is fetched
+    assert cache.get_indexed("other@example.com", DAY, DAY + datetime.timedelta(days=1)) is None
+
+
+def test_get_events_for_window_still_returns_event_dicts(monkeypatch):
+    cache = EventWindowCache(ttl_seconds=60, index_func=EventWindow.from_events)
+    events = [event("a", DAY.replace(hour=9), 30), event("b", DAY.replace(hour=20), 30)]
+    cache.put("me@example.com", DAY, DAY + datetime.timedelta(days=1), events)
+    monkeypatch.setattr(scheduling, "event_cache", cache)
+
+    result = asyncio.run(scheduling.get_events_for_window(iso(DAY), iso(DAY.replace(hour=12)), "me@example.com"))
+    assert result == [events[0]]
+
+
+def test_booking_is_recorded_for_every_configured_calendar(monkeypatch):
+    monkeypatch.setattr(scheduling, "MCP_CALENDAR_IDS", ["work@example.com", "personal@example.com"])
+    cache = EventWindowCache(ttl_seconds=60)
+    for calendar in ("work@example.com", "personal@example.com"):
+        cache.put(calendar, DAY, DAY + datetime.timedelta(days=1), [])
+    monkeypatch.setattr(scheduling, "event_cache", cache)
+    writes = []
+    monkeypatch.setattr(scheduling.prefetcher, "record_write", lambda calendar, event=None: writes.append(("prefetch", calendar, event)))
+    monkeypatch.setattr(scheduling.sync_store, "record_write", lambda calendar, event=None: writes.append(("sync", calendar, event)))
+
+    booked = event("booked", DAY.replace(hour=10), 60)
+    asyncio.run(scheduling.record_booking("work@example.com", booked))
+
+    for calendar in ("work@example.com", "personal@example.com"):
+        assert [e["id"] for e in cache.get(calendar, DAY, DAY + datetime.timedelta(days=1))] == ["booked"]
+    assert writes == [
+        ("prefetch", "work@example.com", booked), ("sync", "work@example.com", booked),
+        ("prefetch", "personal@example.com", booked), ("sync", "personal@example.com", None),
+    ]
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from json_stream import JSONStreamDecoder
+
+EVENT_ARRAYS = (("events",), ("raw", "items"))
+FIELDS = (("nextSyncToken",), ("responses", "*", "status"))
+
+
+def decode(text, chunk_size, arrays=EVENT_ARRAYS, fields=FIELDS):
+    items, values = [], {}
+    decoder = JSONStreamDecoder(
+        arrays, fields,
+        lambda pattern, path, value: items.append((path, value)),
+        lambda pattern, path, value: values.__setitem__(path, value),
+    )
+    for i in range(0, len(text), chunk_size):
+        decoder.feed(text[i:i + chunk_size])
+    decoder.close()
+    return items, values
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 10_000])
+def test_selected_arrays_and_fields_match_a_full_parse(chunk_size):
+    events = [
+        {"id": "a", "summary": "quote \" and \\ backslash", "n": [1, 2.5e-3, None], "ok": True},
+        {"id": "b", "description": "é " * 20, "nested": {"events": ["not", "these"]}},
+    ]
+    document = {
+        "content": [{"type": "text", "text": "line\n" * 100}],
+        "events": events,
+        "raw": {"items": events[:1]},
+        "nextSyncToken": "token-12",
+        "other": [123456, -7.25, False],
+    }
+    items, values = decode(json.dumps(document), chunk_size)
+    assert items == [(("events", 0), events[0]), (("events", 1), events[1]), (("raw", "items", 0), events[0])]
+    assert values == {("nextSyncToken",): "token-12"}
+
+
+def test_wildcard_paths_report_the_record_index():
+    document = {"responses": [{"status": 200, "body": {"events": [{"id": "x"}]}}, {"status": 404, "body": {}}]}
+    items, values = decode(
+        json.dumps(document), 5,
+        arrays=[("responses", "*", "body", "events")], fields=[("responses", "*", "status")],
+    )
+    assert items == [(("responses", 0, "body", "events", 0), {"id": "x"})]
+    assert values == {("responses", 0, "status"): 200, ("responses", 1, "status"): 404}
+
+
+def test_truncated_document_is_an_error():
+    decoder = JSONStreamDecoder(EVENT_ARRAYS, FIELDS, lambda *args: None, lambda *args: None)
+    decoder.feed('{"events": [{"id": "a"}, {"id": ')
+    with pytest.raises(ValueError):
+        decoder.close()
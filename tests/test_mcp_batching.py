@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from mcp_client import MCPBatcher, MCPClient, MCPHTTPError
+from tests.fake_mcp_server import FakeMCPServer
+
+
+def run_with_batcher(scenario, **batcher_options):
+    """Run ``scenario(server, batcher)`` against a fresh fake MCP server."""
+    async def main():
+        server = FakeMCPServer()
+        url = await server.start()
+        client = MCPClient(url=url)
+        batcher = MCPBatcher(client, **batcher_options)
+        try:
+            return await scenario(server, batcher, client)
+        finally:
+            await client.close()
+            await server.stop()
+    return asyncio.run(main())
+
+
+def list_events(day: int) -> dict:
+    return {
+        "action": "list-events",
+        "params": {
+            "calendarId": "me@example.com",
+            "timeMin": f"2030-01-{day:02d}T00:00:00Z",
+            "timeMax": f"2030-01-{day + 1:02d}T00:00:00Z",
+        },
+    }
+
+
+def put_daily_events(server, days):
+    for day in days:
+        server.put_event(f"e{day}", f"2030-01-{day:02d}T10:00:00Z", f"2030-01-{day:02d}T11:00:00Z")
+
+
+def test_concurrent_reads_share_one_request_and_get_their_own_results():
+    async def scenario(server, batcher, client):
+        put_daily_events(server, range(2, 6))
+        results = await asyncio.gather(*(batcher.post(list_events(day)) for day in range(2, 6)))
+        assert [[e["id"] for e in result["events"]] for result in results] == [["e2"], ["e3"], ["e4"], ["e5"]]
+        assert len(server.batch_requests) == 1
+        assert client.pool_stats()["total_requests"] == 1
+        assert batcher.stats()["batched_actions"] == 4
+    run_with_batcher(scenario, flush_delay=0.01)
+
+
+def test_batches_are_capped_at_max_batch():
+    async def scenario(server, batcher, client):
+        await asyncio.gather(*(batcher.post(list_events(day)) for day in range(2, 7)))
+        assert [len(batch["requests"]) for batch in server.batch_requests] == [2, 2]
+        # the fifth action was alone in its flush and went out as a plain request
+        assert client.pool_stats()["total_requests"] == 3
+    run_with_batcher(scenario, flush_delay=0.01, max_batch=2)
+
+
+def test_failed_action_only_fails_its_own_caller():
+    async def scenario(server, batcher, client):
+        put_daily_events(server, [2])
+        good, bad = await asyncio.gather(
+            batcher.post(list_events(2)),
+            batcher.post({"action": "freebusy", "params": {}}),
+            return_exceptions=True,
+        )
+        assert [e["id"] for e in good["events"]] == ["e2"]
+        assert isinstance(bad, MCPHTTPError) and bad.status == 400
+    # the fake server does not implement freebusy, so it answers 400
+    run_with_batcher(scenario, flush_delay=0.01)
+
+
+def test_writes_are_never_batched():
+    async def scenario(server, batcher, client):
+        results = await asyncio.gather(
+            batcher.post(list_events(2)),
+            batcher.post({"action": "create-event", "params": {}}),
+            return_exceptions=True,
+        )
+        assert isinstance(results[1], MCPHTTPError) and results[1].status == 400
+        assert server.batch_requests == []
+        assert batcher.stats()["direct_actions"] == 2
+    run_with_batcher(scenario, flush_delay=0.01)
+
+
+def test_server_without_batch_endpoint_falls_back_to_single_requests():
+    async def scenario(server, batcher, client):
+        server.batch_enabled = False
+        put_daily_events(server, range(2, 5))
+        results = await asyncio.gather(*(batcher.post(list_events(day)) for day in range(2, 5)))
+        assert [[e["id"] for e in result["events"]] for result in results] == [["e2"], ["e3"], ["e4"]]
+        # later reads skip the batch endpoint altogether
+        await asyncio.gather(*(batcher.post(list_events(day)) for day in range(2, 5)))
+        assert client.pool_stats()["total_requests"] == 1 + 3 + 3
+    run_with_batcher(scenario, flush_delay=0.01)
+
+
+@pytest.mark.parametrize("max_batch", [1, 16])
+def test_single_read_is_sent_as_a_plain_request(max_batch):
+    async def scenario(server, batcher, client):
+        put_daily_events(server, [2])
+        result = await batcher.post(list_events(2))
+        assert [e["id"] for e in result["events"]] == ["e2"]
+        assert server.batch_requests == []
+    run_with_batcher(scenario, flush_delay=0.01, max_batch=max_batch)
+
+
+def test_streamed_reads_share_a_batch_and_each_get_their_events():
+    async def scenario(server, batcher, client):
+        put_daily_events(server, range(2, 5))
+        received = {day: [] for day in range(2, 5)}
+        results = await asyncio.gather(*(
+            batcher.stream_events(list_events(day), received[day].append) for day in range(2, 5)
+        ))
+        # the fake server lists events under both "raw" and "events"; each arrives once
+        assert {day: [e["id"] for e in events] for day, events in received.items()} == {2: ["e2"], 3: ["e3"], 4: ["e4"]}
+        assert results == [{}, {}, {}]
+        assert len(server.batch_requests) == 1
+    run_with_batcher(scenario, flush_delay=0.01)
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import pytest
+
+from background_loop import BackgroundLoop
+from mcp_client import MCPClient
+from tests.fake_mcp_server import FakeMCPServer
+
+LIST_CALENDARS = {"action": "list-calendars", "params": {}}
+
+
+@pytest.fixture
+def served():
+    """A fake MCP server and a client, both living on a background loop."""
+    runtime = BackgroundLoop("test-loop")
+    server = FakeMCPServer()
+    url = runtime.run(server.start())
+    client = MCPClient(url=url)
+    yield runtime, client
+    runtime.run(client.close())
+    runtime.run(server.stop())
+    runtime.stop()
+
+
+def test_session_from_a_still_running_loop_is_closed_on_that_loop(served):
+    runtime, client = served
+    runtime.run(client.post(LIST_CALENDARS))
+    old_session = client._session
+
+    async def main():
+        await client.post(LIST_CALENDARS)
+        await client.close()
+    asyncio.run(main())
+
+    deadline = time.monotonic() + 1
+    while not old_session.closed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert old_session.closed
+
+
+def test_session_left_open_on_a_finished_loop_raises():
+    runtime = BackgroundLoop("server-loop")
+    server = FakeMCPServer()
+    url = runtime.run(server.start())
+    try:
+        client = MCPClient(url=url)
+        asyncio.run(client.post(LIST_CALENDARS))  # never closed before its loop ended
+        with pytest.raises(RuntimeError, match="no longer running"):
+            asyncio.run(client.post(LIST_CALENDARS))
+    finally:
+        runtime.run(server.stop())
+        runtime.stop()
+
+
+def test_pool_stats_tolerate_missing_aiohttp_internals(served):
+    runtime, client = served
+    runtime.run(client.post(LIST_CALENDARS))
+    assert runtime.run(_stats(client))["open"] >= 0
+
+    class Opaque:
+        closed = False
+
+    client._connector = Opaque()
+    stats = client.pool_stats()
+    assert stats["in_use"] is None and stats["open"] is None
+    assert stats["total_requests"] == 1
+
+
+async def _stats(client):
+    return client.pool_stats()
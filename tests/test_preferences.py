@@ -0,0 +1,34 @@
+from preferences import EventWindow, around_online_meetings
+
+MEET = {"description": "https://meet.google.com/abc"}
+
+
+def online(event_id, start, end):
+    return {"id": event_id, "start": {"dateTime": start}, "end": {"dateTime": end}, **MEET}
+
+
+def slots(events, duration_minutes=30):
+    return [c.key for c in around_online_meetings(EventWindow.from_events(events), duration_minutes)]
+
+
+def test_preferred_hours_are_checked_on_each_meetings_own_clock():
+    # 10:00-11:00 in Berlin is 08:00-09:00 UTC; the 9:30 slot before it still counts
+    assert slots([online("berlin", "2030-01-07T10:00:00+02:00", "2030-01-07T11:00:00+02:00")]) == [
+        ("2030-01-07T07:30:00Z", "2030-01-07T08:00:00Z"),
+        ("2030-01-07T09:00:00Z", "2030-01-07T09:30:00Z"),
+    ]
+    # An evening meeting in New York is past 7 PM in UTC but not on its own clock
+    assert slots([online("ny", "2030-01-07T18:15:00-05:00", "2030-01-07T18:45:00-05:00")]) == [
+        ("2030-01-07T22:45:00Z", "2030-01-07T23:15:00Z"),
+        ("2030-01-07T23:45:00Z", "2030-01-08T00:15:00Z"),
+    ]
+
+
+def test_meetings_are_taken_in_start_order():
+    events = [
+        online("later", "2030-01-08T14:00:00Z", "2030-01-08T15:00:00Z"),
+        online("earlier", "2030-01-07T14:00:00Z", "2030-01-07T15:00:00Z"),
+    ]
+    assert [start for start, _ in slots(events)] == [
+        "2030-01-07T13:30:00Z", "2030-01-07T15:00:00Z", "2030-01-08T13:30:00Z", "2030-01-08T15:00:00Z",
+    ]
@@ -0,0 +1,117 @@
+import asyncio
+import datetime
+
+from prefetcher import CalendarPrefetcher
+
+UTC = datetime.timezone.utc
+
+
+def iso(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class FakeLoader:
+    """Records loads and returns the current event list, optionally after a delay."""
+
+    def __init__(self, events):
+        self.events = events
+        self.loads = 0
+        self.delay = 0
+
+    async def __call__(self, calendar, start, end):
+        self.loads += 1
+        await asyncio.sleep(self.delay)
+        return list(self.events)
+
+
+async def calendars():
+    return ["me@example.com"]
+
+
+def make_prefetcher(loader, **options):
+    return CalendarPrefetcher(loader, calendars, horizon=datetime.timedelta(days=15), **options)
+
+
+def window():
+    start = datetime.datetime.now(UTC).replace(microsecond=0) + datetime.timedelta(seconds=1)
+    return start, start + datetime.timedelta(days=14)
+
+
+def test_reads_are_served_from_the_snapshot_until_it_goes_stale():
+    async def main():
+        loader = FakeLoader([])
+        prefetcher = make_prefetcher(loader, max_staleness=60)
+        assert prefetcher.get("me@example.com", *window()) is None  # nothing prefetched yet
+
+        await prefetcher.refresh("me@example.com")
+        assert prefetcher.get("me@example.com", *window()) == []
+        assert prefetcher.get("other@example.com", *window()) is None
+
+        prefetcher.max_staleness = 0
+        assert prefetcher.get("me@example.com", *window()) is None
+        assert prefetcher.stats()["stale"] == 1
+    asyncio.run(main())
+
+
+def test_refresh_loop_runs_until_stopped():
+    async def main():
+        loader = FakeLoader([])
+        prefetcher = make_prefetcher(loader, interval=0.01)
+        await prefetcher.start()
+        await asyncio.sleep(0.05)
+        await prefetcher.stop()
+        loads = loader.loads
+        assert loads >= 2 and not prefetcher.running
+        await asyncio.sleep(0.03)
+        assert loader.loads == loads
+    asyncio.run(main())
+
+
+def test_write_patches_snapshot_and_wins_over_an_older_refresh():
+    async def main():
+        in_two_days = datetime.datetime.now(UTC) + datetime.timedelta(days=2)
+        loader = FakeLoader([])
+        prefetcher = make_prefetcher(loader)
+        await prefetcher.refresh("me@example.com")
+
+        # A refresh starts, then a booking lands before it returns
+        loader.delay = 0.02
+        refresh = asyncio.ensure_future(prefetcher.refresh("me@example.com"))
+        await asyncio.sleep(0)
+        booked = {
+            "id": "new",
+            "start": {"dateTime": iso(in_two_days)},
+            "end": {"dateTime": iso(in_two_days + datetime.timedelta(hours=1))},
+        }
+        prefetcher.record_write("me@example.com", booked)
+        await refresh
+
+        assert [e["id"] for e in prefetcher.get("me@example.com", *window())] == ["new"]
+
+        # Without an event to patch in, the snapshot is dropped
+        prefetcher.record_write("me@example.com")
+        assert prefetcher.get("me@example.com", *window()) is None
+    asyncio.run(main())
+
+
+def test_indexed_snapshot_is_built_once_and_rebuilt_after_a_write():
+    async def main():
+        builds = []
+
+        def index(events):
+            builds.append(len(events))
+            return list(events)
+
+        loader = FakeLoader([])
+        prefetcher = make_prefetcher(loader, index_func=index)
+        await prefetcher.refresh("me@example.com")
+        assert prefetcher.get_indexed("me@example.com", *window()) == []
+        assert prefetcher.get_indexed("me@example.com", *window()) == []
+        assert builds == [0]
+
+        start = datetime.datetime.now(UTC) + datetime.timedelta(days=2)
+        booked = {"id": "booked", "start": {"dateTime": iso(start)}, "end": {"dateTime": iso(start + datetime.timedelta(hours=1))}}
+        prefetcher.record_write("me@example.com", booked)
+        assert prefetcher.get_indexed("me@example.com", *window()) == [booked]
+        assert builds == [0, 1]
+    asyncio.run(main())
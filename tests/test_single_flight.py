@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from cache import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    async def main():
+        flights = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ["event"]
+
+        results = await asyncio.gather(*(flights.do("me@example.com", fetch) for _ in range(5)))
+        assert results == [["event"]] * 5
+        assert len(calls) == 1
+        assert flights.stats() == {"calls": 1, "coalesced": 4, "in_flight": 0}
+
+        # once finished, the next call fetches again
+        await flights.do("me@example.com", fetch)
+        assert len(calls) == 2
+    asyncio.run(main())
+
+
+def test_covering_call_is_joined():
+    async def main():
+        flights = SingleFlight()
+
+        async def fetch(window):
+            await asyncio.sleep(0.01)
+            return window
+
+        wide = asyncio.ensure_future(flights.do((0, 100), lambda: fetch("wide")))
+        await asyncio.sleep(0)
+        inside = flights.do((10, 20), lambda: fetch("narrow"), covers=lambda key: key[0] <= 10 and key[1] >= 20)
+        outside = flights.do((90, 120), lambda: fetch("later"), covers=lambda key: key[0] <= 90 and key[1] >= 120)
+        assert await asyncio.gather(wide, inside, outside) == ["wide", "wide", "later"]
+        assert flights.coalesced == 1
+    asyncio.run(main())
+
+
+def test_error_reaches_every_waiter_and_cancelled_waiter_does_not_cancel_the_call():
+    async def main():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            raise RuntimeError("MCP returned 500")
+
+        first = asyncio.ensure_future(flights.do("key", fetch))
+        second = asyncio.ensure_future(flights.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        with pytest.raises(RuntimeError):
+            await second
+        assert first.cancelled()
+    asyncio.run(main())
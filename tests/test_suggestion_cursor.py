@@ -0,0 +1,121 @@
+import asyncio
+import datetime
+
+import pytest
+
+import scheduling
+from cache import EventWindowCache
+from preferences import EventWindow, SuggestionCursor
+
+UTC = datetime.timezone.utc
+CALENDAR = "me@example.com"
+DAY = datetime.datetime(2026, 10, 19, tzinfo=UTC)
+
+
+def iso(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def slot(hour):
+    start = DAY.replace(hour=hour)
+    return {"start_iso": iso(start), "end_iso": iso(start + datetime.timedelta(minutes=30))}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(scheduling, "MCP_CALENDAR_IDS", [CALENDAR])
+    cache = EventWindowCache(ttl_seconds=60, index_func=EventWindow.from_events)
+    cache.put(CALENDAR, DAY, DAY + datetime.timedelta(days=1), [])
+    monkeypatch.setattr(scheduling, "event_cache", cache)
+
+    async def load_events_window(calendar, start, end):
+        raise AssertionError("more_suggestions should be served from the cached events")
+
+    monkeypatch.setattr(scheduling, "load_events_window", load_events_window)
+    return cache
+
+
+def test_slot_booked_after_the_cursor_opened_is_not_served(cache):
+    async def main():
+        cursor_id = scheduling.open_suggestion_cursor(
+            SuggestionCursor(iter([slot(9), slot(10), slot(11), slot(12)]), calendars=[CALENDAR])
+        )
+        first = await scheduling.more_suggestions(cursor_id, 1)
+        assert first["suggested_times"] == [slot(9)]
+
+        # 10:00 gets booked through this server (create_calendar_event patches the cache)
+        booked = slot(10)
+        cache.add_event(CALENDAR, {
+            "id": "booked", "summary": "Booked",
+            "start": {"dateTime": booked["start_iso"]}, "end": {"dateTime": booked["end_iso"]},
+            "hangoutLink": "https://meet.google.com/abc",
+        })
+
+        rest = await scheduling.more_suggestions(cursor_id, 2)
+        assert rest["suggested_times"] == [slot(11), slot(12)]
+        assert rest["has_more"] is False
+    asyncio.run(main())
+
+
+def book(cache, hour):
+    booked = slot(hour)
+    cache.add_event(CALENDAR, {
+        "id": f"booked-{hour}", "start": {"dateTime": booked["start_iso"]}, "end": {"dateTime": booked["end_iso"]},
+    })
+
+
+def test_events_are_fetched_once_per_call_for_the_cursor_window(monkeypatch):
+    monkeypatch.setattr(scheduling, "MCP_CALENDAR_IDS", [CALENDAR])
+    monkeypatch.setattr(scheduling, "event_cache", EventWindowCache(ttl_seconds=0))
+    fetches = []
+    busy = [{"id": f"b{hour}", "start": {"dateTime": slot(hour)["start_iso"]}, "end": {"dateTime": slot(hour)["end_iso"]}}
+            for hour in (9, 10, 11)]
+
+    async def load_events_window(calendar, start, end):
+        fetches.append((start, end))
+        return busy
+
+    monkeypatch.setattr(scheduling, "load_events_window", load_events_window)
+
+    async def main():
+        window = (DAY, DAY + datetime.timedelta(days=1))
+        cursor_id = scheduling.open_suggestion_cursor(SuggestionCursor(
+            iter([slot(hour) for hour in range(9, 15)]), calendars=[CALENDAR], window=window
+        ))
+        # 9, 10 and 11 were booked since: each refill re-checks against the same fetch
+        page = await scheduling.more_suggestions(cursor_id, 1)
+        assert page["suggested_times"] == [slot(12)]
+        assert len(fetches) == 1
+        assert fetches[0][0] <= window[0] and fetches[0][1] >= window[1]
+    asyncio.run(main())
+
+
+def test_concurrent_pages_of_one_cursor_are_served_in_turn(cache, monkeypatch):
+    fetch_event_window = scheduling.fetch_event_window
+
+    async def slow_fetch_event_window(start, end, calendar_ids=None):
+        await asyncio.sleep(0.01)
+        return await fetch_event_window(start, end, calendar_ids)
+
+    monkeypatch.setattr(scheduling, "fetch_event_window", slow_fetch_event_window)
+
+    async def main():
+        cursor_id = scheduling.open_suggestion_cursor(
+            SuggestionCursor(iter([slot(hour) for hour in range(9, 14)]), calendars=[CALENDAR])
+        )
+        book(cache, 10)
+        first, second = await asyncio.gather(
+            scheduling.more_suggestions(cursor_id, 2),
+            scheduling.more_suggestions(cursor_id, 2),
+        )
+        assert first["suggested_times"] == [slot(9), slot(11)]
+        assert second["suggested_times"] == [slot(12), slot(13)]
+        assert second["has_more"] is False
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("count", [0, -1, scheduling.MORE_SUGGESTIONS_MAX_COUNT + 1])
+def test_page_size_is_bounded(cache, count):
+    cursor_id = scheduling.open_suggestion_cursor(SuggestionCursor(iter([slot(9)]), calendars=[CALENDAR]))
+    with pytest.raises(ValueError, match="count must be between"):
+        asyncio.run(scheduling.more_suggestions(cursor_id, count))
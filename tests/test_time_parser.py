@@ -0,0 +1,61 @@
+import datetime
+
+import pytest
+
+from time_parser import parse_time_window
+
+# Saturday 17 Oct 2026, 12:00 UTC; the viewer is in London (BST, UTC+1)
+NOW = datetime.datetime(2026, 10, 17, 12, 0, tzinfo=datetime.timezone.utc)
+TZ = "Europe/London"
+
+
+def parse(query):
+    return parse_time_window(query, NOW, TZ)
+
+
+@pytest.mark.parametrize("query, start, end", [
+    ("tomorrow at 3pm", "2026-10-18T14:00:00Z", "2026-10-18T14:30:00Z"),
+    ("tomorrow at 3pm for an hour", "2026-10-18T14:00:00Z", "2026-10-18T15:00:00Z"),
+    ("Monday 2-4pm", "2026-10-19T13:00:00Z", "2026-10-19T15:00:00Z"),
+    ("between 2 and 4pm on Monday", "2026-10-19T13:00:00Z", "2026-10-19T15:00:00Z"),
+    ("Monday morning", "2026-10-19T08:00:00Z", "2026-10-19T11:00:00Z"),
+    ("Nov 14 at 10:30am", "2026-11-14T10:30:00Z", "2026-11-14T11:00:00Z"),
+    ("are you free tomorrow at 3pm my time", "2026-10-18T14:00:00Z", "2026-10-18T14:30:00Z"),
+    ("is tomorrow at 3pm a good time", "2026-10-18T14:00:00Z", "2026-10-18T14:30:00Z"),
+])
+def test_common_phrases_are_parsed_in_the_viewer_timezone(query, start, end):
+    assert parse(query) == {"start_iso": start, "end_iso": end}
+
+
+@pytest.mark.parametrize("query", [
+    "tomorrow at 3pm EST",
+    "tomorrow at 3pm PST",
+    "tomorrow at 3pm utc",
+    "tomorrow at 3pm GMT",
+    "tomorrow at 3pm CET",
+    "tomorrow at 3pm eastern",
+    "tomorrow at 3pm new york time",
+    "tomorrow at 3pm London time",
+    "tomorrow at 3pm in my time zone",
+    "tomorrow at 3pm UTC+2",
+    "tomorrow at 3pm utc-5",
+    "tomorrow at 15:00 +02:00",
+])
+def test_explicit_timezone_goes_to_the_llm(query):
+    assert parse(query) is None
+
+
+@pytest.mark.parametrize("query", [
+    "tomorrow at 3",  # am or pm?
+    "tomorrow before 3pm",
+    "Monday or Tuesday at 3pm",
+    "same time next week",
+    "in 2 hours",
+    "Saturday at 3pm",  # said on a Saturday
+    "next Sunday at 10am",  # said on a Saturday: tomorrow or the Sunday after?
+    "Friday Nov 14 at 10am",  # Nov 14 is a Saturday
+    "tomorrow at 3pm and 5pm",
+    "sometime soon",
+])
+def test_ambiguous_or_unsupported_queries_go_to_the_llm(query):
+    assert parse(query) is None
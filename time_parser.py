@@ -0,0 +1,272 @@
+"""
+Rule-based fast path for extracting a time window from a scheduling query.
+Handles common English phrases ("tomorrow at 3pm for 30 minutes", "next Monday
+morning", "Friday 2-4pm", "Nov 14 at 10:30am") in the viewer's timezone, so the
+LLM parser is only needed for queries this module is not confident about.
+"""
+
+import re
+import datetime
+from typing import Dict, List, Optional, Tuple
+from preferences import resolve_timezone
+
+WEEKDAYS = {
+    "monday": 0, "mon": 0, "tuesday": 1, "tue": 1, "tues": 1, "wednesday": 2, "wed": 2,
+    "thursday": 3, "thu": 3, "thur": 3, "thurs": 3, "friday": 4, "fri": 4,
+    "saturday": 5, "sat": 5, "sunday": 6, "sun": 6,
+}
+MONTHS = {
+    "january": 1, "jan": 1, "february": 2, "feb": 2, "march": 3, "mar": 3, "april": 4, "apr": 4,
+    "may": 5, "june": 6, "jun": 6, "july": 7, "jul": 7, "august": 8, "aug": 8,
+    "september": 9, "sep": 9, "sept": 9, "october": 10, "oct": 10, "november": 11, "nov": 11,
+    "december": 12, "dec": 12,
+}
+# Wall-clock windows for parts of the day, and for a date with no time (matches the LLM prompt's 9am-5pm)
+DAY_PARTS = {"morning": (9, 12), "afternoon": (12, 17), "evening": (17, 21), "tonight": (17, 21)}
+WORKDAY = (9, 17)
+DEFAULT_DURATION_MINUTES = 30
+
+# Words that change what a phrase means ("before 3pm", "Monday or Tuesday", "what about 10am",
+# "same time next week"); if any are left after parsing, the query goes to the LLM.
+UNSURE_WORDS = {
+    "or", "not", "except", "before", "after", "until", "till", "by", "around", "about", "ish",
+    "every", "each", "week", "weekend", "month", "year", "instead", "same", "earlier", "later",
+    "again", "either", "early", "late", "end", "beginning", "start", "then", "last", "previous",
+    "next", "this", "coming",
+}
+
+# An explicit timezone ("3pm EST", "10am New York time", "UTC+2") overrides the viewer's;
+# only the LLM parser converts those, so such queries never take the fast path.
+TIMEZONE_ABBREVIATIONS = {
+    "utc", "gmt", "z", "zulu", "et", "est", "edt", "ct", "cst", "cdt", "mt", "mst", "mdt", "pt", "pst", "pdt",
+    "akst", "akdt", "hst", "bst", "ist", "wet", "west", "cet", "cest", "eet", "eest", "msk", "gst", "sgt",
+    "hkt", "jst", "kst", "aest", "aedt", "acst", "awst", "nzst", "nzdt", "eastern", "pacific", "mountain",
+}
+# "<word> time" names a timezone unless the word is one of these ("same time", "a good time")
+GENERIC_TIME_WORDS = {
+    "a", "the", "any", "some", "what", "which", "that", "this", "same", "good", "free", "spare",
+    "meeting", "lunch", "my", "local", "start", "end", "exact", "one",
+}
+
+_WEEKDAY_NAMES = "|".join(sorted(WEEKDAYS, key=len, reverse=True))
+_MONTH_NAMES = "|".join(sorted(MONTHS, key=len, reverse=True))
+_AMPM = r"(?:a\.?m\.?|p\.?m\.?)"
+_CLOCK = rf"(\d{{1,2}})(?::(\d{{2}}))?\s*({_AMPM})?"
+
+# "in 2 hours" is an offset from now, not a duration
+RELATIVE_OFFSET_RE = re.compile(r"\bin\s+(?:\d+(?:\.\d+)?|an?|one|two|three|half\s+an?)\s*[- ]?\s*(?:hours?|hrs?|h|minutes?|mins?)\b")
+DURATION_RE = re.compile(
+    r"\b(?:for\s+)?(\d+(?:\.\d+)?|an?|one|two|three|half\s+an?)\s*[- ]?\s*"
+    r"(hours?|hrs?|h|minutes?|mins?)\b(?:\s+long)?"
+)
+ISO_DATE_RE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+MONTH_DATE_RE = re.compile(
+    rf"\b(?:({_MONTH_NAMES})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?|(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH_NAMES})\.?)"
+    r"(?:,?\s+(\d{4}))?\b"
+)
+RELATIVE_DAY_RE = re.compile(r"\b(?:the\s+)?(day\s+after\s+tomorrow|tomorrow|tmrw|today|tonight)\b")
+WEEKDAY_RE = re.compile(rf"\b(?:(on|this|next|coming)\s+)?({_WEEKDAY_NAMES})\b\.?")
+TIME_RANGE_RE = re.compile(rf"\b(?:from\s+|between\s+)?{_CLOCK}\s*(?:-|–|to|and|until|till)\s*{_CLOCK}(?!\d)")
+TIME_RE = re.compile(rf"\b(?:at\s+)?(?:{_CLOCK}|(noon|midday|midnight))(?!\d)")
+DAY_PART_RE = re.compile(r"\b(?:in\s+the\s+|this\s+)?(morning|afternoon|evening)\b")
+TIMEZONE_RE = re.compile(
+    rf"\b(?:{'|'.join(sorted(TIMEZONE_ABBREVIATIONS, key=len, reverse=True))})\b"
+    r"|\btime\s*zones?\b|[+\u2212]\s*\d{1,2}(?::?\d{2})?\b(?!\s*(?:hours?|hrs?|h|minutes?|mins?)\b)"
+    r"|\b(?:utc|gmt)\s*-\s*\d"
+)
+PLACE_TIME_RE = re.compile(r"\b([a-z]+)\s+time\b")
+
+
+class FastPathStats:
+    """Counts queries answered by the rule-based parser vs sent to the LLM."""
+
+    def __init__(self):
+        self.fast_path = 0
+        self.llm = 0
+
+    def record(self, fast: bool) -> None:
+        if fast:
+            self.fast_path += 1
+        else:
+            self.llm += 1
+
+    def stats(self) -> Dict[str, float]:
+        total = self.fast_path + self.llm
+        return {
+            "fast_path": self.fast_path,
+            "llm": self.llm,
+            "hit_rate": round(self.fast_path / total, 3) if total else 0.0,
+        }
+
+
+def _duration_minutes(amount: str, unit: str) -> Optional[float]:
+    words = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3}
+    if amount.startswith("half"):
+        value = 0.5
+    elif amount in words:
+        value = words[amount]
+    else:
+        value = float(amount)
+    minutes = value * 60 if unit.startswith("h") else value
+    return minutes if 0 < minutes <= 24 * 60 else None
+
+
+def _clock(hour: str, minute: Optional[str], ampm: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Return (hour, minute) on a 24h clock; None if invalid or ambiguous (no am/pm, no 24h form)."""
+    h, m = int(hour), int(minute or 0)
+    if m > 59:
+        return None
+    if ampm:
+        if not 1 <= h <= 12:
+            return None
+        pm = ampm.startswith("p")
+        return (h % 12 + (12 if pm else 0), m)
+    if minute is not None and (h >= 13 or hour.startswith("0")) and h <= 23:
+        return (h, m)  # unambiguous 24-hour time like 15:00 or 09:30
+    return None
+
+
+def _range_clocks(start: Tuple[str, Optional[str], Optional[str]], end: Tuple[str, Optional[str], Optional[str]]):
+    """Resolve a "2-4pm" / "11am-1" style range, borrowing am/pm from the other end when missing."""
+    (h1, m1, p1), (h2, m2, p2) = start, end
+    if p1 is None and p2 is not None:
+        first = _clock(h1, m1, p2)
+        last = _clock(h2, m2, p2)
+        if first and last and first >= last:
+            first = _clock(h1, m1, "am")  # "11-1pm" is 11am-1pm
+        return first, last
+    if p2 is None and p1 is not None:
+        first = _clock(h1, m1, p1)
+        last = _clock(h2, m2, p1)
+        if first and last and last <= first:
+            last = _clock(h2, m2, "pm")
+        return first, last
+    return _clock(h1, m1, p1), _clock(h2, m2, p2)
+
+
+def _next_date(today: datetime.date, month: int, day: int, year: Optional[int]) -> Optional[datetime.date]:
+    try:
+        if year:
+            return datetime.date(year, month, day)
+        candidate = datetime.date(today.year, month, day)
+        return candidate if candidate >= today else datetime.date(today.year + 1, month, day)
+    except ValueError:
+        return None
+
+
+def _names_timezone(text: str) -> bool:
+    if TIMEZONE_RE.search(text):
+        return True
+    return any(word not in GENERIC_TIME_WORDS for word in PLACE_TIME_RE.findall(text))
+
+
+def parse_time_window(query: str, now: Optional[datetime.datetime] = None, tz=None) -> Optional[Dict[str, str]]:
+    """
+    Parse a query with common date/time phrases into {"start_iso", "end_iso"} (UTC, "Z").
+
+    Wall-clock times are read in ``tz`` (IANA name or tzinfo; UTC if None).
+    Returns None whenever the query is not fully understood: no explicit day,
+    several days or times, an ambiguous hour ("at 3"), an explicit timezone
+    ("3pm EST", "London time"), or words that change the meaning ("before",
+    "or", "what about"...). Those queries need the LLM.
+    """
+    zone = resolve_timezone(tz)
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    today = now.astimezone(zone).date()
+    text = " " + re.sub(r"\s+", " ", query.lower()) + " "
+
+    def take(pattern: "re.Pattern") -> List["re.Match"]:
+        nonlocal text
+        matches = list(pattern.finditer(text))
+        if matches:
+            text = pattern.sub(" ", text)
+        return matches
+
+    if RELATIVE_OFFSET_RE.search(text) or _names_timezone(text):
+        return None
+    durations = take(DURATION_RE)
+    dates: List[datetime.date] = []
+    for match in take(ISO_DATE_RE):
+        try:
+            dates.append(datetime.date(int(match.group(1)), int(match.group(2)), int(match.group(3))))
+        except ValueError:
+            return None
+    for match in take(MONTH_DATE_RE):
+        month = MONTHS[match.group(1) or match.group(4)]
+        day = int(match.group(2) or match.group(3))
+        date = _next_date(today, month, day, int(match.group(5)) if match.group(5) else None)
+        if date is None:
+            return None
+        dates.append(date)
+
+    day_part = None
+    for match in take(RELATIVE_DAY_RE):
+        word = match.group(1)
+        if word == "tonight":
+            day_part = "tonight"
+        offset = 2 if word.startswith("day") else 1 if word in ("tomorrow", "tmrw") else 0
+        dates.append(today + datetime.timedelta(days=offset))
+
+    weekdays = take(WEEKDAY_RE)
+    if len(weekdays) > 1:
+        return None
+    for match in weekdays:
+        modifier, weekday = match.group(1), WEEKDAYS[match.group(2)]
+        days_ahead = (weekday - today.weekday()) % 7
+        if days_ahead == 0:
+            return None  # "Friday" said on a Friday: today or next week?
+        if modifier == "next" and weekday > today.weekday():
+            return None  # "next Thursday" on a Monday: this week's or next week's?
+        date = today + datetime.timedelta(days=days_ahead)
+        if dates and dates[-1].weekday() != weekday:
+            return None  # "Friday Nov 13" where Nov 13 is not a Friday
+        if not dates:
+            dates.append(date)
+
+    if len(set(dates)) != 1:
+        return None
+    date = dates[0]
+
+    ranges = take(TIME_RANGE_RE)
+    times = take(TIME_RE)
+    day_parts = take(DAY_PART_RE)
+    if len(ranges) + len(times) > 1 or len(durations) > 1 or len(day_parts) > 1:
+        return None
+
+    # Anything left that could change the meaning sends the query to the LLM
+    if re.search(r"\d", text) or UNSURE_WORDS.intersection(re.findall(r"[a-z]+", text)):
+        return None
+
+    if ranges:
+        if re.search(r"\band\b", ranges[0].group()) and not ranges[0].group().startswith("between"):
+            return None  # "3pm and 5pm" is two times, only "between 3 and 5pm" is a range
+        groups = ranges[0].groups()
+        first, last = _range_clocks(groups[0:3], groups[3:6])
+        if not first or not last or last <= first:
+            return None
+        start = datetime.datetime.combine(date, datetime.time(*first), tzinfo=zone)
+        end = datetime.datetime.combine(date, datetime.time(*last), tzinfo=zone)
+    elif times:
+        hour, minute, ampm, named = times[0].groups()
+        if named:
+            clock = (0, 0) if named == "midnight" else (12, 0)
+        else:
+            clock = _clock(hour, minute, ampm)
+        if clock is None:
+            return None
+        minutes = DEFAULT_DURATION_MINUTES
+        if durations:
+            minutes = _duration_minutes(durations[0].group(1), durations[0].group(2))
+            if minutes is None:
+                return None
+        start = datetime.datetime.combine(date, datetime.time(*clock), tzinfo=zone)
+        end = start + datetime.timedelta(minutes=minutes)
+    else:
+        first_hour, last_hour = DAY_PARTS[day_parts[0].group(1)] if day_parts else DAY_PARTS.get(day_part, WORKDAY)
+        start = datetime.datetime.combine(date, datetime.time(first_hour), tzinfo=zone)
+        end = datetime.datetime.combine(date, datetime.time(last_hour), tzinfo=zone)
+
+    def format_utc(dt: datetime.datetime) -> str:
+        return dt.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
+
+    return {"start_iso": format_utc(start), "end_iso": format_utc(end)}